@@ -92,7 +92,7 @@ class ResolverContext:
         """Initialize the context. This get's called on default and post mapping file path
         context creation.
 
-        Here you can inject data by batch calling context.AddCachingPair(assetPath, resolvePath),
+        Here you can inject data by batch calling context.AddCachingPairs({assetPath: resolvePath}),
         this will then populate the internal C++ resolve cache and all resolves calls
         to those assetPaths will not invoke Python and instead use the cache.
 
@@ -116,9 +116,7 @@ class ResolverContext:
                  it will be resolved to an empty ArResolvedPath internally, but will
                  still count as a cache hit and be stored inside the cachedPairs dict.
         """
-        LOG.debug(
-            "::: ResolverContext.ResolveAndCache | {} | {}".format(assetPath, context.GetCachingPairs())
-        )
+        LOG.debug("::: ResolverContext.ResolveAndCache | %s | %s", assetPath, context.GetCachingPairsView())
         if Sdf.Layer.IsAnonymousLayerIdentifier(assetPath):
             return assetPath
 
@@ -131,8 +129,7 @@ class ResolverContext:
             # Here you would add your custom relative path resolve logic.
             # We can test our mapping pairs to see if the version is pinned, otherwise we fallback to the original intent.
             versionless_identifier = f"{RELATIVE_PATH_IDENTIFIER_PREFIX}{entity_type}/{entity_identifier}?{entity_element}"
-            mapping_pairs = context.GetMappingPairs()
-            mapping_hit = mapping_pairs.get(versionless_identifier)
+            mapping_hit = context.GetMappingPair(versionless_identifier)
             if mapping_hit:
                 resolved_asset_path = mapping_hit
             else:
@@ -147,4 +144,21 @@ class ResolverContext:
                                                 f"{entity_identifier}_v002.usd")
         # Cache result
         context.AddCachingPair(assetPath, resolved_asset_path)
-        return resolved_asset_path
\ No newline at end of file
+        return resolved_asset_path
+
+    @staticmethod
+    @log_function_args
+    def ResolveAndCacheBatch(context, assetPaths):
+        """Resolve and cache all the given assetPaths in a single call.
+        This gets called via Resolver.ResolveBatch with all asset paths
+        that don't have a mapping/caching pair yet. Querying your asset
+        database once for all paths is a lot cheaper than doing it per path.
+        Args:
+            context (CachedResolverContext): The active context.
+            assetPaths (list[str]): The unresolved asset paths.
+        """
+        LOG.debug("::: ResolverContext.ResolveAndCacheBatch | {}".format(len(assetPaths)))
+        # Here you would add your custom batch query, by default we
+        # just forward each asset path to the single asset path query.
+        for assetPath in assetPaths:
+            ResolverContext.ResolveAndCache(context, assetPath)
@@ -1,6 +1,10 @@
+import atexit
 import inspect
+import json
 import logging
 import os
+import threading
+import time
 from functools import wraps
 
 from pxr import Ar, Sdf
@@ -12,24 +16,180 @@ LOG = logging.getLogger("Python | {file_name}".format(file_name=__name__))
 LOG.setLevel(level=logging.INFO)
 
 
-def log_function_args(func):
-    """Decorator to print function call details."""
+# Tracing
+TRACING_ENV_VAR = "AR_PYTHON_EXPOSE_TRACING"
+_TRACING_LOCK = threading.Lock()
+_TRACING_STATE = {"enabled": False}
+_TRACED_FUNCTIONS = []
+_TRACING_STATISTICS = {}
+
+
+class TracingStatistic:
+    """The call count and latency histogram of a traced function.
+    The histogram buckets are powers of two in nanoseconds: the
+    bucket with the index i counts calls that took less than 2**i ns.
+    """
+
+    __slots__ = ("callCount", "totalTime", "maxTime", "histogram")
+
+    def __init__(self):
+        self.callCount = 0
+        self.totalTime = 0
+        self.maxTime = 0
+        self.histogram = {}
+
+    def add(self, elapsedTime):
+        bucket = elapsedTime.bit_length()
+        self.callCount += 1
+        self.totalTime += elapsedTime
+        self.maxTime = max(self.maxTime, elapsedTime)
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def percentile(self, fraction):
+        """Returns the upper bound (in ns) of the bucket the given fraction of calls falls into."""
+        threshold = fraction * self.callCount
+        count = 0
+        for bucket in sorted(self.histogram):
+            count += self.histogram[bucket]
+            if count >= threshold:
+                return 2 ** bucket
+        return 0
+
+    def asDict(self):
+        return {
+            "callCount": self.callCount,
+            "totalTime": self.totalTime,
+            "maxTime": self.maxTime,
+            "histogram": {str(2 ** bucket): count for bucket, count in sorted(self.histogram.items())},
+        }
+
+
+def trace_function(func):
+    """Decorator to register a function for tracing.
+    The function is returned as is, so tracing has no overhead while it
+    is disabled. EnableTracing swaps it with a wrapper that records its
+    call count and latency (and logs its arguments on the debug level).
+    """
+    _TRACED_FUNCTIONS.append(func)
+    return func
+
+
+def _TraceWrapper(func):
+    name = func.__qualname__
 
     @wraps(func)
     def wrapper(*args, **kwargs):
-        func_args = inspect.signature(func).bind(*args, **kwargs).arguments
-        func_args_str = ", ".join(map("{0[0]} = {0[1]!r}".format, func_args.items()))
-        # To enable logging on all methods, re-enable this.
-        # LOG.info(f"{func.__module__}.{func.__qualname__} ({func_args_str})")
-        return func(*args, **kwargs)
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("%s.%s (%s)", func.__module__, name, ", ".join(map(repr, args)))
+        startTime = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsedTime = time.perf_counter_ns() - startTime
+            with _TRACING_LOCK:
+                statistic = _TRACING_STATISTICS.get(name)
+                if statistic is None:
+                    statistic = _TRACING_STATISTICS[name] = TracingStatistic()
+                statistic.add(elapsedTime)
 
     return wrapper
 
 
+def _SetTracedFunctions(traced):
+    for func in _TRACED_FUNCTIONS:
+        ownerName, attrName = func.__qualname__.rsplit(".", 1)
+        owner = globals()[ownerName]
+        wrapped = _TraceWrapper(func) if traced else func
+        if isinstance(inspect.getattr_static(owner, attrName), staticmethod):
+            wrapped = staticmethod(wrapped)
+        setattr(owner, attrName, wrapped)
+
+
+def IsTracingEnabled():
+    """Returns true if tracing is enabled."""
+    return _TRACING_STATE["enabled"]
+
+
+def EnableTracing():
+    """Enable tracing of all functions decorated with trace_function."""
+    with _TRACING_LOCK:
+        if not _TRACING_STATE["enabled"]:
+            _SetTracedFunctions(True)
+            _TRACING_STATE["enabled"] = True
+
+
+def DisableTracing():
+    """Disable tracing, the recorded statistics are kept."""
+    with _TRACING_LOCK:
+        if _TRACING_STATE["enabled"]:
+            _SetTracedFunctions(False)
+            _TRACING_STATE["enabled"] = False
+
+
+def ResetTracingStatistics():
+    """Clear the recorded statistics."""
+    with _TRACING_LOCK:
+        _TRACING_STATISTICS.clear()
+
+
+def GetTracingStatistics():
+    """Returns the recorded statistics.
+    Returns:
+        dict: The statistics as dicts, keyed by the qualified function name.
+              The times are in nanoseconds.
+    """
+    with _TRACING_LOCK:
+        return {name: statistic.asDict() for name, statistic in _TRACING_STATISTICS.items()}
+
+
+def DumpTracingStatistics(format="table"):
+    """Dump the recorded statistics.
+    Args:
+        format(str): Either "table" or "json".
+    Returns:
+        str: The formatted statistics.
+    """
+    if format == "json":
+        return json.dumps(GetTracingStatistics(), indent=4)
+    if format != "table":
+        raise ValueError("Unsupported tracing statistics format: {}".format(format))
+    with _TRACING_LOCK:
+        statistics = sorted(_TRACING_STATISTICS.items(), key=lambda item: item[1].totalTime, reverse=True)
+        rows = [("Function", "Calls", "Total (ms)", "Mean (us)", "P50 (us)", "P99 (us)", "Max (us)")]
+        for name, statistic in statistics:
+            rows.append((
+                name,
+                str(statistic.callCount),
+                "{:.3f}".format(statistic.totalTime / 1e6),
+                "{:.1f}".format(statistic.totalTime / statistic.callCount / 1e3),
+                "<{:.1f}".format(statistic.percentile(0.5) / 1e3),
+                "<{:.1f}".format(statistic.percentile(0.99) / 1e3),
+                "{:.1f}".format(statistic.maxTime / 1e3),
+            ))
+    widths = [max(len(row[idx]) for row in rows) for idx in range(len(rows[0]))]
+    return "\n".join(
+        "  ".join(cell.ljust(width) if idx == 0 else cell.rjust(width) for idx, (cell, width) in enumerate(zip(row, widths)))
+        for row in rows
+    )
+
+
+def _EnableTracingFromEnv():
+    """Enable tracing via the AR_PYTHON_EXPOSE_TRACING environment variable.
+    "1"/"true" enables tracing, "table"/"json" additionally logs the statistics on exit.
+    """
+    value = os.environ.get(TRACING_ENV_VAR, "").lower()
+    if value in ("1", "true", "table", "json"):
+        EnableTracing()
+    if value in ("table", "json"):
+        atexit.register(lambda: LOG.info("Tracing statistics:\n%s", DumpTracingStatistics(value)))
+
+
 class UnitTestHelper:
     create_relative_path_identifier_call_counter = 0
     context_initialize_call_counter = 0
     resolve_and_cache_call_counter = 0
+    resolve_and_cache_batch_call_counter = 0
+    resolve_and_cache_hooks = {}
     current_directory_path = ""
 
     @classmethod
@@ -37,13 +197,15 @@ class UnitTestHelper:
         cls.create_relative_path_identifier_call_counter = 0
         cls.context_initialize_call_counter = 0
         cls.resolve_and_cache_call_counter = 0
+        cls.resolve_and_cache_batch_call_counter = 0
+        cls.resolve_and_cache_hooks = {}
         cls.current_directory_path = current_directory_path
 
 
 class Resolver:
 
     @staticmethod
-    @log_function_args
+    @trace_function
     def CreateRelativePathIdentifier(resolver, anchoredAssetPath, assetPath, anchorAssetPath):
         """Returns an identifier for the asset specified by assetPath and anchor asset path.
         It is very important that the anchoredAssetPath is used as the cache key, as this
@@ -78,12 +240,12 @@ class Resolver:
 class ResolverContext:
 
     @staticmethod
-    @log_function_args
+    @trace_function
     def Initialize(context):
         """Initialize the context. This get's called on default and post mapping file path
         context creation.
 
-        Here you can inject data by batch calling context.AddCachingPair(assetPath, resolvePath),
+        Here you can inject data by batch calling context.AddCachingPairs({assetPath: resolvePath}),
         this will then populate the internal C++ resolve cache and all resolves calls
         to those assetPaths will not invoke Python and instead use the cache.
 
@@ -97,7 +259,7 @@ class ResolverContext:
         return
 
     @staticmethod
-    @log_function_args
+    @trace_function
     def ResolveAndCache(context, assetPath):
         """Return the resolved path for the given assetPath or an empty
         ArResolvedPath if no asset exists at that path.
@@ -109,9 +271,7 @@ class ResolverContext:
                  it will be resolved to an empty ArResolvedPath internally, but will
                  still count as a cache hit and be stored inside the cachedPairs dict.
         """
-        LOG.debug(
-            "::: ResolverContext.ResolveAndCache | {} | {}".format(assetPath, context.GetCachingPairs())
-        )
+        LOG.debug("::: ResolverContext.ResolveAndCache | %s | %s", assetPath, context.GetCachingPairsView())
         """Implement custom resolve logic and add the resolved path to the cache.
         resolved_asset_path = "/some/path/to/a/file.usd"
         context.AddCachingPair(assetPath, resolved_asset_path)
@@ -123,6 +283,9 @@ class ResolverContext:
             return assetPath
         """The code below is only needed to verify that UnitTests work."""
         UnitTestHelper.resolve_and_cache_call_counter += 1
+        hook = UnitTestHelper.resolve_and_cache_hooks.get(assetPath)
+        if hook:
+            hook(context, assetPath)
         resolved_asset_path = "/some/path/to/a/file.usd"
         context.AddCachingPair(assetPath, resolved_asset_path)
         if assetPath == "unittest.usd":
@@ -140,3 +303,23 @@ class ResolverContext:
             resolved_asset_path = os.path.normpath(os.path.join(anchor_path, relative_path))
             context.AddCachingPair(assetPath, resolved_asset_path)
         return resolved_asset_path
+
+    @staticmethod
+    @trace_function
+    def ResolveAndCacheBatch(context, assetPaths):
+        """Resolve and cache all the given assetPaths in a single call.
+        This gets called via Resolver.ResolveBatch with all asset paths
+        that don't have a mapping/caching pair yet. Querying your asset
+        database once for all paths is a lot cheaper than doing it per path.
+        Args:
+            context (CachedResolverContext): The active context.
+            assetPaths (list[str]): The unresolved asset paths.
+        """
+        LOG.debug("::: ResolverContext.ResolveAndCacheBatch | {}".format(len(assetPaths)))
+        """The code below is only needed to verify that UnitTests work."""
+        UnitTestHelper.resolve_and_cache_batch_call_counter += 1
+        for assetPath in assetPaths:
+            ResolverContext.ResolveAndCache(context, assetPath)
+
+
+_EnableTracingFromEnv()
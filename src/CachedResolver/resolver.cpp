@@ -17,10 +17,13 @@
 #include "pxr/usd/ar/filesystemWritableAsset.h"
 #include "pxr/usd/ar/notice.h"
 
+#include <algorithm>
+#include <chrono>
 #include <fstream>
 #include <iostream>
 #include <map>
 #include <mutex>
+#include <optional>
 #include <thread>
 #include <string>
 #include <regex>
@@ -75,40 +78,59 @@ _AnchorRelativePath(
 CachedResolver::CachedResolver() {
     this->SetExposeAbsolutePathIdentifierState(TfGetenvBool(DEFINE_STRING(AR_CACHEDRESOLVER_ENV_EXPOSE_ABSOLUTE_PATH_IDENTIFIERS), false));
     this->SetExposeRelativePathIdentifierState(TfGetenvBool(DEFINE_STRING(AR_CACHEDRESOLVER_ENV_EXPOSE_RELATIVE_PATH_IDENTIFIERS), false));
+    this->SetSharedContextCapacity(std::max(0, TfGetenvInt(DEFINE_STRING(AR_ENV_SHARED_CONTEXT_CAPACITY), 0)));
+    this->SetSharedContextMemoryLimit(static_cast<size_t>(std::max(0, TfGetenvInt(DEFINE_STRING(AR_ENV_SHARED_CONTEXT_MEMORY_LIMIT), 0))) * 1024 * 1024);
+    this->SetSharedContextRevalidationInterval(TfGetenvDouble(DEFINE_STRING(AR_ENV_SHARED_CONTEXT_REVALIDATION_INTERVAL), 0.0));
 };
 
 CachedResolver::~CachedResolver() = default;
 
 void CachedResolver::AddCachedRelativePathIdentifierPair(const std::string& sourceStr, const std::string& targetStr){
-    auto cache_find = cachedRelativePathIdentifierPairs.find(sourceStr);
-    if(cache_find != cachedRelativePathIdentifierPairs.end()){
-        cache_find->second = targetStr;
-    }else{
-        cachedRelativePathIdentifierPairs.insert(std::pair<std::string, std::string>(sourceStr,targetStr));
-    }
+    cachedRelativePathIdentifierPairs.Insert(sourceStr, targetStr);
 }
 
-
 void CachedResolver::RemoveCachedRelativePathIdentifierByKey(const std::string& sourceStr){
-    const auto &it = cachedRelativePathIdentifierPairs.find(sourceStr);
-    if (it != cachedRelativePathIdentifierPairs.end()){
-        cachedRelativePathIdentifierPairs.erase(it);
-    }
+    cachedRelativePathIdentifierPairs.Erase(sourceStr);
 }
 
-
 void CachedResolver::RemoveCachedRelativePathIdentifierByValue(const std::string& targetStr){
-    for (auto it = cachedRelativePathIdentifierPairs.cbegin(); it != cachedRelativePathIdentifierPairs.cend();)
-    {
-        if (it->second == targetStr)
-        {
-            cachedRelativePathIdentifierPairs.erase(it++);
-        }
-        else
-        {
-            ++it;
+    cachedRelativePathIdentifierPairs.EraseByValue(targetStr);
+}
+
+std::vector<std::string>
+CachedResolver::ResolveBatch(const std::vector<std::string>& assetPaths,
+                             const ArResolvedPath& anchorAssetPath) const
+{
+    TF_DEBUG(CACHEDRESOLVER_RESOLVER).Msg("Resolver::ResolveBatch(%zu asset paths, '%s')\n",
+                                          assetPaths.size(), anchorAssetPath.GetPathString().c_str());
+    // The asset paths may be authored paths (e.g. relative references),
+    // so we first convert them to identifiers like ArResolver::CreateIdentifier does.
+    std::vector<std::string> identifiers;
+    identifiers.reserve(assetPaths.size());
+    for (const std::string& assetPath : assetPaths) {
+        identifiers.push_back(this->_CreateIdentifier(assetPath, anchorAssetPath));
+    }
+
+    // Pre-populate the cache of the active context in a single Python query,
+    // so that the resolve calls below are all cache hits.
+    const CachedResolverContext* ctx = this->_GetCurrentContextPtr();
+    if (!ctx) {
+        ctx = &_fallbackContext;
+    }
+    std::vector<std::string> contextDependentAssetPaths;
+    for (const std::string& identifier : identifiers) {
+        if (!identifier.empty() && this->_IsContextDependentPath(identifier)) {
+            contextDependentAssetPaths.push_back(identifier);
         }
     }
+    ctx->ResolveAndCacheBatch(contextDependentAssetPaths, &_statistics);
+
+    std::vector<std::string> resolvedPaths;
+    resolvedPaths.reserve(identifiers.size());
+    for (const std::string& identifier : identifiers) {
+        resolvedPaths.push_back(this->_Resolve(identifier).GetPathString());
+    }
+    return resolvedPaths;
 }
 
 std::string
@@ -132,11 +154,10 @@ CachedResolver::_CreateIdentifier(
     // through the resolver.
     if (this->exposeRelativePathIdentifierState) {
         if (_IsFileRelativePath(assetPath)) {
-            auto cache_find = this->cachedRelativePathIdentifierPairs.find(anchoredAssetPath);
-            if(cache_find != this->cachedRelativePathIdentifierPairs.end()){
-                return cache_find->second;
+            std::string pythonResult;
+            if(this->cachedRelativePathIdentifierPairs.Find(anchoredAssetPath, pythonResult)){
+                return pythonResult;
             }else{
-                std::string pythonResult;
                 {
                     /*
                     We optionally re-route relative file paths to be pre-formatted in Python.
@@ -147,6 +168,8 @@ CachedResolver::_CreateIdentifier(
                     and the Python Resolver.CreateRelativePathIdentified method on how to use this. 
                     */
                     const std::lock_guard<std::mutex> lock(g_resolver_create_identifier_mutex);
+                    _statistics.Increment(CachedResolverCounter::PythonRelativePathIdentifierQueries);
+                    ScopedLatency queryLatency(_statistics.GetLatency(CachedResolverLatency::PythonCreateRelativePathIdentifier));
 
                     int state = TfPyInvokeAndExtract(
                         DEFINE_STRING(AR_CACHEDRESOLVER_USD_PYTHON_EXPOSE_MODULE_NAME),
@@ -200,15 +223,33 @@ CachedResolver::_Resolve(
         return ArResolvedPath();
     }
 
+    _statistics.Increment(CachedResolverCounter::Resolves);
+    if (_CachePtr currentCache = this->_GetCurrentCache()) {
+        std::string resolvedPathStr;
+        if (currentCache->resolvedPaths.Find(assetPath, resolvedPathStr)) {
+            _statistics.Increment(CachedResolverCounter::ScopedCacheHits);
+            return ArResolvedPath(resolvedPathStr);
+        }
+        const ArResolvedPath resolvedPath = this->_ResolveUncached(assetPath);
+        currentCache->resolvedPaths.Insert(assetPath, resolvedPath.GetPathString());
+        return resolvedPath;
+    }
+    return this->_ResolveUncached(assetPath);
+}
+
+ArResolvedPath
+CachedResolver::_ResolveUncached(
+    const std::string& assetPath) const
+{
     if (this->_IsContextDependentPath(assetPath)) {
         const CachedResolverContext* contexts[2] = {this->_GetCurrentContextPtr(), &_fallbackContext};
         for (const CachedResolverContext* ctx : contexts) {
             if (ctx) {
+                std::string targetStr;
                 // Search for mapping pairs
-                auto &mappingPairs = ctx->GetMappingPairs();
-                auto map_find = mappingPairs.find(assetPath);
-                if(map_find != mappingPairs.end()){
-                    ArResolvedPath resolvedPath = ArResolvedPath(TfAbsPath(map_find->second));
+                if(ctx->FindMappingPair(assetPath, targetStr)){
+                    _statistics.Increment(CachedResolverCounter::MappingPairHits);
+                    ArResolvedPath resolvedPath = ArResolvedPath(TfAbsPath(targetStr));
                     return resolvedPath;
                     // Assume that a map hit is always valid.
                     // if (resolvedPath) {
@@ -216,10 +257,9 @@ CachedResolver::_Resolve(
                     // }
                 }
                 // Search for cached pairs
-                auto &cachedPairs = ctx->GetCachingPairs();
-                auto cache_find = cachedPairs.find(assetPath);
-                if(cache_find != cachedPairs.end()){
-                    ArResolvedPath resolvedPath = ArResolvedPath(TfAbsPath(cache_find->second));
+                if(ctx->FindCachingPair(assetPath, targetStr)){
+                    _statistics.Increment(CachedResolverCounter::CachingPairHits);
+                    ArResolvedPath resolvedPath = ArResolvedPath(TfAbsPath(targetStr));
                     return resolvedPath;
                     // Assume that a cache hit is always valid.
                     // if (resolvedPath) {
@@ -233,7 +273,7 @@ CachedResolver::_Resolve(
                 allow for resolver multithreading with different contexts.
                 See .ResolveAndCachePair for more information.
                 */
-                ArResolvedPath resolvedPath = ArResolvedPath(TfAbsPath(ctx->ResolveAndCachePair(assetPath)));
+                ArResolvedPath resolvedPath = ArResolvedPath(TfAbsPath(ctx->ResolveAndCachePair(assetPath, &_statistics)));
                 if (resolvedPath) {
                     return resolvedPath;
                 }
@@ -277,10 +317,7 @@ CachedResolver::_CreateDefaultContextForAsset(
     if (assetPath.empty()){
         return ArResolverContext(_fallbackContext);
     }
-    ArResolvedPath resolvedPath = this->_Resolve(assetPath);
-    if (!TfPathExists(resolvedPath)){
-        return ArResolverContext(_fallbackContext);
-    }
+    // Reuse the bound context before touching the file system.
     if (this->_GetCurrentContextPtr() != nullptr)
     {
         if (TfDebug::IsEnabled(CACHEDRESOLVER_RESOLVER_CONTEXT))
@@ -296,25 +333,48 @@ CachedResolver::_CreateDefaultContextForAsset(
         }
         return ArResolverContext(*this->_GetCurrentContextPtr());
     }
-    auto map_iter = _sharedContexts.find(resolvedPath);
-    if(map_iter != _sharedContexts.end()){
-        if (map_iter->second.timestamp.GetTime() == this->_GetModificationTimestamp(assetPath, resolvedPath).GetTime())
-        {
-            TF_DEBUG(CACHEDRESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Reusing context on different stage\n", assetPath.c_str());
-            return ArResolverContext(map_iter->second.ctx);
-        }else{
-            TF_DEBUG(CACHEDRESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Reusing context on different stage, reloading due to changed timestamp\n", assetPath.c_str());
-            map_iter->second.ctx.ClearAndReinitialize();
-            return ArResolverContext(map_iter->second.ctx);
+    ArResolvedPath resolvedPath = this->_Resolve(assetPath);
+    // Shared contexts that were validated recently are reused without
+    // re-checking the mapping file's existence and timestamp.
+    const std::chrono::steady_clock::time_point now = std::chrono::steady_clock::now();
+    const std::chrono::duration<double> revalidationInterval(_sharedContextRevalidationInterval.load());
+    if (revalidationInterval.count() > 0.0) {
+        std::optional<CachedResolverContextRecord> validRecord = _sharedContexts.FindIf(resolvedPath,
+            [&](const CachedResolverContextRecord& record) { return now - record.validationTime < revalidationInterval; });
+        if (validRecord) {
+            TF_DEBUG(CACHEDRESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Reusing recently validated context on different stage\n", assetPath.c_str());
+            return ArResolverContext(validRecord->ctx);
         }
     }
-    // Create new context
-    TF_DEBUG(CACHEDRESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Constructing new context\n", assetPath.c_str());
-    struct CachedResolverContextRecord record
-    {
-        this->_GetModificationTimestamp(assetPath, resolvedPath), CachedResolverContext(resolvedPath)
-    };
-    _sharedContexts.insert(std::pair<std::string, CachedResolverContextRecord>(resolvedPath, record));
+    if (!TfPathExists(resolvedPath)){
+        return ArResolverContext(_fallbackContext);
+    }
+    // The shared contexts are constructed only once per mapping file, concurrent
+    // stage opens of the same mapping file wait for the first one to finish.
+    const ArTimestamp timestamp = this->_GetModificationTimestamp(assetPath, resolvedPath);
+    std::vector<std::string> changedSourceStrs;
+    CachedResolverContextRecord record = _sharedContexts.GetOrCreate(resolvedPath,
+        [&]() {
+            TF_DEBUG(CACHEDRESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Constructing new context\n", assetPath.c_str());
+            return CachedResolverContextRecord{timestamp, CachedResolverContext(resolvedPath), now};
+        },
+        [&](CachedResolverContextRecord& record) {
+            record.validationTime = now;
+            if (record.timestamp.GetTime() == timestamp.GetTime())
+            {
+                TF_DEBUG(CACHEDRESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Reusing context on different stage\n", assetPath.c_str());
+            }else{
+                TF_DEBUG(CACHEDRESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Reusing context on different stage, reloading due to changed timestamp\n", assetPath.c_str());
+                changedSourceStrs = record.ctx.RefreshFromMappingFilePath();
+                record.timestamp = timestamp;
+            }
+        });
+    // Only the stages that use the reloaded context are notified,
+    // and only if the reload actually changed any mapping pairs.
+    if (!changedSourceStrs.empty()) {
+        TF_DEBUG(CACHEDRESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Reloaded %zu changed mapping pairs\n", assetPath.c_str(), changedSourceStrs.size());
+        ArNotice::ResolverChanged(record.ctx).Send();
+    }
     return ArResolverContext(record.ctx);
 }
 
@@ -338,6 +398,10 @@ CachedResolver::_RefreshContext(
     if (!ctx) {
         return;
     }
+    // Refreshed contexts have to be re-resolved, even within a cache scope.
+    if (_CachePtr currentCache = this->_GetCurrentCache()) {
+        currentCache->resolvedPaths.Clear();
+    }
     ArNotice::ResolverChanged(*ctx).Send();
 }
 
@@ -374,6 +438,26 @@ CachedResolver::_OpenAssetForWrite(
     return ArFilesystemWritableAsset::Create(resolvedPath, writeMode);
 }
 
+void
+CachedResolver::_BeginCacheScope(
+    VtValue* cacheScopeData)
+{
+    _threadCache.BeginCacheScope(cacheScopeData);
+}
+
+void
+CachedResolver::_EndCacheScope(
+    VtValue* cacheScopeData)
+{
+    _threadCache.EndCacheScope(cacheScopeData);
+}
+
+CachedResolver::_CachePtr
+CachedResolver::_GetCurrentCache() const
+{
+    return _threadCache.GetCurrentCache();
+}
+
 const CachedResolverContext* 
 CachedResolver::_GetCurrentContextPtr() const
 {
@@ -4,13 +4,18 @@
 #include "api.h"
 #include "debugCodes.h"
 #include "resolverContext.h"
+#include "shared_context_registry.h"
 
 #include "pxr/pxr.h"
 #include "pxr/usd/ar/resolver.h"
+#include "pxr/usd/ar/threadLocalScopedCache.h"
 
+#include <atomic>
+#include <chrono>
 #include <memory>
 #include <string>
 #include <map>
+#include <vector>
 
 PXR_NAMESPACE_OPEN_SCOPE
 
@@ -18,10 +23,9 @@ struct CachedResolverContextRecord
 {
     ArTimestamp timestamp;
     CachedResolverContext ctx;
+    std::chrono::steady_clock::time_point validationTime;
 };
 
-static std::map<std::string, CachedResolverContextRecord> _sharedContexts;
-
 class CachedResolver final : public ArResolver
 {
 public:
@@ -54,9 +58,36 @@ public:
     AR_CACHEDRESOLVER_API
     void RemoveCachedRelativePathIdentifierByValue(const std::string& targetStr);
     AR_CACHEDRESOLVER_API
-    const std::map<std::string, std::string>& GetCachedRelativePathIdentifierPairs() const { return cachedRelativePathIdentifierPairs; }
+    std::map<std::string, std::string> GetCachedRelativePathIdentifierPairs() const { return cachedRelativePathIdentifierPairs.ToMap(); }
+    AR_CACHEDRESOLVER_API
+    void ClearCachedRelativePathIdentifierPairs() { cachedRelativePathIdentifierPairs.Clear(); }
+    AR_CACHEDRESOLVER_API
+    std::vector<std::string> ResolveBatch(const std::vector<std::string>& assetPaths,
+                                          const ArResolvedPath& anchorAssetPath = ArResolvedPath()) const;
+    AR_CACHEDRESOLVER_API
+    const CachedResolverStatistics& GetStatistics() const { return _statistics; }
+    AR_CACHEDRESOLVER_API
+    void ResetStatistics() { _statistics.Reset(); }
+    AR_CACHEDRESOLVER_API
+    std::vector<std::string> GetSharedContextMappingFilePaths() const { return _sharedContexts.Keys(); }
+    AR_CACHEDRESOLVER_API
+    size_t GetSharedContextMemoryUsage() const { return _sharedContexts.GetMemoryUsage(); }
+    AR_CACHEDRESOLVER_API
+    size_t GetSharedContextCapacity() const { return _sharedContexts.GetCapacity(); }
+    AR_CACHEDRESOLVER_API
+    void SetSharedContextCapacity(size_t capacity) { _sharedContexts.SetCapacity(capacity); }
     AR_CACHEDRESOLVER_API
-    void ClearCachedRelativePathIdentifierPairs() { cachedRelativePathIdentifierPairs.clear(); }
+    size_t GetSharedContextMemoryLimit() const { return _sharedContexts.GetMemoryLimit(); }
+    AR_CACHEDRESOLVER_API
+    void SetSharedContextMemoryLimit(size_t memoryLimit) { _sharedContexts.SetMemoryLimit(memoryLimit); }
+    AR_CACHEDRESOLVER_API
+    double GetSharedContextRevalidationInterval() const { return _sharedContextRevalidationInterval.load(); }
+    AR_CACHEDRESOLVER_API
+    void SetSharedContextRevalidationInterval(double seconds) { _sharedContextRevalidationInterval.store(seconds > 0.0 ? seconds : 0.0); }
+    AR_CACHEDRESOLVER_API
+    bool RemoveSharedContext(const std::string& mappingFilePath) { return _sharedContexts.Erase(mappingFilePath); }
+    AR_CACHEDRESOLVER_API
+    size_t PurgeSharedContexts(bool force) { return _sharedContexts.Purge(force); }
 protected:
     AR_CACHEDRESOLVER_API
     std::string _CreateIdentifier(
@@ -94,14 +125,44 @@ protected:
     std::shared_ptr<ArWritableAsset> _OpenAssetForWrite(
         const ArResolvedPath& resolvedPath,
         WriteMode writeMode) const final;
+    AR_CACHEDRESOLVER_API
+    void _BeginCacheScope(
+        VtValue* cacheScopeData) final;
+    AR_CACHEDRESOLVER_API
+    void _EndCacheScope(
+        VtValue* cacheScopeData) final;
     
 private:
+    // The scoped cache stores the results of resolving identifiers for the
+    // lifetime of an ArResolverScopedCache, so that e.g. a stage open only
+    // resolves each identifier once.
+    struct _Cache
+    {
+        ConcurrentStringMap resolvedPaths;
+    };
+    using _PerThreadCache = ArThreadLocalScopedCache<_Cache>;
+    using _CachePtr = _PerThreadCache::CachePtr;
+    _CachePtr _GetCurrentCache() const;
+
     const CachedResolverContext* _GetCurrentContextPtr() const;
+    ArResolvedPath _ResolveUncached(
+        const std::string& assetPath) const;
     CachedResolverContext _fallbackContext;
+    mutable SharedContextRegistry<CachedResolverContextRecord> _sharedContexts{
+        [](CachedResolverContextRecord const& record) { return record.ctx.GetUseCount() > 1; },
+        [](CachedResolverContextRecord const& record) { return record.ctx.GetMemoryUsage(); }
+    };
+    std::atomic<double> _sharedContextRevalidationInterval{0.0};
     const std::string emptyString{""};
     bool exposeAbsolutePathIdentifierState{false};
     bool exposeRelativePathIdentifierState{false};
-    std::map<std::string, std::string> cachedRelativePathIdentifierPairs;
+    ConcurrentStringMap cachedRelativePathIdentifierPairs;
+    mutable CachedResolverStatistics _statistics{
+        {"resolves", "scopedCacheHits", "mappingPairHits", "cachingPairHits", "pythonQueries",
+         "inFlightQueryWaits", "pythonBatchQueries", "pythonRelativePathIdentifierQueries"},
+        {"pythonResolveAndCache", "pythonResolveAndCacheBatch", "pythonCreateRelativePathIdentifier", "queryLockWait"}
+    };
+    mutable _PerThreadCache _threadCache;
 };
 
 PXR_NAMESPACE_CLOSE_SCOPE
@@ -3,50 +3,78 @@
 
 #include "resolverContext.h"
 #include "resolverTokens.h"
+#include "mapping_pairs_file.h"
 
 #include "pxr/pxr.h"
+#include "pxr/base/arch/defines.h"
+#include "pxr/base/arch/errno.h"
+#include "pxr/base/arch/fileSystem.h"
+#include "pxr/base/tf/fileUtils.h"
 #include "pxr/base/tf/getenv.h"
+#include "pxr/base/tf/hash.h"
 #include "pxr/base/tf/pathUtils.h"
 #include "pxr/base/tf/pyInvoke.h"
-#include "pxr/usd/sdf/layer.h"
+#include "pxr/base/tf/pyLock.h"
+#include "pxr/base/tf/stringUtils.h"
 
+#include <algorithm>
+#include <fstream>
+#include <future>
 #include <iostream>
 #include <mutex>
+#include <optional>
 #include <thread>
 #include <vector>
 
-/*
-Safety-wise we lock via a mutex when we don't have a cache hit.
-In theory we probably don't need this, as our Python call does this anyway.
-See the _Resolve method for more information.
-*/
-static std::mutex g_resolver_query_mutex;
+#include <cerrno>
+#include <fcntl.h>
+#include <sys/stat.h>
+#if defined(ARCH_OS_WINDOWS)
+#include <io.h>
+#else
+#include <unistd.h>
+#endif
 
 PXR_NAMESPACE_USING_DIRECTIVE
 
-bool getStringEndswithString(const std::string &value, const std::string &compareValue)
+// Open the file for appending, if exclusive is set, opening fails with
+// EEXIST if the file already exists (so that only one process creates it).
+static int _OpenAppendFile(const std::string& filePath, bool exclusive)
 {
-    if (compareValue.size() > value.size())
-    {
-        return false;
-    }
-    if (std::equal(compareValue.rbegin(), compareValue.rend(), value.rbegin()))
-    {
-        return true;
-    }
-    return false;
+#if defined(ARCH_OS_WINDOWS)
+    const int flags = _O_WRONLY | _O_APPEND | _O_CREAT | _O_BINARY | (exclusive ? _O_EXCL : 0);
+    return _open(filePath.c_str(), flags, _S_IREAD | _S_IWRITE);
+#else
+    const int flags = O_WRONLY | O_APPEND | O_CREAT | O_CLOEXEC | (exclusive ? O_EXCL : 0);
+    return ::open(filePath.c_str(), flags, 0666);
+#endif
 }
 
-bool getStringEndswithStrings(const std::string &value, const std::vector<std::string> array)
+// Write the data with a single write call, so that (with O_APPEND) records
+// of concurrently writing processes don't interleave.
+static bool _WriteToFile(int fileDescriptor, const std::string& data)
 {
-    for (int i=0; i < array.size(); i++)
-    {
-        if (getStringEndswithString(value, array[i]))
-        {
-            return true;
-        }
+#if defined(ARCH_OS_WINDOWS)
+    return _write(fileDescriptor, data.data(), static_cast<unsigned int>(data.size())) == static_cast<int>(data.size());
+#else
+    return ::write(fileDescriptor, data.data(), data.size()) == static_cast<ssize_t>(data.size());
+#endif
+}
+
+static void _CloseFile(int fileDescriptor)
+{
+#if defined(ARCH_OS_WINDOWS)
+    _close(fileDescriptor);
+#else
+    ::close(fileDescriptor);
+#endif
+}
+
+CachedResolverContextInternalData::~CachedResolverContextInternalData()
+{
+    if (persistentCacheFileDescriptor >= 0){
+        _CloseFile(persistentCacheFileDescriptor);
     }
-    return false;
 }
 
 CachedResolverContext::CachedResolverContext() {
@@ -62,6 +90,7 @@ CachedResolverContext::CachedResolverContext(const std::string& mappingFilePath)
     // Init
     this->SetMappingFilePath(TfAbsPath(mappingFilePath));
     this->_GetMappingPairsFromUsdFile(this->GetMappingFilePath());
+    this->_LoadPersistentCache();
     this->Initialize();
 }
 
@@ -109,104 +138,404 @@ void CachedResolverContext::ClearAndReinitialize(){
     this->ClearMappingPairs();
     this->ClearCachingPairs();
     if (!this->GetMappingFilePath().empty()){
-        this->RefreshFromMappingFilePath();
+        this->_GetMappingPairsFromUsdFile(this->GetMappingFilePath());
     }
+    this->_LoadPersistentCache();
     this->Initialize();
 }
 
-
-bool CachedResolverContext::_GetMappingPairsFromUsdFile(const std::string& filePath)
-{
-    data->mappingPairs.clear();
-    std::vector<std::string> usdFilePathExts{ ".usd", ".usdc", ".usda" };
-    if (!getStringEndswithStrings(filePath, usdFilePathExts))
+void CachedResolverContext::_LoadPersistentCache(){
+    /*
+    The persistent cache is an append-only text file with one "source\ttarget" pair per line.
+    It is keyed by the mapping file path and its modification timestamp, so that
+    an edit to the mapping file automatically invalidates all previously cached pairs.
+    This allows multiple processes (e.g. render farm tasks of the same shot) to
+    share the result of previous Python queries instead of each re-querying them.
+    */
     {
-        return false;
+        const std::lock_guard<std::mutex> lock(data->persistentCacheMutex);
+        if (data->persistentCacheFileDescriptor >= 0){
+            _CloseFile(data->persistentCacheFileDescriptor);
+            data->persistentCacheFileDescriptor = -1;
+        }
+        data->persistentCacheFilePath.clear();
     }
-    auto layer = SdfLayer::FindOrOpen(TfAbsPath(filePath));
-    if (!layer){
-        return false;
+    const std::string cacheDirPath = TfGetenv(DEFINE_STRING(AR_CACHEDRESOLVER_ENV_PERSISTENT_CACHE_DIR));
+    if (cacheDirPath.empty() || this->GetMappingFilePath().empty()){
+        return;
     }
-    auto layerMetaData = layer->GetCustomLayerData();
-    auto mappingDataPtr = layerMetaData.GetValueAtPath(CachedResolverTokens->mappingPairs);
-    if (!mappingDataPtr){
-        return false;
+    double modificationTime = 0.0;
+    if (!ArchGetModificationTime(this->GetMappingFilePath().c_str(), &modificationTime)){
+        return;
     }
-    pxr::VtStringArray mappingDataArray = mappingDataPtr->Get<pxr::VtStringArray>();
-    if (mappingDataArray.size() % 2 != 0){
-        return false;
+    if (!TfIsDir(cacheDirPath) && !TfMakeDirs(cacheDirPath, -1, true)){
+        TF_WARN("Failed to create persistent cache directory '%s'", cacheDirPath.c_str());
+        return;
     }
-    for (size_t i = 0; i < mappingDataArray.size(); i+=2) {
-        this->AddMappingPair(mappingDataArray[i], mappingDataArray[i+1]);
+    const std::string cacheFilePrefix = TfStringPrintf("%zx_", TfHash()(this->GetMappingFilePath()));
+    const std::string cacheFileName = TfStringPrintf("%s%.6f.cache", cacheFilePrefix.c_str(), modificationTime);
+    const std::string cacheFilePath = TfStringCatPaths(cacheDirPath, cacheFileName);
+    const std::string cacheHeader = "#" + this->GetMappingFilePath() + "\n";
+    TF_DEBUG(CACHEDRESOLVER_RESOLVER_CONTEXT).Msg("ResolverContext::_LoadPersistentCache('%s')\n", cacheFilePath.c_str());
+
+    // Only the process that creates the cache file writes the header.
+    int fileDescriptor = _OpenAppendFile(cacheFilePath, true);
+    if (fileDescriptor >= 0){
+        if (!_WriteToFile(fileDescriptor, cacheHeader)){
+            TF_WARN("Failed to write persistent cache file '%s': %s", cacheFilePath.c_str(), ArchStrerror().c_str());
+            _CloseFile(fileDescriptor);
+            return;
+        }
+        // Remove outdated caches of previous mapping file versions.
+        for (const std::string& fileName : TfListDir(cacheDirPath)){
+            const std::string baseName = TfGetBaseName(fileName);
+            if (TfStringStartsWith(baseName, cacheFilePrefix) && baseName != cacheFileName){
+                TfDeleteFile(fileName);
+            }
+        }
+        {
+            const std::lock_guard<std::mutex> lock(data->persistentCacheMutex);
+            data->persistentCacheFileDescriptor = fileDescriptor;
+            data->persistentCacheFilePath = cacheFilePath;
+        }
+        // Carry over the caching pairs that survived an incremental reload.
+        if (!data->cachingPairs.Empty()){
+            const std::map<std::string, std::string> cachingPairs = data->cachingPairs.ToMap();
+            this->_AppendToPersistentCache(std::vector<std::pair<std::string, std::string>>(cachingPairs.begin(), cachingPairs.end()));
+        }
+        return;
     }
-    return true;
+    if (errno != EEXIST){
+        TF_WARN("Failed to create persistent cache file '%s': %s", cacheFilePath.c_str(), ArchStrerror().c_str());
+        return;
+    }
+    fileDescriptor = _OpenAppendFile(cacheFilePath, false);
+    if (fileDescriptor < 0){
+        TF_WARN("Failed to open persistent cache file '%s': %s", cacheFilePath.c_str(), ArchStrerror().c_str());
+        return;
+    }
+
+    // The header is written with a single write call, so a shorter file was
+    // just created by another process and doesn't contain any records yet.
+    const int64_t fileLength = ArchGetFileLength(cacheFilePath.c_str());
+    if (fileLength >= static_cast<int64_t>(cacheHeader.size())){
+        std::string errMsg;
+        ArchConstFileMapping mapping = ArchMapFileReadOnly(cacheFilePath, &errMsg);
+        if (!mapping){
+            TF_WARN("Failed to map persistent cache file '%s': %s", cacheFilePath.c_str(), errMsg.c_str());
+            _CloseFile(fileDescriptor);
+            return;
+        }
+        const char* begin = mapping.get();
+        const char* end = begin + ArchGetFileMappingLength(mapping);
+        // Verify that the cache belongs to our mapping file (in case of hash collisions).
+        if (static_cast<size_t>(end - begin) < cacheHeader.size() ||
+            cacheHeader.compare(0, cacheHeader.size(), begin, cacheHeader.size()) != 0){
+            TF_WARN("Ignoring persistent cache file '%s', it does not match mapping file '%s'",
+                    cacheFilePath.c_str(), this->GetMappingFilePath().c_str());
+            _CloseFile(fileDescriptor);
+            return;
+        }
+        const char* lineBegin = begin + cacheHeader.size();
+        while (lineBegin < end){
+            const char* lineEnd = std::find(lineBegin, end, '\n');
+            // Skip incomplete records (e.g. of a process that is currently writing).
+            if (lineEnd == end){
+                break;
+            }
+            const char* separator = std::find(lineBegin, lineEnd, '\t');
+            if (separator != lineEnd){
+                data->cachingPairs.Insert(std::string(lineBegin, separator), std::string(separator + 1, lineEnd));
+            }
+            lineBegin = lineEnd + 1;
+        }
+    }
+    const std::lock_guard<std::mutex> lock(data->persistentCacheMutex);
+    data->persistentCacheFileDescriptor = fileDescriptor;
+    data->persistentCacheFilePath = cacheFilePath;
 }
 
-void CachedResolverContext::RefreshFromMappingFilePath(){
-    this->_GetMappingPairsFromUsdFile(this->GetMappingFilePath());
+std::string CachedResolverContext::GetPersistentCacheFilePath() const{
+    // The persistent cache is switched (on mapping file reloads) from other threads.
+    const std::lock_guard<std::mutex> lock(data->persistentCacheMutex);
+    return data->persistentCacheFilePath;
 }
 
-void CachedResolverContext::AddMappingPair(const std::string& sourceStr, const std::string& targetStr){
-    auto map_find = data->mappingPairs.find(sourceStr);
-    if(map_find != data->mappingPairs.end()){
-        map_find->second = targetStr;
-    }else{
-        data->mappingPairs.insert(std::pair<std::string, std::string>(sourceStr,targetStr));
-    }
+bool CachedResolverContext::_IsPersistentCacheEnabled() const{
+    const std::lock_guard<std::mutex> lock(data->persistentCacheMutex);
+    return data->persistentCacheFileDescriptor >= 0;
 }
 
-void CachedResolverContext::RemoveMappingByKey(const std::string& sourceStr){
-    const auto &it = data->mappingPairs.find(sourceStr);
-    if (it != data->mappingPairs.end()){
-        data->mappingPairs.erase(it);
+void CachedResolverContext::_AppendToPersistentCache(const std::vector<std::pair<std::string, std::string>>& pairs) const{
+    if (pairs.empty()){
+        return;
+    }
+    // Records are written with a single write call to the O_APPEND file
+    // descriptor, so that concurrent writes of other processes don't interleave.
+    std::string records;
+    for (const auto& pair : pairs){
+        // We can't persist pairs that would break our line based record format.
+        if (pair.first.find_first_of("\t\n") != std::string::npos ||
+            pair.second.find('\n') != std::string::npos){
+            continue;
+        }
+        records.append(pair.first).append(1, '\t').append(pair.second).append(1, '\n');
+    }
+    if (records.empty()){
+        return;
+    }
+    const std::lock_guard<std::mutex> lock(data->persistentCacheMutex);
+    if (data->persistentCacheFileDescriptor >= 0 && !_WriteToFile(data->persistentCacheFileDescriptor, records)){
+        TF_DEBUG(CACHEDRESOLVER_RESOLVER_CONTEXT).Msg("ResolverContext::_AppendToPersistentCache('%s') - Failed to write records\n", data->persistentCacheFilePath.c_str());
     }
 }
 
-void CachedResolverContext::RemoveMappingByValue(const std::string& targetStr){
-    for (auto it = data->mappingPairs.cbegin(); it != data->mappingPairs.cend();)
+
+std::vector<std::pair<std::string, std::string>> CachedResolverContext::_GetMappingPairsFromUsdFile(const std::string& filePath)
+{
+    // We only update the pairs that changed in the mapping file since it was
+    // last loaded, so that reloading a large mapping file after a few edits
+    // doesn't rebuild the whole map. Pairs that don't stem from the mapping
+    // file (e.g. added via the ResolverContext.Initialize hook) are kept.
+    std::vector<std::pair<std::string, std::string>> mappingPairs;
+    readMappingPairsFromUsdFile(filePath, CachedResolverTokens->mappingPairs,
+                                TfGetenvBool(DEFINE_STRING(AR_ENV_MAPPING_PAIRS_SIDECAR), false),
+                                CACHEDRESOLVER_RESOLVER_CONTEXT, mappingPairs);
+    const std::lock_guard<std::mutex> lock(data->mappingFileMutex);
+    return data->mappingPairs.Assign(mappingPairs, data->mappingFilePairs);
+}
+
+void CachedResolverContext::ClearMappingPairs(){
+    const std::lock_guard<std::mutex> lock(data->mappingFileMutex);
+    data->mappingPairs.Clear();
+    data->mappingFilePairs.clear();
+}
+
+size_t CachedResolverContext::GetMemoryUsage() const{
+    size_t memoryUsage = sizeof(CachedResolverContextInternalData);
+    memoryUsage += data->mappingPairs.GetMemoryUsage();
     {
-        if (it->second == targetStr)
-        {
-            data->mappingPairs.erase(it++);
+        const std::lock_guard<std::mutex> lock(data->mappingFileMutex);
+        for (const auto& pair : data->mappingFilePairs) {
+            memoryUsage += sizeof(pair) + pair.first.capacity() + pair.second.capacity();
         }
-        else
-        {
-            ++it;
+    }
+    memoryUsage += data->cachingPairs.GetMemoryUsage();
+    memoryUsage += data->mappingFilePath.capacity();
+    {
+        const std::lock_guard<std::mutex> lock(data->persistentCacheMutex);
+        memoryUsage += data->persistentCacheFilePath.capacity();
+    }
+    return memoryUsage;
+}
+
+std::vector<std::string> CachedResolverContext::RefreshFromMappingFilePath(){
+    // Only caching pairs of changed source paths or of source paths that
+    // were resolved to a changed target path are affected by the reload.
+    std::vector<std::string> changedSourceStrs;
+    std::vector<std::string> changedTargetStrs;
+    for (const auto& pair : this->_GetMappingPairsFromUsdFile(this->GetMappingFilePath())){
+        changedSourceStrs.push_back(pair.first);
+        if (!pair.second.empty()){
+            changedTargetStrs.push_back(pair.second);
         }
     }
+    for (const std::string& sourceStr : changedSourceStrs){
+        data->cachingPairs.Erase(sourceStr);
+    }
+    data->cachingPairs.EraseByValues(changedTargetStrs);
+    // The persistent cache is keyed by the mapping file timestamp,
+    // so we have to switch to the cache of the reloaded file.
+    this->_LoadPersistentCache();
+    // Re-run the Python initialization, so that it can re-derive its pairs.
+    this->Initialize();
+    return changedSourceStrs;
+}
+
+void CachedResolverContext::AddMappingPair(const std::string& sourceStr, const std::string& targetStr){
+    data->mappingPairs.Insert(sourceStr, targetStr);
+}
+
+void CachedResolverContext::AddMappingPairs(const std::vector<std::pair<std::string, std::string>>& pairs){
+    data->mappingPairs.InsertMany(pairs);
+}
+
+void CachedResolverContext::RemoveMappingByKey(const std::string& sourceStr){
+    data->mappingPairs.Erase(sourceStr);
+}
+
+void CachedResolverContext::RemoveMappingByValue(const std::string& targetStr){
+    data->mappingPairs.EraseByValue(targetStr);
 }
 
 void CachedResolverContext::AddCachingPair(const std::string& sourceStr, const std::string& targetStr){
-    auto cache_find = data->cachingPairs.find(sourceStr);
-    if(cache_find != data->cachingPairs.end()){
-        cache_find->second = targetStr;
-    }else{
-        data->cachingPairs.insert(std::pair<std::string, std::string>(sourceStr,targetStr));
+    if (this->_IsPersistentCacheEnabled()){
+        std::string cachedTargetStr;
+        if (!data->cachingPairs.Find(sourceStr, cachedTargetStr) || cachedTargetStr != targetStr){
+            this->_AppendToPersistentCache({{sourceStr, targetStr}});
+        }
     }
+    data->cachingPairs.Insert(sourceStr, targetStr);
 }
 
-void CachedResolverContext::RemoveCachingByKey(const std::string& sourceStr){
-    const auto &it = data->cachingPairs.find(sourceStr);
-    if (it != data->cachingPairs.end()){
-        data->cachingPairs.erase(it);
+void CachedResolverContext::AddCachingPairs(const std::vector<std::pair<std::string, std::string>>& pairs){
+    if (this->_IsPersistentCacheEnabled()){
+        std::vector<std::pair<std::string, std::string>> changedPairs;
+        std::string cachedTargetStr;
+        for (const auto& pair : pairs){
+            if (!data->cachingPairs.Find(pair.first, cachedTargetStr) || cachedTargetStr != pair.second){
+                changedPairs.push_back(pair);
+            }
+        }
+        this->_AppendToPersistentCache(changedPairs);
     }
+    data->cachingPairs.InsertMany(pairs);
+}
+
+void CachedResolverContext::RemoveCachingByKey(const std::string& sourceStr){
+    data->cachingPairs.Erase(sourceStr);
 }
 
 void CachedResolverContext::RemoveCachingByValue(const std::string& targetStr){
-    for (auto it = data->cachingPairs.cbegin(); it != data->cachingPairs.cend();)
-    {
-        if (it->second == targetStr)
+    data->cachingPairs.EraseByValue(targetStr);
+}
+
+void CachedResolverContext::RemoveCachingByValues(const std::vector<std::string>& targetStrs){
+    data->cachingPairs.EraseByValues(targetStrs);
+}
+
+// Locks the query mutex and records the owning thread, so that resolves of
+// Python hooks (that run while the lock is held) can be detected. The GIL is
+// released while waiting, as the owning thread may need it to finish its query.
+class _QueryLock
+{
+public:
+    _QueryLock(CachedResolverContextInternalData& data, CachedResolverStatistics* statistics)
+        : _data(data) {
         {
-            data->cachingPairs.erase(it++);
+            std::optional<ScopedLatency> lockWaitLatency;
+            if (statistics) {
+                lockWaitLatency.emplace(statistics->GetLatency(CachedResolverLatency::QueryLockWait));
+            }
+            TF_PY_ALLOW_THREADS_IN_SCOPE();
+            _data.queryMutex.lock();
+        }
+        if (_data.queryLockDepth++ == 0) {
+            _data.queryOwnerThreadId.store(std::this_thread::get_id());
+        }
+    }
+    ~_QueryLock() {
+        if (--_data.queryLockDepth == 0) {
+            _data.queryOwnerThreadId.store(std::thread::id());
+        }
+        _data.queryMutex.unlock();
+    }
+    _QueryLock(const _QueryLock&) = delete;
+    _QueryLock& operator=(const _QueryLock&) = delete;
+
+private:
+    CachedResolverContextInternalData& _data;
+};
+
+// Records the asset paths that are queried on the current thread, so that
+// Python hooks that (indirectly) resolve the asset path of their own query
+// don't recurse endlessly.
+class _ActiveQueryScope
+{
+public:
+    _ActiveQueryScope(const CachedResolverContextInternalData* data, const std::string& assetPath) {
+        _activeQueries.emplace_back(data, &assetPath);
+    }
+    ~_ActiveQueryScope() { _activeQueries.pop_back(); }
+    _ActiveQueryScope(const _ActiveQueryScope&) = delete;
+    _ActiveQueryScope& operator=(const _ActiveQueryScope&) = delete;
+
+    static bool IsActive(const CachedResolverContextInternalData* data, const std::string& assetPath) {
+        for (const auto& activeQuery : _activeQueries) {
+            if (activeQuery.first == data && *activeQuery.second == assetPath) {
+                return true;
+            }
         }
-        else
+        return false;
+    }
+
+private:
+    static thread_local std::vector<std::pair<const CachedResolverContextInternalData*, const std::string*>> _activeQueries;
+};
+
+thread_local std::vector<std::pair<const CachedResolverContextInternalData*, const std::string*>> _ActiveQueryScope::_activeQueries;
+
+// Fulfills the in-flight query's promise and removes it from the in-flight
+// table on every exit path, so that waiting threads never block forever
+// (e.g. when the Python query throws). Without a result, it resolves to an
+// empty string.
+class _InFlightQueryGuard
+{
+public:
+    _InFlightQueryGuard(CachedResolverContextInternalData& data, const std::string& assetPath)
+        : _data(data), _assetPath(assetPath) {}
+    ~_InFlightQueryGuard() {
+        if (!_fulfilled) {
+            _promise.set_value(std::string());
+        }
+        const std::lock_guard<std::mutex> lock(_data.inFlightQueriesMutex);
+        _data.inFlightQueries.erase(_assetPath);
+    }
+    _InFlightQueryGuard(const _InFlightQueryGuard&) = delete;
+    _InFlightQueryGuard& operator=(const _InFlightQueryGuard&) = delete;
+
+    std::shared_future<std::string> GetFuture() { return _promise.get_future().share(); }
+    void SetResult(const std::string& result) {
+        _promise.set_value(result);
+        _fulfilled = true;
+    }
+
+private:
+    CachedResolverContextInternalData& _data;
+    const std::string& _assetPath;
+    std::promise<std::string> _promise;
+    bool _fulfilled = false;
+};
+
+const std::string CachedResolverContext::ResolveAndCachePair(const std::string& assetPath,
+                                                             CachedResolverStatistics* statistics) const{
+    /*
+    Concurrent cache misses on the same asset path only trigger a single
+    Python query, all other threads wait for its result via the in-flight table.
+    Resolves of Python hooks already hold the query lock, so they query
+    directly instead: Waiting on the in-flight query of another thread would
+    deadlock, as that thread in turn waits for the query lock. Its query
+    then finds our caching pair.
+    */
+    if (_ActiveQueryScope::IsActive(data.get(), assetPath)) {
+        // The Python query resolves its own asset path, waiting would deadlock.
+        TF_DEBUG(CACHEDRESOLVER_RESOLVER_CONTEXT).Msg("ResolverContext::ResolveAndCachePair('%s') - Skipping recursive query\n", assetPath.c_str());
+        return std::string();
+    }
+    std::optional<_InFlightQueryGuard> queryGuard;
+    if (data->queryOwnerThreadId.load() != std::this_thread::get_id()) {
+        std::shared_future<std::string> queryFuture;
         {
-            ++it;
+            const std::lock_guard<std::mutex> lock(data->inFlightQueriesMutex);
+            auto query_find = data->inFlightQueries.find(assetPath);
+            if (query_find != data->inFlightQueries.end()){
+                queryFuture = query_find->second;
+            }else{
+                queryGuard.emplace(*data, assetPath);
+                data->inFlightQueries.insert({assetPath, queryGuard->GetFuture()});
+            }
+        }
+        if (!queryGuard){
+            TF_DEBUG(CACHEDRESOLVER_RESOLVER_CONTEXT).Msg("ResolverContext::ResolveAndCachePair('%s') - Waiting for in-flight query\n", assetPath.c_str());
+            if (statistics) {
+                statistics->Increment(CachedResolverCounter::InFlightQueryWaits);
+            }
+            // Release the GIL (if held), so that the owning thread can query Python.
+            TF_PY_ALLOW_THREADS_IN_SCOPE();
+            return queryFuture.get();
         }
     }
-}
 
-const std::string CachedResolverContext::ResolveAndCachePair(const std::string& assetPath) const{
     std::string pythonResult;
     {
         /*
@@ -218,17 +547,66 @@ const std::string CachedResolverContext::ResolveAndCachePair(const std::string&
         locked resolver context. While it works, be aware that potential side effects may occur.
         This allows us to populate multiple cachePairs to allow for batch loading.
         */
-        const std::lock_guard<std::mutex> lock(g_resolver_query_mutex);
+        const _QueryLock lock(*data, statistics);
 
-        TF_DEBUG(CACHEDRESOLVER_RESOLVER_CONTEXT).Msg("ResolverContext::ResolveAndCachePair('%s')\n", assetPath.c_str());
-        
-        int state = TfPyInvokeAndExtract(DEFINE_STRING(AR_CACHEDRESOLVER_USD_PYTHON_EXPOSE_MODULE_NAME),
-                                         "ResolverContext.ResolveAndCache",
-                                         &pythonResult, this, assetPath);
-        if (!state) {
-            std::cerr << "Failed to call Resolver.ResolveAndCache in " << DEFINE_STRING(AR_CACHEDRESOLVER_USD_PYTHON_EXPOSE_MODULE_NAME) << ".py. ";
-            std::cerr << "Please verify that the python code is valid!" << std::endl;
+        // A previous query (while we were waiting on the lock) may have
+        // already batch populated the cache with our asset path.
+        if (!data->cachingPairs.Find(assetPath, pythonResult)){
+            TF_DEBUG(CACHEDRESOLVER_RESOLVER_CONTEXT).Msg("ResolverContext::ResolveAndCachePair('%s')\n", assetPath.c_str());
+            const _ActiveQueryScope activeQuery(data.get(), assetPath);
+            std::optional<ScopedLatency> queryLatency;
+            if (statistics) {
+                statistics->Increment(CachedResolverCounter::PythonQueries);
+                queryLatency.emplace(statistics->GetLatency(CachedResolverLatency::PythonResolveAndCache));
+            }
+            int state = TfPyInvokeAndExtract(DEFINE_STRING(AR_CACHEDRESOLVER_USD_PYTHON_EXPOSE_MODULE_NAME),
+                                             "ResolverContext.ResolveAndCache",
+                                             &pythonResult, this, assetPath);
+            if (!state) {
+                std::cerr << "Failed to call Resolver.ResolveAndCache in " << DEFINE_STRING(AR_CACHEDRESOLVER_USD_PYTHON_EXPOSE_MODULE_NAME) << ".py. ";
+                std::cerr << "Please verify that the python code is valid!" << std::endl;
+            }
         }
     }
+    if (queryGuard) {
+        queryGuard->SetResult(pythonResult);
+    }
     return pythonResult;
+}
+
+void CachedResolverContext::ResolveAndCacheBatch(const std::vector<std::string>& assetPaths,
+                                                 CachedResolverStatistics* statistics) const{
+    /*
+    Resolve all asset paths that don't have a mapping/cache hit in a single Python query.
+    This avoids a Python round-trip (and GIL acquisition) per asset path.
+    */
+    const _QueryLock lock(*data, statistics);
+
+    std::vector<std::string> unresolvedAssetPaths;
+    std::string targetStr;
+    for (const std::string& assetPath : assetPaths) {
+        if (assetPath.empty() ||
+            data->mappingPairs.Find(assetPath, targetStr) ||
+            data->cachingPairs.Find(assetPath, targetStr)) {
+            continue;
+        }
+        unresolvedAssetPaths.push_back(assetPath);
+    }
+    if (unresolvedAssetPaths.empty()) {
+        return;
+    }
+    TF_DEBUG(CACHEDRESOLVER_RESOLVER_CONTEXT).Msg("ResolverContext::ResolveAndCacheBatch(%zu asset paths)\n", unresolvedAssetPaths.size());
+    std::optional<ScopedLatency> queryLatency;
+    if (statistics) {
+        statistics->Increment(CachedResolverCounter::PythonBatchQueries);
+        queryLatency.emplace(statistics->GetLatency(CachedResolverLatency::PythonResolveAndCacheBatch));
+    }
+
+    int state = TfPyInvoke(DEFINE_STRING(AR_CACHEDRESOLVER_USD_PYTHON_EXPOSE_MODULE_NAME),
+                           "ResolverContext.ResolveAndCacheBatch",
+                           this, unresolvedAssetPaths);
+    if (!state) {
+        std::cerr << "Failed to call Resolver.ResolveAndCacheBatch in " << DEFINE_STRING(AR_CACHEDRESOLVER_USD_PYTHON_EXPOSE_MODULE_NAME) << ".py. ";
+        std::cerr << "Please verify that the python code is valid!" << std::endl;
+    }
 }
\ No newline at end of file
@@ -3,15 +3,24 @@
 
 #include "api.h"
 #include "debugCodes.h"
+#include "concurrent_string_map.h"
+#include "resolver_statistics.h"
 
 #include "pxr/pxr.h"
 #include "pxr/usd/ar/defineResolverContext.h"
 #include "pxr/usd/ar/resolverContext.h"
 
+#include <atomic>
+#include <future>
 #include <memory>
+#include <mutex>
 #include <regex>
 #include <string>
+#include <thread>
 #include <map>
+#include <unordered_map>
+#include <utility>
+#include <vector>
 
 /* Data Model
 We use an internal data struct that is accessed via a shared pointer
@@ -20,12 +29,64 @@ instead of passing thru the pointer. This way we can send
 > ArNotice::ResolverChanged(*ctx).Send();
 notifications to the stages.
 > See for more info: https://groups.google.com/g/usd-interest/c/9JrXGGbzBnQ/m/_f3oaqBdAwAJ
+The mapping and caching pairs are stored in sharded concurrent maps, as the
+resolver reads them from multiple threads while Python hooks write to them.
+Python queries are locked per context, so that cache misses on unrelated
+contexts don't block each other.
+Optionally caching pairs are persisted to an on-disk cache file, that is
+shared across processes, see the CachedResolverContext::_LoadPersistentCache
+method for more information.
 */
+/* Statistics
+The counters and latencies recorded by the CachedResolver. The contexts
+record the ones of their Python queries into the resolver's statistics.
+*/
+enum class CachedResolverCounter
+{
+    Resolves,
+    ScopedCacheHits,
+    MappingPairHits,
+    CachingPairHits,
+    PythonQueries,
+    InFlightQueryWaits,
+    PythonBatchQueries,
+    PythonRelativePathIdentifierQueries,
+    Count
+};
+
+enum class CachedResolverLatency
+{
+    PythonResolveAndCache,
+    PythonResolveAndCacheBatch,
+    PythonCreateRelativePathIdentifier,
+    QueryLockWait,
+    Count
+};
+
+using CachedResolverStatistics = ResolverStatistics<CachedResolverCounter, CachedResolverLatency>;
+
 struct CachedResolverContextInternalData
 {
     std::string mappingFilePath;
-    std::map<std::string, std::string> mappingPairs;
-    std::map<std::string, std::string> cachingPairs;
+    ConcurrentStringMap mappingPairs;
+    // The mapping pairs loaded from the mapping file, so that reloads only touch
+    // the pairs that changed in the file and keep the pairs added via Python.
+    ConcurrentStringMap::AssignedPairs mappingFilePairs;
+    std::mutex mappingFileMutex;
+    ConcurrentStringMap cachingPairs;
+    // Recursive, so that Python hooks can resolve other asset paths. The owning
+    // thread is tracked, so that these resolves bypass the in-flight queries.
+    std::recursive_mutex queryMutex;
+    std::atomic<std::thread::id> queryOwnerThreadId;
+    size_t queryLockDepth = 0;
+    std::mutex inFlightQueriesMutex;
+    std::unordered_map<std::string, std::shared_future<std::string>> inFlightQueries;
+    std::string persistentCacheFilePath;
+    // The persistent cache file is kept open (in append mode) for the lifetime of the context.
+    int persistentCacheFileDescriptor = -1;
+    std::mutex persistentCacheMutex;
+
+    ~CachedResolverContextInternalData();
 };
 
 class CachedResolverContext
@@ -59,33 +120,64 @@ public:
     AR_CACHEDRESOLVER_API
     void SetMappingFilePath(std::string mappingFilePath) { data->mappingFilePath = mappingFilePath; }
     AR_CACHEDRESOLVER_API
-    void RefreshFromMappingFilePath();
+    std::vector<std::string> RefreshFromMappingFilePath();
     AR_CACHEDRESOLVER_API
     void AddMappingPair(const std::string& sourceStr, const std::string& targetStr);
     AR_CACHEDRESOLVER_API
+    void AddMappingPairs(const std::vector<std::pair<std::string, std::string>>& pairs);
+    AR_CACHEDRESOLVER_API
     void RemoveMappingByKey(const std::string& sourceStr);
     AR_CACHEDRESOLVER_API
     void RemoveMappingByValue(const std::string& targetStr);
     AR_CACHEDRESOLVER_API
-    const std::map<std::string, std::string>& GetMappingPairs() const { return data->mappingPairs; }
+    bool FindMappingPair(const std::string& sourceStr, std::string& targetStr) const { return data->mappingPairs.Find(sourceStr, targetStr); }
+    AR_CACHEDRESOLVER_API
+    bool HasMappingPair(const std::string& sourceStr) const { return data->mappingPairs.Contains(sourceStr); }
     AR_CACHEDRESOLVER_API
-    void ClearMappingPairs() { data->mappingPairs.clear(); }
+    std::map<std::string, std::string> GetMappingPairs() const { return data->mappingPairs.ToMap(); }
+    AR_CACHEDRESOLVER_API
+    std::shared_ptr<const ConcurrentStringMap> GetMappingPairsView() const { return std::shared_ptr<const ConcurrentStringMap>(data, &data->mappingPairs); }
+    AR_CACHEDRESOLVER_API
+    void ClearMappingPairs();
     AR_CACHEDRESOLVER_API
     void AddCachingPair(const std::string& sourceStr, const std::string& targetStr);
     AR_CACHEDRESOLVER_API
+    void AddCachingPairs(const std::vector<std::pair<std::string, std::string>>& pairs);
+    AR_CACHEDRESOLVER_API
     void RemoveCachingByKey(const std::string& sourceStr);
     AR_CACHEDRESOLVER_API
     void RemoveCachingByValue(const std::string& targetStr);
     AR_CACHEDRESOLVER_API
-    const std::map<std::string, std::string>& GetCachingPairs() const { return data->cachingPairs; }
+    void RemoveCachingByValues(const std::vector<std::string>& targetStrs);
+    AR_CACHEDRESOLVER_API
+    bool FindCachingPair(const std::string& sourceStr, std::string& targetStr) const { return data->cachingPairs.Find(sourceStr, targetStr); }
+    AR_CACHEDRESOLVER_API
+    bool HasCachingPair(const std::string& sourceStr) const { return data->cachingPairs.Contains(sourceStr); }
+    AR_CACHEDRESOLVER_API
+    std::map<std::string, std::string> GetCachingPairs() const { return data->cachingPairs.ToMap(); }
+    AR_CACHEDRESOLVER_API
+    std::shared_ptr<const ConcurrentStringMap> GetCachingPairsView() const { return std::shared_ptr<const ConcurrentStringMap>(data, &data->cachingPairs); }
+    AR_CACHEDRESOLVER_API
+    void ClearCachingPairs() { data->cachingPairs.Clear(); }
+    AR_CACHEDRESOLVER_API
+    std::string GetPersistentCacheFilePath() const;
+    AR_CACHEDRESOLVER_API
+    size_t GetMemoryUsage() const;
+    AR_CACHEDRESOLVER_API
+    long GetUseCount() const { return data.use_count(); }
     AR_CACHEDRESOLVER_API
-    void ClearCachingPairs() { data->cachingPairs.clear(); }
+    const std::string ResolveAndCachePair(const std::string& assetPath,
+                                          CachedResolverStatistics* statistics = nullptr) const;
     AR_CACHEDRESOLVER_API
-    const std::string ResolveAndCachePair(const std::string& assetPath) const;
+    void ResolveAndCacheBatch(const std::vector<std::string>& assetPaths,
+                              CachedResolverStatistics* statistics = nullptr) const;
 
 private:
     std::shared_ptr<CachedResolverContextInternalData> data = std::make_shared<CachedResolverContextInternalData>();
-    bool _GetMappingPairsFromUsdFile(const std::string& filePath);
+    std::vector<std::pair<std::string, std::string>> _GetMappingPairsFromUsdFile(const std::string& filePath);
+    void _LoadPersistentCache();
+    bool _IsPersistentCacheEnabled() const;
+    void _AppendToPersistentCache(const std::vector<std::pair<std::string, std::string>>& pairs) const;
 };
 
 PXR_NAMESPACE_OPEN_SCOPE
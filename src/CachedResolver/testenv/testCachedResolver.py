@@ -1,6 +1,8 @@
 from __future__ import print_function
 import tempfile
 import os
+import threading
+import time
 import unittest
 
 from pxr import Ar, Sdf, Usd, Vt
@@ -386,6 +388,126 @@ class TestArResolver(unittest.TestCase):
                 resolved_path = resolver.Resolve(layer_file_path)
                 self.assertEqual(resolved_path.GetPathString(), layer_file_path)
 
+    def test_ResolveAndCacheNestedInFlightQuery(self):
+        resolver = Ar.GetResolver()
+        ctx = CachedResolver.ResolverContext()
+        PythonExpose.UnitTestHelper.reset()
+        results = {}
+
+        def resolve(asset_path):
+            with Ar.ResolverContextBinder(ctx):
+                results[asset_path] = resolver.Resolve(asset_path).GetPathString()
+
+        inner_thread = threading.Thread(target=resolve, args=("inner.usd",), daemon=True)
+
+        def outer_hook(context, assetPath):
+            # Another thread starts resolving the inner asset path (and waits for our
+            # query lock), while our query resolves the same asset path.
+            inner_thread.start()
+            time.sleep(0.5)
+            resolver.Resolve("inner.usd")
+
+        PythonExpose.UnitTestHelper.resolve_and_cache_hooks["outer.usd"] = outer_hook
+        outer_thread = threading.Thread(target=resolve, args=("outer.usd",), daemon=True)
+        outer_thread.start()
+        outer_thread.join(10)
+        inner_thread.join(10)
+        self.assertFalse(outer_thread.is_alive())
+        self.assertFalse(inner_thread.is_alive())
+        self.assertEqual(results, {"outer.usd": "/some/path/to/a/file.usd", "inner.usd": "/some/path/to/a/file.usd"})
+        self.assertEqual(PythonExpose.UnitTestHelper.resolve_and_cache_call_counter, 2)
+        PythonExpose.UnitTestHelper.reset()
+
+    def test_ResolveBatch(self):
+        with tempfile.TemporaryDirectory() as temp_dir_path:
+            # Get resolver
+            resolver = Ar.GetResolver()
+            cached_resolver = Ar.GetUnderlyingResolver()
+            # Create files
+            layer_identifier = "layer.usd"
+            layer_file_path = os.path.join(temp_dir_path, layer_identifier)
+            Sdf.Layer.CreateAnonymous().Export(layer_file_path)
+            # Create context
+            ctx = CachedResolver.ResolverContext()
+            ctx.AddCachingPair(layer_identifier, layer_file_path)
+            # Reset UnitTestHelper
+            PythonExpose.UnitTestHelper.reset(current_directory_path=temp_dir_path)
+            with Ar.ResolverContextBinder(ctx):
+                resolved_paths = cached_resolver.ResolveBatch(
+                    [layer_identifier, "exampleA.usd", "exampleB.usd", layer_file_path]
+                )
+                self.assertEqual(
+                    list(resolved_paths),
+                    [layer_file_path, "/some/path/to/a/file.usd", "/some/path/to/a/file.usd", layer_file_path],
+                )
+                # All cache misses are resolved via a single batch query
+                self.assertEqual(PythonExpose.UnitTestHelper.resolve_and_cache_batch_call_counter, 1)
+                self.assertEqual(PythonExpose.UnitTestHelper.resolve_and_cache_call_counter, 2)
+                # Cache hits don't invoke Python
+                cached_resolver.ResolveBatch(["exampleA.usd", "exampleB.usd"])
+                self.assertEqual(PythonExpose.UnitTestHelper.resolve_and_cache_batch_call_counter, 1)
+                self.assertEqual(resolver.Resolve("exampleA.usd"), "/some/path/to/a/file.usd")
+                self.assertEqual(PythonExpose.UnitTestHelper.resolve_and_cache_call_counter, 2)
+                # Relative asset paths are anchored
+                anchor_file_path = os.path.join(temp_dir_path, "anchor.usd")
+                resolved_paths = cached_resolver.ResolveBatch(
+                    ["./" + layer_identifier], Ar.ResolvedPath(anchor_file_path)
+                )
+                self.assertEqual(list(resolved_paths), [layer_file_path])
+                self.assertEqual(PythonExpose.UnitTestHelper.resolve_and_cache_batch_call_counter, 1)
+
+    def test_ResolverStatistics(self):
+        resolver = Ar.GetResolver()
+        cached_resolver = Ar.GetUnderlyingResolver()
+        ctx = CachedResolver.ResolverContext()
+        ctx.AddMappingPair("statistics/mapped.usd", "/some/path/to/mapped.usd")
+        ctx.AddCachingPair("statistics/cached.usd", "/some/path/to/cached.usd")
+        cached_resolver.ResetStatistics()
+        with Ar.ResolverContextBinder(ctx):
+            resolver.Resolve("statistics/mapped.usd")
+            resolver.Resolve("statistics/cached.usd")
+            resolver.Resolve("statistics/queried.usd")
+        statistics = cached_resolver.GetStatistics()
+        self.assertEqual(statistics["counters"]["resolves"], 3)
+        self.assertEqual(statistics["counters"]["mappingPairHits"], 1)
+        self.assertEqual(statistics["counters"]["cachingPairHits"], 1)
+        self.assertEqual(statistics["counters"]["pythonQueries"], 1)
+        python_latency = statistics["latencies"]["pythonResolveAndCache"]
+        self.assertEqual(python_latency["count"], 1)
+        self.assertEqual(sum(python_latency["histogram"].values()), 1)
+        self.assertGreaterEqual(python_latency["totalTime"], python_latency["maxTime"])
+        self.assertEqual(statistics["latencies"]["queryLockWait"]["count"], 1)
+        cached_resolver.ResetStatistics()
+        statistics = cached_resolver.GetStatistics()
+        self.assertEqual(statistics["counters"]["resolves"], 0)
+        self.assertEqual(statistics["latencies"]["pythonResolveAndCache"]["histogram"], {})
+
+    def test_PythonExposeTracing(self):
+        resolver = Ar.GetResolver()
+        resolve_and_cache = PythonExpose.ResolverContext.ResolveAndCache
+        self.assertFalse(PythonExpose.IsTracingEnabled())
+        PythonExpose.ResetTracingStatistics()
+        PythonExpose.EnableTracing()
+        try:
+            self.assertIsNot(PythonExpose.ResolverContext.ResolveAndCache, resolve_and_cache)
+            ctx = CachedResolver.ResolverContext()
+            with Ar.ResolverContextBinder(ctx):
+                resolver.Resolve("tracingA.usd")
+                resolver.Resolve("tracingB.usd")
+            statistics = PythonExpose.GetTracingStatistics()
+            self.assertEqual(statistics["ResolverContext.ResolveAndCache"]["callCount"], 2)
+            self.assertEqual(sum(statistics["ResolverContext.ResolveAndCache"]["histogram"].values()), 2)
+            self.assertIn("ResolverContext.ResolveAndCache", PythonExpose.DumpTracingStatistics())
+            self.assertIn("ResolverContext.ResolveAndCache", PythonExpose.DumpTracingStatistics("json"))
+            with self.assertRaises(ValueError):
+                PythonExpose.DumpTracingStatistics("xml")
+        finally:
+            PythonExpose.DisableTracing()
+        # Disabling restores the undecorated functions
+        self.assertIs(PythonExpose.ResolverContext.ResolveAndCache, resolve_and_cache)
+        PythonExpose.ResetTracingStatistics()
+        self.assertEqual(PythonExpose.GetTracingStatistics(), {})
+
     def test_ResolveAbsoluteIdentifier(self):
         with tempfile.TemporaryDirectory() as temp_dir_path:
             # Get resolver
@@ -534,6 +656,58 @@ class TestArResolver(unittest.TestCase):
                 self.assertEqual(ctx.GetMappingPairs(), {asset_a_identifier: asset_c_layer_file_path})
                 self.assertEqual(PythonExpose.UnitTestHelper.context_initialize_call_counter, 2)
 
+    def test_ResolverPersistentCache(self):
+        with tempfile.TemporaryDirectory() as temp_dir_path:
+            # Reset UnitTestHelper
+            PythonExpose.UnitTestHelper.reset(current_directory_path=temp_dir_path)
+            # Create mapping file
+            mapping_file_path = os.path.join(temp_dir_path, "mapping.usd")
+            mapping_layer = Sdf.Layer.CreateAnonymous()
+            mapping_layer.customLayerData = {
+                CachedResolver.Tokens.mappingPairs: Vt.StringArray(["assetA.usd", "/some/path/to/assetA.usd"])
+            }
+            mapping_layer.Export(mapping_file_path)
+            cache_dir_path = os.path.join(temp_dir_path, "cache")
+            os.environ["AR_PERSISTENT_CACHE_DIR"] = cache_dir_path
+            try:
+                resolver = Ar.GetResolver()
+                layer_identifier = "layer.usd"
+                # Populate cache
+                ctx_a = CachedResolver.ResolverContext(mapping_file_path)
+                cache_file_path = ctx_a.GetPersistentCacheFilePath()
+                self.assertTrue(os.path.isfile(cache_file_path))
+                with Ar.ResolverContextBinder(ctx_a):
+                    self.assertEqual(resolver.Resolve(layer_identifier), "/some/path/to/a/file.usd")
+                self.assertEqual(PythonExpose.UnitTestHelper.resolve_and_cache_call_counter, 1)
+                # Load cache (without re-querying Python)
+                ctx_b = CachedResolver.ResolverContext(mapping_file_path)
+                self.assertEqual(ctx_b.GetPersistentCacheFilePath(), cache_file_path)
+                self.assertEqual(ctx_b.GetCachingPairs(), ctx_a.GetCachingPairs())
+                with Ar.ResolverContextBinder(ctx_b):
+                    self.assertEqual(resolver.Resolve(layer_identifier), "/some/path/to/a/file.usd")
+                self.assertEqual(PythonExpose.UnitTestHelper.resolve_and_cache_call_counter, 1)
+                # Only the creating context writes the header, all contexts append to the same file
+                ctx_b.AddCachingPair("assetB.usd", "/some/path/to/assetB.usd")
+                with open(cache_file_path, "r") as cache_file:
+                    cache_lines = cache_file.read().splitlines()
+                self.assertEqual(cache_lines[0], "#" + os.path.abspath(mapping_file_path))
+                self.assertEqual(len([line for line in cache_lines if line.startswith("#")]), 1)
+                self.assertIn("assetB.usd\t/some/path/to/assetB.usd", cache_lines)
+                # Invalidate cache by modifying the mapping file timestamp
+                mapping_file_stat = os.stat(mapping_file_path)
+                os.utime(mapping_file_path, (mapping_file_stat.st_atime, mapping_file_stat.st_mtime + 10))
+                ctx_c = CachedResolver.ResolverContext(mapping_file_path)
+                self.assertNotEqual(ctx_c.GetPersistentCacheFilePath(), cache_file_path)
+                self.assertFalse(os.path.isfile(cache_file_path))
+                # The cleanup of outdated caches keeps the current cache
+                self.assertTrue(os.path.isfile(ctx_c.GetPersistentCacheFilePath()))
+                self.assertEqual(ctx_c.GetCachingPairs(), {'shot.usd': '/some/path/to/a/file.usd'})
+                # Contexts without mapping file don't persist their cache
+                ctx_d = CachedResolver.ResolverContext()
+                self.assertEqual(ctx_d.GetPersistentCacheFilePath(), "")
+            finally:
+                os.environ.pop("AR_PERSISTENT_CACHE_DIR")
+
     def test_ResolveWithContext(self):
         with tempfile.TemporaryDirectory() as temp_dir_path:
             # Create files
@@ -604,6 +778,73 @@ class TestArResolver(unittest.TestCase):
             "CachedResolver.ResolverContext('/some/mapping/file.usd')",
         )
 
+    def test_ResolverContextMappingPairsIncrementalRefresh(self):
+        with tempfile.TemporaryDirectory() as temp_dir_path:
+            # Create mapping file
+            mapping_file_path = os.path.join(temp_dir_path, "mapping.usd")
+            mapping_layer = Sdf.Layer.CreateAnonymous()
+            mapping_layer.customLayerData = {
+                CachedResolver.Tokens.mappingPairs: Vt.StringArray(["a.usd", "a_v001.usd", "b.usd", "b_v001.usd", "c.usd", "c_v001.usd"])
+            }
+            mapping_layer.Export(mapping_file_path)
+            ctx = CachedResolver.ResolverContext(mapping_file_path)
+            ctx.AddCachingPairs({"a.usd": "/a_v001.usd", "b.usd": "/b_v001.usd", "c_alias.usd": "c_v001.usd", "d.usd": "/d.usd"})
+            caching_pairs = ctx.GetCachingPairs()
+            # Mapping pairs added via Python are kept, unless the mapping file changes them
+            ctx.AddMappingPair("e.usd", "e_v001.usd")
+            ctx.AddMappingPair("b.usd", "b_v002.usd")
+            # Edit mapping file
+            mapping_layer.customLayerData = {
+                CachedResolver.Tokens.mappingPairs: Vt.StringArray(["a.usd", "a_v002.usd", "b.usd", "b_v001.usd", "d.usd", "d_v001.usd"])
+            }
+            mapping_layer.Export(mapping_file_path)
+            # Only the changed mapping pairs and affected caching pairs are updated
+            self.assertEqual(sorted(ctx.RefreshFromMappingFilePath()), ["a.usd", "c.usd", "d.usd"])
+            self.assertEqual(
+                ctx.GetMappingPairs(),
+                {"a.usd": "a_v002.usd", "b.usd": "b_v002.usd", "d.usd": "d_v001.usd", "e.usd": "e_v001.usd"},
+            )
+            for source_path in ["a.usd", "c_alias.usd", "d.usd"]:
+                caching_pairs.pop(source_path)
+            self.assertEqual(ctx.GetCachingPairs(), caching_pairs)
+            # Refreshing an unchanged mapping file doesn't change anything
+            self.assertEqual(ctx.RefreshFromMappingFilePath(), [])
+            self.assertEqual(ctx.GetCachingPairs(), caching_pairs)
+            # Re-initializing reloads all mapping file pairs
+            ctx.ClearAndReinitialize()
+            self.assertEqual(
+                ctx.GetMappingPairs(),
+                {"a.usd": "a_v002.usd", "b.usd": "b_v001.usd", "d.usd": "d_v001.usd"},
+            )
+
+    def test_ResolverContextSharedContextReloadKeepsPythonMappingPairs(self):
+        with tempfile.TemporaryDirectory() as temp_dir_path:
+            # Create mapping file
+            mapping_file_path = os.path.join(temp_dir_path, "mapping.usd")
+            mapping_layer = Sdf.Layer.CreateAnonymous()
+            mapping_layer.customLayerData = {
+                CachedResolver.Tokens.mappingPairs: Vt.StringArray(["a.usd", "a_v001.usd"])
+            }
+            mapping_layer.Export(mapping_file_path)
+            resolver = Ar.GetResolver()
+            cached_resolver = Ar.GetUnderlyingResolver()
+            cached_resolver.PurgeSharedContexts(force=True)
+            try:
+                ctx = resolver.CreateDefaultContextForAsset(mapping_file_path).Get()[0]
+                ctx.AddMappingPair("b.usd", "b_v001.usd")
+                # Touch the mapping file, so that the shared context gets reloaded
+                mapping_file_stat = os.stat(mapping_file_path)
+                os.utime(mapping_file_path, (mapping_file_stat.st_atime, mapping_file_stat.st_mtime + 10))
+                PythonExpose.UnitTestHelper.reset()
+                ctx.RemoveCachingByKey("shot.usd")
+                ctx = resolver.CreateDefaultContextForAsset(mapping_file_path).Get()[0]
+                self.assertEqual(ctx.GetMappingPairs(), {"a.usd": "a_v001.usd", "b.usd": "b_v001.usd"})
+                # The reload re-runs the Python initialization
+                self.assertEqual(PythonExpose.UnitTestHelper.context_initialize_call_counter, 1)
+                self.assertEqual(ctx.GetCachingPairs().get("shot.usd"), "/some/path/to/a/file.usd")
+            finally:
+                cached_resolver.PurgeSharedContexts(force=True)
+
     def test_ResolverContextMappingPairs(self):
         with tempfile.TemporaryDirectory() as temp_dir_path:
             # Create mapping file
@@ -647,6 +888,13 @@ class TestArResolver(unittest.TestCase):
             mapping_pairs_updated.pop("example/cube")
             mapping_pairs_updated.pop("example/cylinder")
             self.assertEqual(ctx.GetMappingPairs(), mapping_pairs_updated)
+            # Test bulk add
+            ctx.AddMappingPairs({"example/cube": "example/sphere", "example/cone": "example/triangle"})
+            ctx.AddMappingPairs([("example/cylinder", "example/sphere")])
+            mapping_pairs_updated["example/cube"] = "example/sphere"
+            mapping_pairs_updated["example/cone"] = "example/triangle"
+            mapping_pairs_updated["example/cylinder"] = "example/sphere"
+            self.assertEqual(ctx.GetMappingPairs(), mapping_pairs_updated)
             # Test clear
             ctx.ClearMappingPairs()
             self.assertEqual(ctx.GetMappingPairs(), {})
@@ -678,6 +926,41 @@ class TestArResolver(unittest.TestCase):
             caching_pairs_updated.pop("example/cube")
             caching_pairs_updated.pop("example/cylinder")
             self.assertEqual(ctx.GetCachingPairs(), caching_pairs_updated)
+
+            ctx.AddCachingPair("example/cube", "example/sphere")
+            ctx.AddCachingPair("example/cone", "example/triangle")
+            ctx.AddCachingPair("example/cylinder", "example/cylinder")
+            ctx.RemoveCachingByValues(["example/sphere", "example/triangle"])
+            caching_pairs_updated["example/cylinder"] = "example/cylinder"
+            self.assertEqual(ctx.GetCachingPairs(), caching_pairs_updated)
+            # Test bulk add
+            ctx.AddCachingPairs({"example/cube": "example/sphere", "example/cone": "example/triangle"})
+            ctx.AddCachingPairs([("example/cylinder", "example/sphere")])
+            caching_pairs_updated["example/cube"] = "example/sphere"
+            caching_pairs_updated["example/cone"] = "example/triangle"
+            caching_pairs_updated["example/cylinder"] = "example/sphere"
+            self.assertEqual(ctx.GetCachingPairs(), caching_pairs_updated)
+            with self.assertRaises(ValueError):
+                ctx.AddCachingPairs([("example/cube",)])
+            # Test point lookups and view
+            self.assertTrue(ctx.HasCachingPair("example/cube"))
+            self.assertFalse(ctx.HasCachingPair("example/unknown"))
+            self.assertEqual(ctx.GetCachingPair("example/cube"), "example/sphere")
+            self.assertIsNone(ctx.GetCachingPair("example/unknown"))
+            caching_pairs_view = ctx.GetCachingPairsView()
+            self.assertEqual(len(caching_pairs_view), len(caching_pairs_updated))
+            self.assertEqual(dict(caching_pairs_view.items()), caching_pairs_updated)
+            self.assertEqual(sorted(caching_pairs_view), sorted(caching_pairs_updated))
+            self.assertIn("example/cube", caching_pairs_view)
+            self.assertNotIn("example/unknown", caching_pairs_view)
+            self.assertEqual(caching_pairs_view["example/cube"], "example/sphere")
+            self.assertEqual(caching_pairs_view.get("example/unknown", "fallback"), "fallback")
+            with self.assertRaises(KeyError):
+                caching_pairs_view["example/unknown"]
+            # The view reflects live edits
+            ctx.AddCachingPair("example/torus", "example/donut")
+            self.assertEqual(caching_pairs_view["example/torus"], "example/donut")
+            caching_pairs_updated["example/torus"] = "example/donut"
             # Test clear
             ctx.ClearCachingPairs()
             self.assertEqual(ctx.GetCachingPairs(), {})
@@ -1,4 +1,5 @@
 #include "resolverContext.h"
+#include "wrap_concurrent_string_map.h"
 
 #include "pxr/pxr.h"
 #include "pxr/base/tf/pyUtils.h"
@@ -7,7 +8,10 @@
 #include "boost_include_wrapper.h"
 #include BOOST_INCLUDE(python.hpp)
 
+#include <algorithm>
 #include <string>
+#include <utility>
+#include <vector>
 
 PXR_NAMESPACE_USING_DIRECTIVE
 
@@ -29,11 +33,95 @@ _Repr(const CachedResolverContext& ctx)
             "('" + ctx.GetMappingFilePath() + "')");
 }
 
+static
+std::vector<std::pair<std::string, std::string>>
+_ExtractPairs(const python::object& pairs)
+{
+    // Accepts dicts as well as any iterable of (source, target) pairs.
+    std::vector<std::pair<std::string, std::string>> result;
+    if (PyDict_Check(pairs.ptr())) {
+        result.reserve(PyDict_Size(pairs.ptr()));
+        PyObject* key;
+        PyObject* value;
+        Py_ssize_t pos = 0;
+        while (PyDict_Next(pairs.ptr(), &pos, &key, &value)) {
+            result.emplace_back(
+                python::extract<std::string>(key)(),
+                python::extract<std::string>(value)());
+        }
+        return result;
+    }
+    result.reserve(std::max<Py_ssize_t>(PyObject_LengthHint(pairs.ptr(), 0), 0));
+    python::stl_input_iterator<python::object> it(pairs), end;
+    for (; it != end; ++it) {
+        const python::object pair = *it;
+        if (python::len(pair) != 2) {
+            TfPyThrowValueError("Expected (source, target) pairs");
+        }
+        result.emplace_back(
+            python::extract<std::string>(pair[0])(),
+            python::extract<std::string>(pair[1])());
+    }
+    return result;
+}
+
+static
+void
+_AddMappingPairs(CachedResolverContext& ctx, const python::object& pairs)
+{
+    ctx.AddMappingPairs(_ExtractPairs(pairs));
+}
+
+static
+void
+_AddCachingPairs(CachedResolverContext& ctx, const python::object& pairs)
+{
+    ctx.AddCachingPairs(_ExtractPairs(pairs));
+}
+
+static
+python::object
+_GetMappingPair(const CachedResolverContext& ctx, const std::string& sourceStr)
+{
+    std::string targetStr;
+    if (!ctx.FindMappingPair(sourceStr, targetStr)) {
+        return python::object();
+    }
+    return python::object(targetStr);
+}
+
+static
+ConcurrentStringMapView<CachedResolverContext>
+_GetMappingPairsView(const CachedResolverContext& ctx)
+{
+    return ConcurrentStringMapView<CachedResolverContext>(ctx.GetMappingPairsView());
+}
+
+static
+python::object
+_GetCachingPair(const CachedResolverContext& ctx, const std::string& sourceStr)
+{
+    std::string targetStr;
+    if (!ctx.FindCachingPair(sourceStr, targetStr)) {
+        return python::object();
+    }
+    return python::object(targetStr);
+}
+
+static
+ConcurrentStringMapView<CachedResolverContext>
+_GetCachingPairsView(const CachedResolverContext& ctx)
+{
+    return ConcurrentStringMapView<CachedResolverContext>(ctx.GetCachingPairsView());
+}
+
 void
 wrapResolverContext()
 {
     using This = CachedResolverContext;
 
+    ConcurrentStringMapView<This>::Wrap("PairsView");
+
     python::class_<This>("ResolverContext", python::no_init)
         .def(python::init<>())
         .def(python::init<const std::string&>(python::args("mappingFile")))
@@ -44,17 +132,28 @@ wrapResolverContext()
         .def("ClearAndReinitialize", &This::ClearAndReinitialize, "Clear mapping and cache pairs and re-initialize context (with mapping file path)")
         .def("GetMappingFilePath", &This::GetMappingFilePath, python::return_value_policy<python::return_by_value>(), "Get the mapping file path (Defaults to file that the context created via Resolver.CreateDefaultContextForAsset() opened")
         .def("SetMappingFilePath", &This::SetMappingFilePath, "Set the mapping file path")
-        .def("RefreshFromMappingFilePath", &This::RefreshFromMappingFilePath, "Reload mapping pairs from the mapping file path")
+        .def("RefreshFromMappingFilePath", &This::RefreshFromMappingFilePath, python::return_value_policy<python::return_by_value>(), "Reload mapping pairs from the mapping file path, only the changed pairs are updated and only the affected cache pairs are removed. Returns the changed source paths")
+        .def("GetPersistentCacheFilePath", &This::GetPersistentCacheFilePath, python::return_value_policy<python::return_by_value>(), "Get the on-disk caching pairs cache file path (Empty if the persistent cache is disabled)")
         .def("GetMappingPairs", &This::GetMappingPairs, python::return_value_policy<python::return_by_value>(), "Returns all mapping pairs as a dict")
+        .def("GetMappingPairsView", _GetMappingPairsView, "Returns a read-only dict-like view of all mapping pairs, that doesn't copy the pairs")
+        .def("GetMappingPair", _GetMappingPair, "Returns the target of a mapping pair by key or None")
+        .def("HasMappingPair", &This::HasMappingPair, "Check if a mapping pair with the given key exists")
         .def("AddMappingPair", &This::AddMappingPair, "Add a mapping pair")
+        .def("AddMappingPairs", _AddMappingPairs, "Add multiple mapping pairs from a dict or a list of (source, target) pairs")
         .def("RemoveMappingByKey", &This::RemoveMappingByKey, "Remove a mapping pair by key")
         .def("RemoveMappingByValue", &This::RemoveMappingByValue, "Remove a mapping pair by value")
         .def("ClearMappingPairs", &This::ClearMappingPairs, "Clear all mapping pairs")
         .def("GetCachingPairs", &This::GetCachingPairs, python::return_value_policy<python::return_by_value>(), "Returns all caching pairs as a dict")
+        .def("GetCachingPairsView", _GetCachingPairsView, "Returns a read-only dict-like view of all caching pairs, that doesn't copy the pairs")
+        .def("GetCachingPair", _GetCachingPair, "Returns the target of a caching pair by key or None")
+        .def("HasCachingPair", &This::HasCachingPair, "Check if a caching pair with the given key exists")
         .def("AddCachingPair", &This::AddCachingPair, "Add a caching pair")
+        .def("AddCachingPairs", _AddCachingPairs, "Add multiple caching pairs from a dict or a list of (source, target) pairs")
         .def("RemoveCachingByKey", &This::RemoveCachingByKey, "Remove a caching pair by key")
         .def("RemoveCachingByValue", &This::RemoveCachingByValue, "Remove a caching pair by value")
+        .def("RemoveCachingByValues", &This::RemoveCachingByValues, "Remove all caching pairs that have one of the given values")
         .def("ClearCachingPairs", &This::ClearCachingPairs, "Clear all caching pairs")
+        .def("GetMemoryUsage", &This::GetMemoryUsage, "Get an estimate of the memory (in bytes) held by the context data")
     ;
     ArWrapResolverContextForPython<This>();
 }
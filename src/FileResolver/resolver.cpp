@@ -15,9 +15,12 @@
 #include "pxr/usd/ar/filesystemWritableAsset.h"
 #include "pxr/usd/ar/notice.h"
 
+#include <algorithm>
+#include <chrono>
 #include <fstream>
 #include <iostream>
 #include <map>
+#include <optional>
 #include <string>
 #include <regex>
 
@@ -73,8 +76,22 @@ _ResolveAnchored(
     return TfPathExists(resolvedPath) ? ArResolvedPath(TfAbsPath(resolvedPath)) : ArResolvedPath();
 }
 
+static ArResolvedPath
+_ResolveAnchored(
+    const std::string& anchorPath,
+    const std::string& path,
+    const FileResolverContext& ctx)
+{
+    // Same as above, but the existence check runs through the context's existence cache.
+    const std::string resolvedPath = TfStringCatPaths(anchorPath, path);
+    return ctx.PathExists(resolvedPath) ? ArResolvedPath(TfAbsPath(resolvedPath)) : ArResolvedPath();
+}
+
 FileResolver::FileResolver() {
     this->SetExposeAbsolutePathIdentifierState(TfGetenvBool(DEFINE_STRING(AR_FILERESOLVER_ENV_EXPOSE_ABSOLUTE_PATH_IDENTIFIERS), false));
+    this->SetSharedContextCapacity(std::max(0, TfGetenvInt(DEFINE_STRING(AR_ENV_SHARED_CONTEXT_CAPACITY), 0)));
+    this->SetSharedContextMemoryLimit(static_cast<size_t>(std::max(0, TfGetenvInt(DEFINE_STRING(AR_ENV_SHARED_CONTEXT_MEMORY_LIMIT), 0))) * 1024 * 1024);
+    this->SetSharedContextRevalidationInterval(TfGetenvDouble(DEFINE_STRING(AR_ENV_SHARED_CONTEXT_REVALIDATION_INTERVAL), 0.0));
 
 };
     
@@ -127,6 +144,52 @@ FileResolver::_CreateIdentifierForNewAsset(
     return TfNormPath(assetPath);
 }
 
+ArResolvedPath
+FileResolver::_ResolveWithContext(
+    const std::string& assetPath,
+    const FileResolverContext& ctx,
+    const bool exposeAbsolutePathIdentifierState) const
+{
+    std::string mappedPath = assetPath;
+    const bool hasMappingPairs = ctx.HasMappingPairs();
+    if (hasMappingPairs){
+        // Paths that don't contain the regex expression's required literal can't
+        // match it, so we can skip the (comparatively slow) regex evaluation.
+        if (!ctx.GetMappingRegexExpressionStr().empty() &&
+            mappedPath.find(ctx.GetMappingRegexRequiredLiteral()) != std::string::npos)
+        {
+            mappedPath = std::regex_replace(mappedPath,
+                                            ctx.GetMappingRegexExpression(),
+                                            ctx.GetMappingRegexFormat());
+            TF_DEBUG(FILERESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s')"
+                                                        " - Mapped to '%s' via regex expression '%s' with formatting '%s'\n", 
+                                                        assetPath.c_str(),
+                                                        mappedPath.c_str(),
+                                                        ctx.GetMappingRegexExpressionStr().c_str(),
+                                                        ctx.GetMappingRegexFormat().c_str());
+        }
+    }
+    std::string targetStr;
+    if (hasMappingPairs && ctx.FindMappingPair(mappedPath, targetStr)){
+        _statistics.Increment(FileResolverCounter::MappingPairHits);
+        mappedPath = targetStr;
+    }
+
+    if (exposeAbsolutePathIdentifierState) {
+        if (!_IsSearchPath(mappedPath)){
+            return _ResolveAnchored(std::string(), mappedPath);
+        }
+    }
+
+    for (const auto& searchPath : ctx.GetSearchPaths()) {
+        ArResolvedPath resolvedPath = _ResolveAnchored(searchPath, mappedPath, ctx);
+        if (resolvedPath) {
+            return resolvedPath;
+        }
+    }
+    return _ResolveAnchored(std::string(), assetPath);
+}
+
 ArResolvedPath
 FileResolver::_Resolve(
     const std::string& assetPath) const
@@ -135,45 +198,46 @@ FileResolver::_Resolve(
         return ArResolvedPath();
     }
 
+    _statistics.Increment(FileResolverCounter::Resolves);
+    if (_CachePtr currentCache = this->_GetCurrentCache()) {
+        std::string resolvedPathStr;
+        if (currentCache->resolvedPaths.Find(assetPath, resolvedPathStr)) {
+            _statistics.Increment(FileResolverCounter::ScopedCacheHits);
+            return ArResolvedPath(resolvedPathStr);
+        }
+        const ArResolvedPath resolvedPath = this->_ResolveUncached(assetPath);
+        currentCache->resolvedPaths.Insert(assetPath, resolvedPath.GetPathString());
+        return resolvedPath;
+    }
+    return this->_ResolveUncached(assetPath);
+}
+
+ArResolvedPath
+FileResolver::_ResolveUncached(
+    const std::string& assetPath) const
+{
+    ScopedLatency resolveLatency(_statistics.GetLatency(FileResolverLatency::ResolveUncached));
     if (this->_IsContextDependentPath(assetPath)) {
         const FileResolverContext* contexts[2] = {this->_GetCurrentContextPtr(), &_fallbackContext};
         for (const FileResolverContext* ctx : contexts) {
             if (ctx) {
-                auto &mappingPairs = ctx->GetMappingPairs();
-                std::string mappedPath = assetPath;
-                if (!mappingPairs.empty()){
-                    if (!ctx->GetMappingRegexExpressionStr().empty())
-                    {
-                        mappedPath = std::regex_replace(mappedPath,
-                                                        ctx->GetMappingRegexExpression(),
-                                                        ctx->GetMappingRegexFormat());
-                        TF_DEBUG(FILERESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s')"
-                                                                    " - Mapped to '%s' via regex expression '%s' with formatting '%s'\n", 
-                                                                    assetPath.c_str(),
-                                                                    mappedPath.c_str(),
-                                                                    ctx->GetMappingRegexExpressionStr().c_str(),
-                                                                    ctx->GetMappingRegexFormat().c_str());
-                    }
+                // Only the first valid context is used.
+                const bool exposeAbsolutePathIdentifierState = this->exposeAbsolutePathIdentifierState;
+                if (!ctx->IsResolveMemoEnabled()) {
+                    return this->_ResolveWithContext(assetPath, *ctx, exposeAbsolutePathIdentifierState);
                 }
-                auto map_find = mappingPairs.find(mappedPath);
-                if(map_find != mappingPairs.end()){
-                    mappedPath = map_find->second;
+                std::string memoResolvedPath;
+                if (ctx->FindResolveMemo(assetPath, exposeAbsolutePathIdentifierState, memoResolvedPath)) {
+                    _statistics.Increment(FileResolverCounter::ResolveMemoHits);
+                    return ArResolvedPath(memoResolvedPath);
                 }
-
-                if (this->exposeAbsolutePathIdentifierState) {
-                    if (!_IsSearchPath(mappedPath)){
-                        return _ResolveAnchored(std::string(), mappedPath);;
-                    }
-                }
-
-                for (const auto& searchPath : ctx->GetSearchPaths()) {
-                    ArResolvedPath resolvedPath = _ResolveAnchored(searchPath, mappedPath);
-                    if (resolvedPath) {
-                        return resolvedPath;
-                    }
-                }
-                // Only try the first valid context.
-                break;
+                _statistics.Increment(FileResolverCounter::ResolveMemoMisses);
+                // The revision has to be queried before resolving, so that results
+                // computed from outdated context data don't get memorized.
+                const size_t revision = ctx->GetRevision();
+                const ArResolvedPath resolvedPath = this->_ResolveWithContext(assetPath, *ctx, exposeAbsolutePathIdentifierState);
+                ctx->AddResolveMemo(assetPath, exposeAbsolutePathIdentifierState, resolvedPath.GetPathString(), revision);
+                return resolvedPath;
             }
         }
     }
@@ -210,10 +274,7 @@ FileResolver::_CreateDefaultContextForAsset(
     if (assetPath.empty()){
         return ArResolverContext(_fallbackContext);
     }
-    ArResolvedPath resolvedPath = this->_Resolve(assetPath);
-    if (!TfPathExists(resolvedPath)){
-        return ArResolverContext(_fallbackContext);
-    }
+    // Reuse the bound context before touching the file system.
     if (this->_GetCurrentContextPtr() != nullptr)
     {
         if (TfDebug::IsEnabled(FILERESOLVER_RESOLVER_CONTEXT))
@@ -229,27 +290,50 @@ FileResolver::_CreateDefaultContextForAsset(
         }
         return ArResolverContext(*this->_GetCurrentContextPtr());
     }
-    auto map_iter = _sharedContexts.find(resolvedPath);
-    if(map_iter != _sharedContexts.end()){
-        if (map_iter->second.timestamp.GetTime() == this->_GetModificationTimestamp(assetPath, resolvedPath).GetTime())
-        {
-            TF_DEBUG(FILERESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Reusing context on different stage\n", assetPath.c_str());
-            return ArResolverContext(map_iter->second.ctx);
-        }else{
-            TF_DEBUG(FILERESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Reusing context on different stage, reloading due to changed timestamp\n", assetPath.c_str());
-            map_iter->second.ctx.RefreshFromMappingFilePath();
-            return ArResolverContext(map_iter->second.ctx);
+    ArResolvedPath resolvedPath = this->_Resolve(assetPath);
+    // Shared contexts that were validated recently are reused without
+    // re-checking the mapping file's existence and timestamp.
+    const std::chrono::steady_clock::time_point now = std::chrono::steady_clock::now();
+    const std::chrono::duration<double> revalidationInterval(_sharedContextRevalidationInterval.load());
+    if (revalidationInterval.count() > 0.0) {
+        std::optional<FileResolverContextRecord> validRecord = _sharedContexts.FindIf(resolvedPath,
+            [&](const FileResolverContextRecord& record) { return now - record.validationTime < revalidationInterval; });
+        if (validRecord) {
+            TF_DEBUG(FILERESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Reusing recently validated context on different stage\n", assetPath.c_str());
+            return ArResolverContext(validRecord->ctx);
         }
     }
-    // Create new context
-    TF_DEBUG(FILERESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Constructing new context\n", assetPath.c_str());
-    std::string resolvedPathStr = resolvedPath.GetPathString();
-    std::string assetDir = TfGetPathName(TfAbsPath(resolvedPathStr));
-    struct FileResolverContextRecord record
-    {
-        this->_GetModificationTimestamp(assetPath, resolvedPath), FileResolverContext(resolvedPath, std::vector<std::string>(1, assetDir))
-    };
-    _sharedContexts.insert(std::pair<std::string, FileResolverContextRecord>(resolvedPath, record));
+    if (!TfPathExists(resolvedPath)){
+        return ArResolverContext(_fallbackContext);
+    }
+    // The shared contexts are constructed only once per mapping file, concurrent
+    // stage opens of the same mapping file wait for the first one to finish.
+    const ArTimestamp timestamp = this->_GetModificationTimestamp(assetPath, resolvedPath);
+    std::vector<std::string> changedSourceStrs;
+    FileResolverContextRecord record = _sharedContexts.GetOrCreate(resolvedPath,
+        [&]() {
+            TF_DEBUG(FILERESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Constructing new context\n", assetPath.c_str());
+            std::string resolvedPathStr = resolvedPath.GetPathString();
+            std::string assetDir = TfGetPathName(TfAbsPath(resolvedPathStr));
+            return FileResolverContextRecord{timestamp, FileResolverContext(resolvedPath, std::vector<std::string>(1, assetDir)), now};
+        },
+        [&](FileResolverContextRecord& record) {
+            record.validationTime = now;
+            if (record.timestamp.GetTime() == timestamp.GetTime())
+            {
+                TF_DEBUG(FILERESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Reusing context on different stage\n", assetPath.c_str());
+            }else{
+                TF_DEBUG(FILERESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Reusing context on different stage, reloading due to changed timestamp\n", assetPath.c_str());
+                changedSourceStrs = record.ctx.RefreshFromMappingFilePath();
+                record.timestamp = timestamp;
+            }
+        });
+    // Only the stages that use the reloaded context are notified,
+    // and only if the reload actually changed any mapping pairs.
+    if (!changedSourceStrs.empty()) {
+        TF_DEBUG(FILERESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Reloaded %zu changed mapping pairs\n", assetPath.c_str(), changedSourceStrs.size());
+        ArNotice::ResolverChanged(record.ctx).Send();
+    }
     return ArResolverContext(record.ctx);
 }
 
@@ -273,6 +357,12 @@ FileResolver::_RefreshContext(
     if (!ctx) {
         return;
     }
+    ctx->ClearExistenceCache();
+    ctx->ClearSearchPathIndex();
+    // Refreshed contexts have to be re-resolved, even within a cache scope.
+    if (_CachePtr currentCache = this->_GetCurrentCache()) {
+        currentCache->resolvedPaths.Clear();
+    }
     ArNotice::ResolverChanged(*ctx).Send();
 }
 
@@ -309,6 +399,26 @@ FileResolver::_OpenAssetForWrite(
     return ArFilesystemWritableAsset::Create(resolvedPath, writeMode);
 }
 
+void
+FileResolver::_BeginCacheScope(
+    VtValue* cacheScopeData)
+{
+    _threadCache.BeginCacheScope(cacheScopeData);
+}
+
+void
+FileResolver::_EndCacheScope(
+    VtValue* cacheScopeData)
+{
+    _threadCache.EndCacheScope(cacheScopeData);
+}
+
+FileResolver::_CachePtr
+FileResolver::_GetCurrentCache() const
+{
+    return _threadCache.GetCurrentCache();
+}
+
 const FileResolverContext* 
 FileResolver::_GetCurrentContextPtr() const
 {
@@ -4,24 +4,47 @@
 #include "api.h"
 #include "debugCodes.h"
 #include "resolverContext.h"
+#include "resolver_statistics.h"
+#include "shared_context_registry.h"
 
 #include "pxr/pxr.h"
 #include "pxr/usd/ar/resolver.h"
+#include "pxr/usd/ar/threadLocalScopedCache.h"
 
+#include <atomic>
+#include <chrono>
 #include <memory>
 #include <string>
 #include <map>
+#include <vector>
 
 PXR_NAMESPACE_OPEN_SCOPE
 
+enum class FileResolverCounter
+{
+    Resolves,
+    ScopedCacheHits,
+    ResolveMemoHits,
+    ResolveMemoMisses,
+    MappingPairHits,
+    Count
+};
+
+enum class FileResolverLatency
+{
+    ResolveUncached,
+    Count
+};
+
+using FileResolverStatistics = ResolverStatistics<FileResolverCounter, FileResolverLatency>;
+
 struct FileResolverContextRecord
 {
     ArTimestamp timestamp;
     FileResolverContext ctx;
+    std::chrono::steady_clock::time_point validationTime;
 };
 
-static std::map<std::string, FileResolverContextRecord> _sharedContexts;
-
 class FileResolver final : public ArResolver
 {
 public:
@@ -39,6 +62,40 @@ public:
             this->exposeAbsolutePathIdentifierState = state;
         }
     }
+    AR_FILERESOLVER_API
+    size_t GetResolveMemoHitCount() const { return _statistics.GetCounter(FileResolverCounter::ResolveMemoHits); }
+    AR_FILERESOLVER_API
+    size_t GetResolveMemoMissCount() const { return _statistics.GetCounter(FileResolverCounter::ResolveMemoMisses); }
+    AR_FILERESOLVER_API
+    void ResetResolveMemoCounters() {
+        _statistics.Reset(FileResolverCounter::ResolveMemoHits);
+        _statistics.Reset(FileResolverCounter::ResolveMemoMisses);
+    }
+    AR_FILERESOLVER_API
+    const FileResolverStatistics& GetStatistics() const { return _statistics; }
+    AR_FILERESOLVER_API
+    void ResetStatistics() { _statistics.Reset(); }
+
+    AR_FILERESOLVER_API
+    std::vector<std::string> GetSharedContextMappingFilePaths() const { return _sharedContexts.Keys(); }
+    AR_FILERESOLVER_API
+    size_t GetSharedContextMemoryUsage() const { return _sharedContexts.GetMemoryUsage(); }
+    AR_FILERESOLVER_API
+    size_t GetSharedContextCapacity() const { return _sharedContexts.GetCapacity(); }
+    AR_FILERESOLVER_API
+    void SetSharedContextCapacity(size_t capacity) { _sharedContexts.SetCapacity(capacity); }
+    AR_FILERESOLVER_API
+    size_t GetSharedContextMemoryLimit() const { return _sharedContexts.GetMemoryLimit(); }
+    AR_FILERESOLVER_API
+    void SetSharedContextMemoryLimit(size_t memoryLimit) { _sharedContexts.SetMemoryLimit(memoryLimit); }
+    AR_FILERESOLVER_API
+    double GetSharedContextRevalidationInterval() const { return _sharedContextRevalidationInterval.load(); }
+    AR_FILERESOLVER_API
+    void SetSharedContextRevalidationInterval(double seconds) { _sharedContextRevalidationInterval.store(seconds > 0.0 ? seconds : 0.0); }
+    AR_FILERESOLVER_API
+    bool RemoveSharedContext(const std::string& mappingFilePath) { return _sharedContexts.Erase(mappingFilePath); }
+    AR_FILERESOLVER_API
+    size_t PurgeSharedContexts(bool force) { return _sharedContexts.Purge(force); }
 
 protected:
     AR_FILERESOLVER_API
@@ -87,11 +144,46 @@ protected:
     std::shared_ptr<ArWritableAsset> _OpenAssetForWrite(
         const ArResolvedPath& resolvedPath,
         WriteMode writeMode) const final;
+
+    AR_FILERESOLVER_API
+    void _BeginCacheScope(
+        VtValue* cacheScopeData) final;
+
+    AR_FILERESOLVER_API
+    void _EndCacheScope(
+        VtValue* cacheScopeData) final;
     
 private:
+    // The scoped cache stores the results of resolving identifiers for the
+    // lifetime of an ArResolverScopedCache, so that e.g. a stage open only
+    // resolves each identifier once.
+    struct _Cache
+    {
+        ConcurrentStringMap resolvedPaths;
+    };
+    using _PerThreadCache = ArThreadLocalScopedCache<_Cache>;
+    using _CachePtr = _PerThreadCache::CachePtr;
+    _CachePtr _GetCurrentCache() const;
+
     const FileResolverContext* _GetCurrentContextPtr() const;
+    ArResolvedPath _ResolveUncached(
+        const std::string& assetPath) const;
+    ArResolvedPath _ResolveWithContext(
+        const std::string& assetPath,
+        const FileResolverContext& ctx,
+        const bool exposeAbsolutePathIdentifierState) const;
     FileResolverContext _fallbackContext;
+    mutable SharedContextRegistry<FileResolverContextRecord> _sharedContexts{
+        [](FileResolverContextRecord const& record) { return record.ctx.GetUseCount() > 1; },
+        [](FileResolverContextRecord const& record) { return record.ctx.GetMemoryUsage(); }
+    };
+    std::atomic<double> _sharedContextRevalidationInterval{0.0};
     bool exposeAbsolutePathIdentifierState{false};
+    mutable FileResolverStatistics _statistics{
+        {"resolves", "scopedCacheHits", "resolveMemoHits", "resolveMemoMisses", "mappingPairHits"},
+        {"resolveUncached"}
+    };
+    mutable _PerThreadCache _threadCache;
 };
 
 PXR_NAMESPACE_CLOSE_SCOPE
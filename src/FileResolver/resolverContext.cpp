@@ -3,45 +3,25 @@
 
 #include "resolverContext.h"
 #include "resolverTokens.h"
+#include "mapping_pairs_file.h"
 
 #include "pxr/pxr.h"
+#include "pxr/base/tf/fileUtils.h"
 #include "pxr/base/tf/getenv.h"
 #include "pxr/base/tf/pathUtils.h"
-#include "pxr/usd/sdf/layer.h"
+#include "pxr/base/tf/stringUtils.h"
 
 #include <iostream>
 #include <vector>
 
 PXR_NAMESPACE_USING_DIRECTIVE
 
-bool getStringEndswithString(const std::string &value, const std::string &compareValue)
-{
-    if (compareValue.size() > value.size())
-    {
-        return false;
-    }
-    if (std::equal(compareValue.rbegin(), compareValue.rend(), value.rbegin()))
-    {
-        return true;
-    }
-    return false;
-}
-
-bool getStringEndswithStrings(const std::string &value, const std::vector<std::string> array)
-{
-    for (int i=0; i < array.size(); i++)
-    {
-        if (getStringEndswithString(value, array[i]))
-        {
-            return true;
-        }
-    }
-    return false;
-}
-
 FileResolverContext::FileResolverContext() {
     // Init
     this->_LoadEnvMappingRegex();
+    this->_LoadEnvExistenceCacheTTL();
+    this->_LoadEnvSearchPathIndexState();
+    this->_LoadEnvResolveMemoCapacity();
     this->RefreshSearchPaths();
 }
 
@@ -52,6 +32,9 @@ FileResolverContext::FileResolverContext(const std::string& mappingFilePath)
     TF_DEBUG(FILERESOLVER_RESOLVER_CONTEXT).Msg("ResolverContext::ResolverContext('%s') - Creating new context\n", mappingFilePath.c_str());
     // Init
     this->_LoadEnvMappingRegex();
+    this->_LoadEnvExistenceCacheTTL();
+    this->_LoadEnvSearchPathIndexState();
+    this->_LoadEnvResolveMemoCapacity();
     this->RefreshSearchPaths();
     this->SetMappingFilePath(TfAbsPath(mappingFilePath));
     this->_GetMappingPairsFromUsdFile(this->GetMappingFilePath());
@@ -62,6 +45,9 @@ FileResolverContext::FileResolverContext(const std::vector<std::string>& searchP
     TF_DEBUG(FILERESOLVER_RESOLVER_CONTEXT).Msg("ResolverContext::ResolverContext() - Creating new context with custom search paths\n");
     // Init
     this->_LoadEnvMappingRegex();
+    this->_LoadEnvExistenceCacheTTL();
+    this->_LoadEnvSearchPathIndexState();
+    this->_LoadEnvResolveMemoCapacity();
     this->SetCustomSearchPaths(searchPaths);
     this->RefreshSearchPaths();
 }
@@ -71,6 +57,9 @@ FileResolverContext::FileResolverContext(const std::string& mappingFilePath, con
     TF_DEBUG(FILERESOLVER_RESOLVER_CONTEXT).Msg("ResolverContext::ResolverContext('%s') - Creating new context with custom search paths\n", mappingFilePath.c_str());
     // Init
     this->_LoadEnvMappingRegex();
+    this->_LoadEnvExistenceCacheTTL();
+    this->_LoadEnvSearchPathIndexState();
+    this->_LoadEnvResolveMemoCapacity();
     this->SetCustomSearchPaths(searchPaths);
     this->RefreshSearchPaths();
     this->SetMappingFilePath(TfAbsPath(mappingFilePath));
@@ -107,11 +96,75 @@ size_t hash_value(const FileResolverContext& ctx)
 void
 FileResolverContext::_LoadEnvMappingRegex()
 {
-    data->mappingRegexExpressionStr = TfGetenv(DEFINE_STRING(AR_ENV_SEARCH_REGEX_EXPRESSION));
-    data->mappingRegexExpression = std::regex(data->mappingRegexExpressionStr);
+    this->SetMappingRegexExpression(TfGetenv(DEFINE_STRING(AR_ENV_SEARCH_REGEX_EXPRESSION)));
     data->mappingRegexFormat = TfGetenv(DEFINE_STRING(AR_ENV_SEARCH_REGEX_FORMAT));
 }
 
+void
+FileResolverContext::_LoadEnvExistenceCacheTTL()
+{
+    const std::string ttlStr = TfGetenv(DEFINE_STRING(AR_FILERESOLVER_ENV_EXISTENCE_CACHE_TTL));
+    if (!ttlStr.empty()) {
+        bool parseSuccess = false;
+        const double ttl = TfStringToDouble(ttlStr, &parseSuccess);
+        if (!parseSuccess) {
+            TF_WARN("Invalid existence cache time to live '%s'", ttlStr.c_str());
+            return;
+        }
+        this->SetExistenceCacheTTL(ttl);
+    }
+}
+
+void
+FileResolverContext::_LoadEnvSearchPathIndexState()
+{
+    this->SetSearchPathIndexState(TfGetenvBool(DEFINE_STRING(AR_FILERESOLVER_ENV_SEARCH_PATH_INDEX), false));
+}
+
+void
+FileResolverContext::_LoadEnvResolveMemoCapacity()
+{
+    const int capacity = TfGetenvInt(DEFINE_STRING(AR_FILERESOLVER_ENV_RESOLVE_MEMO_CAPACITY), 0);
+    this->SetResolveMemoCapacity(capacity > 0 ? static_cast<size_t>(capacity) : 0);
+}
+
+bool
+FileResolverContext::FindResolveMemo(const std::string& assetPath, bool exposeAbsolutePathIdentifierState, std::string& resolvedPath) const
+{
+    FileResolverResolveMemoEntry entry;
+    if (!data->resolveMemo.Find(assetPath, entry) ||
+        entry.exposeAbsolutePathIdentifierState != exposeAbsolutePathIdentifierState) {
+        return false;
+    }
+    resolvedPath = entry.resolvedPath;
+    return true;
+}
+
+void
+FileResolverContext::AddResolveMemo(const std::string& assetPath, bool exposeAbsolutePathIdentifierState, const std::string& resolvedPath, size_t revision) const
+{
+    data->resolveMemo.Insert(assetPath, FileResolverResolveMemoEntry{exposeAbsolutePathIdentifierState, resolvedPath}, revision);
+}
+
+bool
+FileResolverContext::PathExists(const std::string& path) const
+{
+    if (data->searchPathIndex.IsEnabled()) {
+        return data->searchPathIndex.Exists(path, [](const std::string& dirPath, DirectoryListingIndex::Entries& entries){
+            std::vector<std::string> dirNames, fileNames, symlinkNames;
+            if (!TfReadDir(dirPath, &dirNames, &fileNames, &symlinkNames)) {
+                return false;
+            }
+            entries.reserve(dirNames.size() + fileNames.size() + symlinkNames.size());
+            entries.insert(dirNames.begin(), dirNames.end());
+            entries.insert(fileNames.begin(), fileNames.end());
+            entries.insert(symlinkNames.begin(), symlinkNames.end());
+            return true;
+        });
+    }
+    return data->existenceCache.Exists(path, [](const std::string& p){ return TfPathExists(p); });
+}
+
 void
 FileResolverContext::_LoadEnvSearchPaths()
 {
@@ -133,64 +186,59 @@ FileResolverContext::_LoadEnvSearchPaths()
     }
 }
 
-bool FileResolverContext::_GetMappingPairsFromUsdFile(const std::string& filePath)
+std::vector<std::pair<std::string, std::string>> FileResolverContext::_GetMappingPairsFromUsdFile(const std::string& filePath)
 {
-    data->mappingPairs.clear();
-    std::vector<std::string> usdFilePathExts{ ".usd", ".usdc", ".usda" };
-    if (!getStringEndswithStrings(filePath, usdFilePathExts))
+    // We only update the pairs that changed in the mapping file since it was
+    // last loaded, so that reloading a large mapping file after a few edits
+    // doesn't rebuild the whole map. Pairs that don't stem from the mapping
+    // file (e.g. added via AddMappingPair) are kept.
+    std::vector<std::pair<std::string, std::string>> mappingPairs;
+    readMappingPairsFromUsdFile(filePath, FileResolverTokens->mappingPairs,
+                                TfGetenvBool(DEFINE_STRING(AR_ENV_MAPPING_PAIRS_SIDECAR), false),
+                                FILERESOLVER_RESOLVER_CONTEXT, mappingPairs);
+    std::vector<std::pair<std::string, std::string>> changedPairs;
     {
-        return false;
+        const std::lock_guard<std::mutex> lock(data->mappingFileMutex);
+        changedPairs = data->mappingPairs.Assign(mappingPairs, data->mappingFilePairs);
     }
-    auto layer = SdfLayer::FindOrOpen(TfAbsPath(filePath));
-    if (!layer){
-        return false;
+    if (!changedPairs.empty()){
+        data->resolveMemo.Clear();
     }
-    auto layerMetaData = layer->GetCustomLayerData();
-    auto mappingDataPtr = layerMetaData.GetValueAtPath(FileResolverTokens->mappingPairs);
-    if (!mappingDataPtr){
-        return false;
-    }
-    pxr::VtStringArray mappingDataArray = mappingDataPtr->Get<pxr::VtStringArray>();
-    if (mappingDataArray.size() % 2 != 0){
-        return false;
-    }
-    for (size_t i = 0; i < mappingDataArray.size(); i+=2) {
-        this->AddMappingPair(mappingDataArray[i], mappingDataArray[i+1]);
+    return changedPairs;
+}
+
+void FileResolverContext::ClearMappingPairs(){
+    {
+        const std::lock_guard<std::mutex> lock(data->mappingFileMutex);
+        data->mappingPairs.Clear();
+        data->mappingFilePairs.clear();
     }
-    return true;
+    data->resolveMemo.Clear();
 }
 
 void FileResolverContext::AddMappingPair(const std::string& sourceStr, const std::string& targetStr){
-    auto map_find = data->mappingPairs.find(sourceStr);
-    if(map_find != data->mappingPairs.end()){
-        map_find->second = targetStr;
-    }else{
-        data->mappingPairs.insert(std::pair<std::string, std::string>(sourceStr,targetStr));
-    }
+    data->mappingPairs.Insert(sourceStr, targetStr);
+    data->resolveMemo.Clear();
+}
+
+void FileResolverContext::AddMappingPairs(const std::vector<std::pair<std::string, std::string>>& pairs){
+    data->mappingPairs.InsertMany(pairs);
+    data->resolveMemo.Clear();
 }
 
 void FileResolverContext::RemoveMappingByKey(const std::string& sourceStr){
-    const auto &it = data->mappingPairs.find(sourceStr);
-    if (it != data->mappingPairs.end()){
-        data->mappingPairs.erase(it);
-    }
+    data->mappingPairs.Erase(sourceStr);
+    data->resolveMemo.Clear();
 }
 
 void FileResolverContext::RemoveMappingByValue(const std::string& targetStr){
-    for (auto it = data->mappingPairs.cbegin(); it != data->mappingPairs.cend();)
-    {
-        if (it->second == targetStr)
-        {
-            data->mappingPairs.erase(it++);
-        }
-        else
-        {
-            ++it;
-        }
-    }
+    data->mappingPairs.EraseByValue(targetStr);
+    data->resolveMemo.Clear();
 }
 
 void FileResolverContext::RefreshSearchPaths(){
+    data->existenceCache.Clear();
+    data->searchPathIndex.Clear();
     data->searchPaths.clear();
     this->_LoadEnvSearchPaths();
     if (!data->envSearchPaths.empty()) {
@@ -199,6 +247,7 @@ void FileResolverContext::RefreshSearchPaths(){
     if (!data->customSearchPaths.empty()) {
         data->searchPaths.insert(data->searchPaths.end(), data->customSearchPaths.begin(), data->customSearchPaths.end());
     }
+    data->resolveMemo.Clear();
 }
 
 void FileResolverContext::SetCustomSearchPaths(const std::vector<std::string>& searchPaths){
@@ -218,7 +267,31 @@ void FileResolverContext::SetCustomSearchPaths(const std::vector<std::string>& s
     }
 }
 
-void FileResolverContext::RefreshFromMappingFilePath(){
-    this->_GetMappingPairsFromUsdFile(this->GetMappingFilePath());
+size_t FileResolverContext::GetMemoryUsage() const{
+    // This is an estimate, the (bounded) resolve memo, existence cache
+    // and search path index are not accounted for.
+    size_t memoryUsage = sizeof(FileResolverContextInternalData);
+    memoryUsage += data->mappingPairs.GetMemoryUsage();
+    {
+        const std::lock_guard<std::mutex> lock(data->mappingFileMutex);
+        for (const auto& pair : data->mappingFilePairs) {
+            memoryUsage += sizeof(pair) + pair.first.capacity() + pair.second.capacity();
+        }
+    }
+    for (const std::vector<std::string>* paths : {&data->searchPaths, &data->envSearchPaths, &data->customSearchPaths}) {
+        for (const std::string& path : *paths) {
+            memoryUsage += sizeof(std::string) + path.capacity();
+        }
+    }
+    memoryUsage += data->mappingFilePath.capacity() + data->mappingRegexExpressionStr.capacity() + data->mappingRegexFormat.capacity();
+    return memoryUsage;
+}
+
+std::vector<std::string> FileResolverContext::RefreshFromMappingFilePath(){
+    std::vector<std::string> changedSourceStrs;
+    for (const auto& pair : this->_GetMappingPairsFromUsdFile(this->GetMappingFilePath())){
+        changedSourceStrs.push_back(pair.first);
+    }
+    return changedSourceStrs;
 }
 
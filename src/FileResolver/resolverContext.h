@@ -3,15 +3,23 @@
 
 #include "api.h"
 #include "debugCodes.h"
+#include "concurrent_string_map.h"
+#include "directory_listing_index.h"
+#include "lru_cache.h"
+#include "path_existence_cache.h"
+#include "regex_prefilter.h"
 
 #include "pxr/pxr.h"
 #include "pxr/usd/ar/defineResolverContext.h"
 #include "pxr/usd/ar/resolverContext.h"
 
 #include <memory>
+#include <mutex>
 #include <regex>
 #include <string>
 #include <map>
+#include <utility>
+#include <vector>
 
 /* Data Model
 We use an internal data struct that is accessed via a shared pointer
@@ -20,17 +28,40 @@ instead of passing thru the pointer. This way we can send
 > ArNotice::ResolverChanged(*ctx).Send();
 notifications to the stages.
 > See for more info: https://groups.google.com/g/usd-interest/c/9JrXGGbzBnQ/m/_f3oaqBdAwAJ
+The existence cache stores the results of search path file system probes,
+it is disabled by default, see PathExistenceCache for more information.
+The search path index replaces these probes with lookups into lazily listed
+directories, it is disabled by default, see DirectoryListingIndex for more
+information. If enabled, it takes precedence over the existence cache.
+The resolve memo stores the results of resolving context dependent paths,
+it is disabled by default. Any change to the context's data clears it (and
+thereby bumps the context's revision), so that it never returns results
+computed from outdated mapping pairs, regex settings or search paths.
 */
+struct FileResolverResolveMemoEntry
+{
+    bool exposeAbsolutePathIdentifierState;
+    std::string resolvedPath;
+};
+
 struct FileResolverContextInternalData
 {
     std::vector<std::string> searchPaths;
     std::vector<std::string> envSearchPaths;
     std::vector<std::string> customSearchPaths;
     std::string mappingFilePath;
-    std::map<std::string, std::string> mappingPairs;
+    ConcurrentStringMap mappingPairs;
+    // The mapping pairs loaded from the mapping file, so that reloads only touch
+    // the pairs that changed in the file and keep the pairs added via Python.
+    ConcurrentStringMap::AssignedPairs mappingFilePairs;
+    std::mutex mappingFileMutex;
     std::regex mappingRegexExpression;
     std::string mappingRegexExpressionStr;
+    std::string mappingRegexRequiredLiteral;
     std::string mappingRegexFormat;
+    PathExistenceCache existenceCache;
+    DirectoryListingIndex searchPathIndex;
+    LRUCache<std::string, FileResolverResolveMemoEntry> resolveMemo;
 };
 
 class FileResolverContext
@@ -60,7 +91,7 @@ public:
 
     // Methods
     AR_FILERESOLVER_API
-    std::vector<std::string> GetSearchPaths() const { return data->searchPaths; }
+    const std::vector<std::string>& GetSearchPaths() const { return data->searchPaths; }
     AR_FILERESOLVER_API
     void RefreshSearchPaths();
     AR_FILERESOLVER_API
@@ -75,17 +106,27 @@ public:
     AR_FILERESOLVER_API
     void SetMappingFilePath(std::string mappingFilePath) { data->mappingFilePath = mappingFilePath; }
     AR_FILERESOLVER_API
-    void RefreshFromMappingFilePath();
+    std::vector<std::string> RefreshFromMappingFilePath();
     AR_FILERESOLVER_API
     void AddMappingPair(const std::string& sourceStr, const std::string& targetStr);
     AR_FILERESOLVER_API
+    void AddMappingPairs(const std::vector<std::pair<std::string, std::string>>& pairs);
+    AR_FILERESOLVER_API
     void RemoveMappingByKey(const std::string& sourceStr);
     AR_FILERESOLVER_API
     void RemoveMappingByValue(const std::string& targetStr);
     AR_FILERESOLVER_API
-    const std::map<std::string, std::string>& GetMappingPairs() const { return data->mappingPairs; }
+    bool FindMappingPair(const std::string& sourceStr, std::string& targetStr) const { return data->mappingPairs.Find(sourceStr, targetStr); }
+    AR_FILERESOLVER_API
+    bool HasMappingPairs() const { return !data->mappingPairs.Empty(); }
+    AR_FILERESOLVER_API
+    bool HasMappingPair(const std::string& sourceStr) const { return data->mappingPairs.Contains(sourceStr); }
+    AR_FILERESOLVER_API
+    std::map<std::string, std::string> GetMappingPairs() const { return data->mappingPairs.ToMap(); }
     AR_FILERESOLVER_API
-    void ClearMappingPairs() { data->mappingPairs.clear(); }
+    std::shared_ptr<const ConcurrentStringMap> GetMappingPairsView() const { return std::shared_ptr<const ConcurrentStringMap>(data, &data->mappingPairs); }
+    AR_FILERESOLVER_API
+    void ClearMappingPairs();
     AR_FILERESOLVER_API
     const std::regex& GetMappingRegexExpression() const { return data->mappingRegexExpression; }
     AR_FILERESOLVER_API
@@ -93,12 +134,52 @@ public:
     AR_FILERESOLVER_API
     void SetMappingRegexExpression(const std::string& mappingRegexExpressionStr) { 
         data->mappingRegexExpressionStr = mappingRegexExpressionStr;
-        data->mappingRegexExpression = std::regex(mappingRegexExpressionStr);
+        data->mappingRegexExpression = std::regex(mappingRegexExpressionStr, std::regex::ECMAScript | std::regex::optimize);
+        data->mappingRegexRequiredLiteral = getRegexRequiredLiteral(mappingRegexExpressionStr);
+        data->resolveMemo.Clear();
     }
     AR_FILERESOLVER_API
+    const std::string& GetMappingRegexRequiredLiteral() const { return data->mappingRegexRequiredLiteral; }
+    AR_FILERESOLVER_API
     const std::string& GetMappingRegexFormat() const { return data->mappingRegexFormat; }
     AR_FILERESOLVER_API
-    void SetMappingRegexFormat(const std::string& mappingRegexFormat) { data->mappingRegexFormat = mappingRegexFormat; }
+    void SetMappingRegexFormat(const std::string& mappingRegexFormat) { data->mappingRegexFormat = mappingRegexFormat; data->resolveMemo.Clear(); }
+    AR_FILERESOLVER_API
+    bool PathExists(const std::string& path) const;
+    AR_FILERESOLVER_API
+    double GetExistenceCacheTTL() const { return data->existenceCache.GetTimeToLive(); }
+    AR_FILERESOLVER_API
+    void SetExistenceCacheTTL(double seconds) { data->existenceCache.SetTimeToLive(seconds); data->resolveMemo.Clear(); }
+    AR_FILERESOLVER_API
+    void ClearExistenceCache() const { data->existenceCache.Clear(); data->resolveMemo.Clear(); }
+    AR_FILERESOLVER_API
+    bool GetSearchPathIndexState() const { return data->searchPathIndex.IsEnabled(); }
+    AR_FILERESOLVER_API
+    void SetSearchPathIndexState(bool state) { data->searchPathIndex.SetEnabled(state); data->resolveMemo.Clear(); }
+    AR_FILERESOLVER_API
+    void ClearSearchPathIndex() const { data->searchPathIndex.Clear(); data->resolveMemo.Clear(); }
+    AR_FILERESOLVER_API
+    size_t GetSearchPathIndexSize() const { return data->searchPathIndex.Size(); }
+    AR_FILERESOLVER_API
+    size_t GetRevision() const { return data->resolveMemo.GetRevision(); }
+    AR_FILERESOLVER_API
+    bool IsResolveMemoEnabled() const { return data->resolveMemo.IsEnabled(); }
+    AR_FILERESOLVER_API
+    size_t GetResolveMemoCapacity() const { return data->resolveMemo.GetCapacity(); }
+    AR_FILERESOLVER_API
+    void SetResolveMemoCapacity(size_t capacity) { data->resolveMemo.SetCapacity(capacity); }
+    AR_FILERESOLVER_API
+    size_t GetResolveMemoSize() const { return data->resolveMemo.Size(); }
+    AR_FILERESOLVER_API
+    void ClearResolveMemo() const { data->resolveMemo.Clear(); }
+    AR_FILERESOLVER_API
+    size_t GetMemoryUsage() const;
+    AR_FILERESOLVER_API
+    long GetUseCount() const { return data.use_count(); }
+    AR_FILERESOLVER_API
+    bool FindResolveMemo(const std::string& assetPath, bool exposeAbsolutePathIdentifierState, std::string& resolvedPath) const;
+    AR_FILERESOLVER_API
+    void AddResolveMemo(const std::string& assetPath, bool exposeAbsolutePathIdentifierState, const std::string& resolvedPath, size_t revision) const;
 
 private:
     // Vars
@@ -106,8 +187,11 @@ private:
     
     // Methods
     void _LoadEnvMappingRegex();
+    void _LoadEnvExistenceCacheTTL();
+    void _LoadEnvSearchPathIndexState();
+    void _LoadEnvResolveMemoCapacity();
     void _LoadEnvSearchPaths();
-    bool _GetMappingPairsFromUsdFile(const std::string& filePath);
+    std::vector<std::pair<std::string, std::string>> _GetMappingPairsFromUsdFile(const std::string& filePath);
 
 };
 
@@ -1,6 +1,8 @@
 from __future__ import print_function
 import tempfile
 import os
+import threading
+import time
 import unittest
 
 from pxr import Ar, Sdf, Usd, Vt
@@ -269,6 +271,154 @@ class TestArResolver(unittest.TestCase):
                 # Uncached result should now return empty result
                 self.assertEqual("", resolver.Resolve(layer_identifier))
 
+    def test_ResolveWithExistenceCache(self):
+        with tempfile.TemporaryDirectory() as temp_dir_path:
+            # Create context
+            ctx = FileResolver.ResolverContext()
+            ctx.SetCustomSearchPaths([temp_dir_path])
+            ctx.RefreshSearchPaths()
+            self.assertEqual(ctx.GetExistenceCacheTTL(), 0)
+            ctx.SetExistenceCacheTTL(3600)
+            self.assertEqual(ctx.GetExistenceCacheTTL(), 3600)
+            layer_identifier = "layer.usd"
+            layer_file_path = os.path.join(temp_dir_path, layer_identifier)
+            # Get resolver
+            resolver = Ar.GetResolver()
+            with Ar.ResolverContextBinder(ctx):
+                # Negative results are cached
+                self.assertEqual("", resolver.Resolve(layer_identifier))
+                Sdf.Layer.CreateAnonymous().Export(layer_file_path)
+                self.assertEqual("", resolver.Resolve(layer_identifier))
+                # Refreshing the search paths clears the cache
+                ctx.RefreshSearchPaths()
+                self.assertEqual(layer_file_path, resolver.Resolve(layer_identifier))
+                # Positive results are cached
+                os.remove(layer_file_path)
+                self.assertEqual(layer_file_path, resolver.Resolve(layer_identifier))
+                ctx.ClearExistenceCache()
+                self.assertEqual("", resolver.Resolve(layer_identifier))
+                # Cached results expire
+                ctx.SetExistenceCacheTTL(0.1)
+                self.assertEqual("", resolver.Resolve(layer_identifier))
+                Sdf.Layer.CreateAnonymous().Export(layer_file_path)
+                time.sleep(0.2)
+                self.assertEqual(layer_file_path, resolver.Resolve(layer_identifier))
+                # Disabling the cache
+                ctx.SetExistenceCacheTTL(0)
+                os.remove(layer_file_path)
+                self.assertEqual("", resolver.Resolve(layer_identifier))
+
+    def test_ResolveWithSearchPathIndex(self):
+        with tempfile.TemporaryDirectory() as temp_dir_path:
+            # Create context
+            ctx = FileResolver.ResolverContext()
+            ctx.SetCustomSearchPaths([temp_dir_path])
+            ctx.RefreshSearchPaths()
+            self.assertFalse(ctx.GetSearchPathIndexState())
+            ctx.SetSearchPathIndexState(True)
+            self.assertTrue(ctx.GetSearchPathIndexState())
+            layer_identifier = "layer.usd"
+            layer_file_path = os.path.join(temp_dir_path, layer_identifier)
+            nested_layer_identifier = "nested/layer.usd"
+            nested_layer_file_path = os.path.join(temp_dir_path, "nested", "layer.usd")
+            Sdf.Layer.CreateAnonymous().Export(layer_file_path)
+            # Get resolver
+            resolver = Ar.GetResolver()
+            with Ar.ResolverContextBinder(ctx):
+                # Directories are indexed on first access
+                self.assertEqual(ctx.GetSearchPathIndexSize(), 0)
+                self.assertEqual(layer_file_path, resolver.Resolve(layer_identifier))
+                self.assertEqual("", resolver.Resolve(nested_layer_identifier))
+                self.assertEqual(ctx.GetSearchPathIndexSize(), 2)
+                # File system changes are only picked up after a refresh
+                Sdf.Layer.CreateAnonymous().Export(nested_layer_file_path)
+                os.remove(layer_file_path)
+                self.assertEqual(layer_file_path, resolver.Resolve(layer_identifier))
+                self.assertEqual("", resolver.Resolve(nested_layer_identifier))
+                ctx.RefreshSearchPaths()
+                self.assertEqual(ctx.GetSearchPathIndexSize(), 0)
+                self.assertEqual("", resolver.Resolve(layer_identifier))
+                self.assertEqual(nested_layer_file_path, resolver.Resolve(nested_layer_identifier))
+                # Disabling the index
+                ctx.SetSearchPathIndexState(False)
+                self.assertEqual(ctx.GetSearchPathIndexSize(), 0)
+                Sdf.Layer.CreateAnonymous().Export(layer_file_path)
+                self.assertEqual(layer_file_path, resolver.Resolve(layer_identifier))
+
+    def test_ResolveWithResolveMemo(self):
+        with tempfile.TemporaryDirectory() as temp_dir_path:
+            # Create context
+            ctx = FileResolver.ResolverContext()
+            ctx.SetCustomSearchPaths([temp_dir_path])
+            ctx.RefreshSearchPaths()
+            self.assertEqual(ctx.GetResolveMemoCapacity(), 0)
+            ctx.SetResolveMemoCapacity(100)
+            self.assertEqual(ctx.GetResolveMemoCapacity(), 100)
+            layer_identifier = "layer.usd"
+            layer_file_path = os.path.join(temp_dir_path, layer_identifier)
+            mapped_layer_file_path = os.path.join(temp_dir_path, "layer_v002.usd")
+            Sdf.Layer.CreateAnonymous().Export(layer_file_path)
+            Sdf.Layer.CreateAnonymous().Export(mapped_layer_file_path)
+            # Get resolver
+            resolver = Ar.GetResolver()
+            file_resolver = Ar.GetUnderlyingResolver()
+            file_resolver.ResetResolveMemoCounters()
+            with Ar.ResolverContextBinder(ctx):
+                self.assertEqual(layer_file_path, resolver.Resolve(layer_identifier))
+                self.assertEqual(layer_file_path, resolver.Resolve(layer_identifier))
+                self.assertEqual(ctx.GetResolveMemoSize(), 1)
+                self.assertEqual(file_resolver.GetResolveMemoHitCount(), 1)
+                self.assertEqual(file_resolver.GetResolveMemoMissCount(), 1)
+                # Results are memorized until the context data changes
+                os.remove(layer_file_path)
+                self.assertEqual(layer_file_path, resolver.Resolve(layer_identifier))
+                revision = ctx.GetRevision()
+                ctx.AddMappingPair(layer_identifier, "layer_v002.usd")
+                self.assertNotEqual(revision, ctx.GetRevision())
+                self.assertEqual(ctx.GetResolveMemoSize(), 0)
+                self.assertEqual(mapped_layer_file_path, resolver.Resolve(layer_identifier))
+                ctx.RemoveMappingByKey(layer_identifier)
+                self.assertEqual("", resolver.Resolve(layer_identifier))
+                # Refreshing the context clears the memo
+                Sdf.Layer.CreateAnonymous().Export(layer_file_path)
+                resolver.RefreshContext(ctx)
+                self.assertEqual(layer_file_path, resolver.Resolve(layer_identifier))
+                # Disabling the memo
+                ctx.SetResolveMemoCapacity(0)
+                file_resolver.ResetResolveMemoCounters()
+                self.assertEqual(layer_file_path, resolver.Resolve(layer_identifier))
+                self.assertEqual(ctx.GetResolveMemoSize(), 0)
+                self.assertEqual(file_resolver.GetResolveMemoHitCount(), 0)
+                self.assertEqual(file_resolver.GetResolveMemoMissCount(), 0)
+
+    def test_ResolverStatistics(self):
+        with tempfile.TemporaryDirectory() as temp_dir_path:
+            # Create context
+            ctx = FileResolver.ResolverContext()
+            ctx.SetCustomSearchPaths([temp_dir_path])
+            ctx.RefreshSearchPaths()
+            layer_file_path = os.path.join(temp_dir_path, "layer_v002.usd")
+            Sdf.Layer.CreateAnonymous().Export(layer_file_path)
+            ctx.AddMappingPair("layer.usd", "layer_v002.usd")
+            # Get resolver
+            resolver = Ar.GetResolver()
+            file_resolver = Ar.GetUnderlyingResolver()
+            file_resolver.ResetStatistics()
+            with Ar.ResolverContextBinder(ctx):
+                self.assertEqual(layer_file_path, resolver.Resolve("layer.usd"))
+                with Ar.ResolverScopedCache():
+                    self.assertEqual(layer_file_path, resolver.Resolve("layer.usd"))
+                    self.assertEqual(layer_file_path, resolver.Resolve("layer.usd"))
+            statistics = file_resolver.GetStatistics()
+            self.assertEqual(statistics["counters"]["resolves"], 3)
+            self.assertEqual(statistics["counters"]["scopedCacheHits"], 1)
+            self.assertEqual(statistics["counters"]["mappingPairHits"], 2)
+            resolve_latency = statistics["latencies"]["resolveUncached"]
+            self.assertEqual(resolve_latency["count"], 2)
+            self.assertEqual(sum(resolve_latency["histogram"].values()), 2)
+            file_resolver.ResetStatistics()
+            self.assertEqual(file_resolver.GetStatistics()["counters"]["resolves"], 0)
+
     def test_ResolveWithContext(self):
         with tempfile.TemporaryDirectory() as temp_dir_path:
             # Create context
@@ -390,6 +540,118 @@ class TestArResolver(unittest.TestCase):
             "FileResolver.ResolverContext('/some/mapping/file.usd')",
         )
 
+    def test_ResolverContextSharedConcurrently(self):
+        with tempfile.TemporaryDirectory() as temp_dir_path:
+            # Create mapping file
+            mapping_file_path = os.path.join(temp_dir_path, "mapping.usd")
+            mapping_layer = Sdf.Layer.CreateAnonymous()
+            mapping_layer.customLayerData = {
+                FileResolver.Tokens.mappingPairs: Vt.StringArray(["shot.usd", "shot_v002.usd"])
+            }
+            mapping_layer.Export(mapping_file_path)
+            # Create contexts on multiple threads
+            resolver = Ar.GetResolver()
+            context_collections = []
+            def create_context():
+                context_collections.append(resolver.CreateDefaultContextForAsset(mapping_file_path))
+            threads = [threading.Thread(target=create_context) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            # All threads have to share the same context data
+            ctxs = [context_collection.Get()[0] for context_collection in context_collections]
+            self.assertEqual(len(ctxs), 8)
+            ctxs[0].AddMappingPair("asset.usd", "asset_v003.usd")
+            for ctx in ctxs:
+                self.assertEqual(
+                    ctx.GetMappingPairs(),
+                    {"shot.usd": "shot_v002.usd", "asset.usd": "asset_v003.usd"},
+                )
+
+    def test_ResolverContextSharedBounded(self):
+        with tempfile.TemporaryDirectory() as temp_dir_path:
+            # Create mapping files
+            mapping_file_paths = []
+            for idx in range(3):
+                mapping_file_path = os.path.join(temp_dir_path, "mapping_{}.usd".format(idx))
+                mapping_layer = Sdf.Layer.CreateAnonymous()
+                mapping_layer.customLayerData = {
+                    FileResolver.Tokens.mappingPairs: Vt.StringArray(["shot.usd", "shot_v00{}.usd".format(idx)])
+                }
+                mapping_layer.Export(mapping_file_path)
+                mapping_file_paths.append(mapping_file_path)
+            resolver = Ar.GetResolver()
+            file_resolver = Ar.GetUnderlyingResolver()
+            file_resolver.PurgeSharedContexts(force=True)
+            self.assertEqual(file_resolver.GetSharedContextMappingFilePaths(), [])
+            self.assertEqual(file_resolver.GetSharedContextMemoryUsage(), 0)
+            try:
+                file_resolver.SetSharedContextCapacity(1)
+                # Contexts that are in use are never evicted
+                held_context_collection = resolver.CreateDefaultContextForAsset(mapping_file_paths[0])
+                resolver.CreateDefaultContextForAsset(mapping_file_paths[1])
+                self.assertEqual(
+                    file_resolver.GetSharedContextMappingFilePaths(),
+                    [mapping_file_paths[1], mapping_file_paths[0]],
+                )
+                self.assertGreater(file_resolver.GetSharedContextMemoryUsage(), 0)
+                # Unused contexts are evicted in least recently used order
+                resolver.CreateDefaultContextForAsset(mapping_file_paths[2])
+                self.assertEqual(
+                    file_resolver.GetSharedContextMappingFilePaths(),
+                    [mapping_file_paths[2], mapping_file_paths[0]],
+                )
+                # The held context is still shared
+                held_ctx = held_context_collection.Get()[0]
+                held_ctx.AddMappingPair("asset.usd", "asset_v003.usd")
+                ctx = resolver.CreateDefaultContextForAsset(mapping_file_paths[0]).Get()[0]
+                self.assertEqual(ctx.GetMappingPairs(), held_ctx.GetMappingPairs())
+                del ctx
+                self.assertEqual(file_resolver.GetSharedContextMappingFilePaths(), [mapping_file_paths[0]])
+                # Purging only removes unused contexts, unless forced
+                file_resolver.SetSharedContextCapacity(0)
+                resolver.CreateDefaultContextForAsset(mapping_file_paths[1])
+                self.assertEqual(file_resolver.PurgeSharedContexts(), 1)
+                self.assertEqual(file_resolver.GetSharedContextMappingFilePaths(), [mapping_file_paths[0]])
+                self.assertFalse(file_resolver.RemoveSharedContext(mapping_file_paths[1]))
+                self.assertTrue(file_resolver.RemoveSharedContext(mapping_file_paths[0]))
+                self.assertEqual(file_resolver.GetSharedContextMappingFilePaths(), [])
+            finally:
+                file_resolver.SetSharedContextCapacity(0)
+
+    def test_ResolverContextSharedRevalidation(self):
+        with tempfile.TemporaryDirectory() as temp_dir_path:
+            # Create mapping file
+            mapping_file_path = os.path.join(temp_dir_path, "mapping.usd")
+            mapping_layer = Sdf.Layer.CreateAnonymous()
+            mapping_layer.customLayerData = {
+                FileResolver.Tokens.mappingPairs: Vt.StringArray(["shot.usd", "shot_v002.usd"])
+            }
+            mapping_layer.Export(mapping_file_path)
+            resolver = Ar.GetResolver()
+            file_resolver = Ar.GetUnderlyingResolver()
+            try:
+                file_resolver.SetSharedContextRevalidationInterval(60)
+                ctx = resolver.CreateDefaultContextForAsset(mapping_file_path).Get()[0]
+                self.assertEqual(ctx.GetMappingPairs(), {"shot.usd": "shot_v002.usd"})
+                # Edit mapping file
+                mapping_layer.customLayerData = {
+                    FileResolver.Tokens.mappingPairs: Vt.StringArray(["shot.usd", "shot_v003.usd"])
+                }
+                mapping_layer.Export(mapping_file_path)
+                mapping_file_stat = os.stat(mapping_file_path)
+                os.utime(mapping_file_path, (mapping_file_stat.st_atime + 10, mapping_file_stat.st_mtime + 10))
+                # Within the revalidation interval, the edit is not picked up
+                ctx = resolver.CreateDefaultContextForAsset(mapping_file_path).Get()[0]
+                self.assertEqual(ctx.GetMappingPairs(), {"shot.usd": "shot_v002.usd"})
+                # After the revalidation interval, the edit is picked up
+                file_resolver.SetSharedContextRevalidationInterval(0)
+                ctx = resolver.CreateDefaultContextForAsset(mapping_file_path).Get()[0]
+                self.assertEqual(ctx.GetMappingPairs(), {"shot.usd": "shot_v003.usd"})
+            finally:
+                file_resolver.SetSharedContextRevalidationInterval(0)
+
     def test_ResolverContextMappingPairs(self):
         with tempfile.TemporaryDirectory() as temp_dir_path:
             # Create mapping file
@@ -433,6 +695,27 @@ class TestArResolver(unittest.TestCase):
             mapping_pairs_updated.pop("example/cube")
             mapping_pairs_updated.pop("example/cylinder")
             self.assertEqual(ctx.GetMappingPairs(), mapping_pairs_updated)
+            # Test bulk add
+            ctx.AddMappingPairs({"example/cube": "example/sphere", "example/cone": "example/triangle"})
+            ctx.AddMappingPairs([("example/cylinder", "example/sphere")])
+            mapping_pairs_updated["example/cube"] = "example/sphere"
+            mapping_pairs_updated["example/cone"] = "example/triangle"
+            mapping_pairs_updated["example/cylinder"] = "example/sphere"
+            self.assertEqual(ctx.GetMappingPairs(), mapping_pairs_updated)
+            with self.assertRaises(ValueError):
+                ctx.AddMappingPairs([("example/cube",)])
+            # Test point lookups and view
+            self.assertTrue(ctx.HasMappingPair("example/cube"))
+            self.assertFalse(ctx.HasMappingPair("example/unknown"))
+            self.assertEqual(ctx.GetMappingPair("example/cube"), "example/sphere")
+            self.assertIsNone(ctx.GetMappingPair("example/unknown"))
+            mapping_pairs_view = ctx.GetMappingPairsView()
+            self.assertEqual(len(mapping_pairs_view), len(mapping_pairs_updated))
+            self.assertEqual(dict(mapping_pairs_view.items()), mapping_pairs_updated)
+            self.assertIn("example/cube", mapping_pairs_view)
+            self.assertEqual(mapping_pairs_view["example/cube"], "example/sphere")
+            with self.assertRaises(KeyError):
+                mapping_pairs_view["example/unknown"]
             # Test clear
             ctx.ClearMappingPairs()
             self.assertEqual(ctx.GetMappingPairs(), {})
@@ -440,15 +723,119 @@ class TestArResolver(unittest.TestCase):
             ctx.RefreshFromMappingFilePath()
             self.assertEqual(ctx.GetMappingPairs(), mapping_pairs)
 
+    def test_ResolverContextMappingPairsIncrementalRefresh(self):
+        with tempfile.TemporaryDirectory() as temp_dir_path:
+            # Create mapping file
+            mapping_file_path = os.path.join(temp_dir_path, "mapping.usd")
+            mapping_layer = Sdf.Layer.CreateAnonymous()
+            mapping_layer.customLayerData = {
+                FileResolver.Tokens.mappingPairs: Vt.StringArray(["a.usd", "a_v001.usd", "b.usd", "b_v001.usd", "c.usd", "c_v001.usd"])
+            }
+            mapping_layer.Export(mapping_file_path)
+            ctx = FileResolver.ResolverContext(mapping_file_path)
+            # Mapping pairs added via Python are kept, unless the mapping file changes them
+            ctx.AddMappingPair("e.usd", "e_v001.usd")
+            ctx.AddMappingPair("b.usd", "b_v002.usd")
+            # Edit mapping file
+            mapping_layer.customLayerData = {
+                FileResolver.Tokens.mappingPairs: Vt.StringArray(["a.usd", "a_v002.usd", "b.usd", "b_v001.usd", "d.usd", "d_v001.usd"])
+            }
+            mapping_layer.Export(mapping_file_path)
+            # Only the changed mapping pairs are updated
+            revision = ctx.GetRevision()
+            self.assertEqual(sorted(ctx.RefreshFromMappingFilePath()), ["a.usd", "c.usd", "d.usd"])
+            self.assertEqual(
+                ctx.GetMappingPairs(),
+                {"a.usd": "a_v002.usd", "b.usd": "b_v002.usd", "d.usd": "d_v001.usd", "e.usd": "e_v001.usd"},
+            )
+            self.assertNotEqual(ctx.GetRevision(), revision)
+            # Refreshing an unchanged mapping file doesn't change anything
+            revision = ctx.GetRevision()
+            self.assertEqual(ctx.RefreshFromMappingFilePath(), [])
+            self.assertEqual(ctx.GetRevision(), revision)
+
+    def test_ResolverContextMappingPairsSidecar(self):
+        with tempfile.TemporaryDirectory() as temp_dir_path:
+            # Create mapping file
+            mapping_file_path = os.path.join(temp_dir_path, "mapping.usda")
+            sidecar_file_path = mapping_file_path + ".pairs"
+            mapping_layer = Sdf.Layer.CreateAnonymous()
+            mapping_layer.customLayerData = {
+                FileResolver.Tokens.mappingPairs: Vt.StringArray(["shot.usd", "shot_v002.usd"])
+            }
+            mapping_layer.Export(mapping_file_path)
+            # The mapping file layer is released after loading
+            ctx = FileResolver.ResolverContext(mapping_file_path)
+            self.assertEqual(ctx.GetMappingPairs(), {"shot.usd": "shot_v002.usd"})
+            self.assertIsNone(Sdf.Layer.Find(mapping_file_path))
+            self.assertFalse(os.path.isfile(sidecar_file_path))
+            os.environ["AR_MAPPING_PAIRS_SIDECAR"] = "1"
+            try:
+                # Write sidecar
+                ctx = FileResolver.ResolverContext(mapping_file_path)
+                self.assertEqual(ctx.GetMappingPairs(), {"shot.usd": "shot_v002.usd"})
+                self.assertTrue(os.path.isfile(sidecar_file_path))
+                # Read sidecar
+                ctx = FileResolver.ResolverContext(mapping_file_path)
+                self.assertEqual(ctx.GetMappingPairs(), {"shot.usd": "shot_v002.usd"})
+                # Edits to the mapping file invalidate the sidecar
+                mapping_layer.customLayerData = {
+                    FileResolver.Tokens.mappingPairs: Vt.StringArray(["shot.usd", "shot_v003.usd"])
+                }
+                mapping_layer.Export(mapping_file_path)
+                mapping_file_stat = os.stat(mapping_file_path)
+                os.utime(mapping_file_path, (mapping_file_stat.st_atime, mapping_file_stat.st_mtime + 10))
+                self.assertEqual(ctx.RefreshFromMappingFilePath(), ["shot.usd"])
+                self.assertEqual(ctx.GetMappingPairs(), {"shot.usd": "shot_v003.usd"})
+                ctx = FileResolver.ResolverContext(mapping_file_path)
+                self.assertEqual(ctx.GetMappingPairs(), {"shot.usd": "shot_v003.usd"})
+            finally:
+                os.environ.pop("AR_MAPPING_PAIRS_SIDECAR")
+
+    def test_ResolverContextMemoryUsage(self):
+        ctx = FileResolver.ResolverContext()
+        memory_usage_empty = ctx.GetMemoryUsage()
+        # Values share their directories
+        mapping_pairs = {
+            "assets/asset{}.usd".format(idx): "/project/assets/published/asset{}_v{:03d}.usd".format(idx, idx % 10)
+            for idx in range(1000)
+        }
+        ctx.AddMappingPairs(mapping_pairs)
+        self.assertEqual(ctx.GetMappingPairs(), mapping_pairs)
+        memory_usage = ctx.GetMemoryUsage()
+        self.assertGreater(memory_usage, memory_usage_empty)
+        # Removing pairs releases their memory
+        ctx.RemoveMappingByValue("/project/assets/published/asset1_v001.usd")
+        self.assertNotIn("assets/asset1.usd", ctx.GetMappingPairs())
+        self.assertLess(ctx.GetMemoryUsage(), memory_usage)
+        memory_usage = ctx.GetMemoryUsage()
+        ctx.ClearMappingPairs()
+        self.assertEqual(ctx.GetMappingPairs(), {})
+        self.assertLess(ctx.GetMemoryUsage(), memory_usage)
+
     def test_ResolverContextRegexExpressions(self):
         ctx = FileResolver.ResolverContext()
         # The default regex expression values are passed in through cmake test env vars
         self.assertEqual(ctx.GetMappingRegexExpression(), "(v\d\d\d)")
+        self.assertEqual(ctx.GetMappingRegexRequiredLiteral(), "v")
         self.assertEqual(ctx.GetMappingRegexFormat(), "v000")
         ctx.SetMappingRegexExpression("(cube)")
         ctx.SetMappingRegexFormat("Cube")
         self.assertEqual(ctx.GetMappingRegexExpression(), "(cube)")
+        self.assertEqual(ctx.GetMappingRegexRequiredLiteral(), "cube")
         self.assertEqual(ctx.GetMappingRegexFormat(), "Cube")
+        # Expressions that we can't analyze disable the prefilter
+        for expression, literal in [("shot_v\d+\.usd", "shot_v"), ("(abc)?def", ""), ("cube|sphere", "")]:
+            ctx.SetMappingRegexExpression(expression)
+            self.assertEqual(ctx.GetMappingRegexRequiredLiteral(), literal)
+        # Every path that the expression matches has to contain the required literal
+        for expression, paths in [("x{10}", ["xxxxxxxxxx"]), ("ab{2,3}c", ["abbc", "abbbc"]), (r"\d{2}_v", ["12_v"]),
+                                  (r"\x41BC", ["ABC"]), (r"\u0041BC", ["ABC"]), (r"(a)b\1", ["aba"])]:
+            ctx.SetMappingRegexExpression(expression)
+            literal = ctx.GetMappingRegexRequiredLiteral()
+            for path in paths:
+                self.assertRegex(path, expression)
+                self.assertIn(literal, path)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
 #include "resolver.h"
+#include "wrap_resolver_statistics.h"
 
 #include "pxr/pxr.h"
 
@@ -9,6 +10,12 @@ PXR_NAMESPACE_USING_DIRECTIVE
 
 namespace python = AR_BOOST_NAMESPACE::python;
 
+static python::dict
+_GetStatistics(const FileResolver& resolver)
+{
+    return resolverStatisticsToDict(resolver.GetStatistics());
+}
+
 void
 wrapResolver()
 {
@@ -22,5 +29,20 @@ wrapResolver()
         ("Resolver", python::no_init)
         .def("GetExposeAbsolutePathIdentifierState", &This::GetExposeAbsolutePathIdentifierState, python::return_value_policy<python::return_by_value>(), "Get the state of exposing absolute path identifiers")
         .def("SetExposeAbsolutePathIdentifierState", &This::SetExposeAbsolutePathIdentifierState, "Set the state of exposing absolute path identifiers")
+        .def("GetResolveMemoHitCount", &This::GetResolveMemoHitCount, "Get the number of resolves that were answered by a context's resolve memo")
+        .def("GetResolveMemoMissCount", &This::GetResolveMemoMissCount, "Get the number of resolves that were not found in a context's resolve memo")
+        .def("ResetResolveMemoCounters", &This::ResetResolveMemoCounters, "Reset the resolve memo hit and miss counters")
+        .def("GetStatistics", &_GetStatistics, "Get the resolve counters and the latency histogram (in nanoseconds) of uncached resolves as a dict")
+        .def("ResetStatistics", &This::ResetStatistics, "Reset all resolve counters and latency histograms")
+        .def("GetSharedContextMappingFilePaths", &This::GetSharedContextMappingFilePaths, python::return_value_policy<python::return_by_value>(), "Get the mapping file paths of the shared contexts, ordered from most to least recently used")
+        .def("GetSharedContextMemoryUsage", &This::GetSharedContextMemoryUsage, "Get an estimate of the memory (in bytes) held by the shared contexts")
+        .def("GetSharedContextCapacity", &This::GetSharedContextCapacity, "Get the maximum number of shared contexts, zero means unbounded")
+        .def("SetSharedContextCapacity", &This::SetSharedContextCapacity, "Set the maximum number of shared contexts, zero means unbounded")
+        .def("GetSharedContextMemoryLimit", &This::GetSharedContextMemoryLimit, "Get the memory limit (in bytes) of the shared contexts, zero means unbounded")
+        .def("SetSharedContextMemoryLimit", &This::SetSharedContextMemoryLimit, "Set the memory limit (in bytes) of the shared contexts, zero means unbounded")
+        .def("GetSharedContextRevalidationInterval", &This::GetSharedContextRevalidationInterval, "Get the interval (in seconds) in which shared contexts are reused without re-checking their mapping file, zero means it is checked on every access")
+        .def("SetSharedContextRevalidationInterval", &This::SetSharedContextRevalidationInterval, "Set the interval (in seconds) in which shared contexts are reused without re-checking their mapping file, zero means it is checked on every access")
+        .def("RemoveSharedContext", &This::RemoveSharedContext, "Remove the shared context of the given mapping file path")
+        .def("PurgeSharedContexts", &This::PurgeSharedContexts, (python::arg("force")=false), "Remove all shared contexts that are not in use (or all, if forced) and return the number of removed contexts")
     ;
-}
\ No newline at end of file
+}
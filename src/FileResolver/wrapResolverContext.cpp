@@ -1,4 +1,5 @@
 #include "resolverContext.h"
+#include "wrap_concurrent_string_map.h"
 
 #include "pxr/pxr.h"
 #include "pxr/base/tf/pyUtils.h"
@@ -7,7 +8,10 @@
 #include "boost_include_wrapper.h"
 #include BOOST_INCLUDE(python.hpp)
 
+#include <algorithm>
 #include <string>
+#include <utility>
+#include <vector>
 
 PXR_NAMESPACE_USING_DIRECTIVE
 
@@ -29,10 +33,69 @@ _Repr(const FileResolverContext& ctx)
             "('" + ctx.GetMappingFilePath() + "')");
 }
 
+static
+std::vector<std::pair<std::string, std::string>>
+_ExtractPairs(const python::object& pairs)
+{
+    // Accepts dicts as well as any iterable of (source, target) pairs.
+    std::vector<std::pair<std::string, std::string>> result;
+    if (PyDict_Check(pairs.ptr())) {
+        result.reserve(PyDict_Size(pairs.ptr()));
+        PyObject* key;
+        PyObject* value;
+        Py_ssize_t pos = 0;
+        while (PyDict_Next(pairs.ptr(), &pos, &key, &value)) {
+            result.emplace_back(
+                python::extract<std::string>(key)(),
+                python::extract<std::string>(value)());
+        }
+        return result;
+    }
+    result.reserve(std::max<Py_ssize_t>(PyObject_LengthHint(pairs.ptr(), 0), 0));
+    python::stl_input_iterator<python::object> it(pairs), end;
+    for (; it != end; ++it) {
+        const python::object pair = *it;
+        if (python::len(pair) != 2) {
+            TfPyThrowValueError("Expected (source, target) pairs");
+        }
+        result.emplace_back(
+            python::extract<std::string>(pair[0])(),
+            python::extract<std::string>(pair[1])());
+    }
+    return result;
+}
+
+static
+void
+_AddMappingPairs(FileResolverContext& ctx, const python::object& pairs)
+{
+    ctx.AddMappingPairs(_ExtractPairs(pairs));
+}
+
+static
+python::object
+_GetMappingPair(const FileResolverContext& ctx, const std::string& sourceStr)
+{
+    std::string targetStr;
+    if (!ctx.FindMappingPair(sourceStr, targetStr)) {
+        return python::object();
+    }
+    return python::object(targetStr);
+}
+
+static
+ConcurrentStringMapView<FileResolverContext>
+_GetMappingPairsView(const FileResolverContext& ctx)
+{
+    return ConcurrentStringMapView<FileResolverContext>(ctx.GetMappingPairsView());
+}
+
 void
 wrapResolverContext()
 {
     using This = FileResolverContext;
+
+    ConcurrentStringMapView<This>::Wrap("PairsView");
     
     python::class_<FileResolverContext>("ResolverContext", python::no_init)
         .def(python::init<>())
@@ -50,16 +113,34 @@ wrapResolverContext()
         .def("SetCustomSearchPaths", &This::SetCustomSearchPaths, "Set custom search paths")
         .def("GetMappingFilePath", &This::GetMappingFilePath, python::return_value_policy<python::return_by_value>(), "Get the mapping file path (Defaults file that the context created Resolver.CreateDefaultContextForAsset() opened)")
         .def("SetMappingFilePath", &This::SetMappingFilePath, "Set the mapping file path")
-        .def("RefreshFromMappingFilePath", &This::RefreshFromMappingFilePath, "Reload mapping pairs from the mapping file path")
+        .def("RefreshFromMappingFilePath", &This::RefreshFromMappingFilePath, python::return_value_policy<python::return_by_value>(), "Reload mapping pairs from the mapping file path, only the changed pairs are updated. Returns the changed source paths")
         .def("GetMappingPairs", &This::GetMappingPairs, python::return_value_policy<python::return_by_value>(), "Returns all mapping pairs as a dict")
+        .def("GetMappingPairsView", _GetMappingPairsView, "Returns a read-only dict-like view of all mapping pairs, that doesn't copy the pairs")
+        .def("GetMappingPair", _GetMappingPair, "Returns the target of a mapping pair by key or None")
+        .def("HasMappingPair", &This::HasMappingPair, "Check if a mapping pair with the given key exists")
         .def("AddMappingPair", &This::AddMappingPair, "Add a mapping pair")
+        .def("AddMappingPairs", _AddMappingPairs, "Add multiple mapping pairs from a dict or a list of (source, target) pairs")
         .def("RemoveMappingByKey", &This::RemoveMappingByKey, "Remove a mapping pair by key")
         .def("RemoveMappingByValue", &This::RemoveMappingByValue, "Remove a mapping pair by value")
         .def("ClearMappingPairs", &This::ClearMappingPairs, "Clear all mapping pairs")
         .def("GetMappingRegexExpression", &This::GetMappingRegexExpressionStr, python::return_value_policy<python::return_by_value>(), "Get the regex expression")
         .def("SetMappingRegexExpression", &This::SetMappingRegexExpression, "Set the regex expression")
+        .def("GetMappingRegexRequiredLiteral", &This::GetMappingRegexRequiredLiteral, python::return_value_policy<python::return_by_value>(), "Get the literal string that all regex expression matches contain (Empty if it can't be determined)")
         .def("GetMappingRegexFormat", &This::GetMappingRegexFormat, python::return_value_policy<python::return_by_value>(), "Get the regex expression substitution formatting")
         .def("SetMappingRegexFormat", &This::SetMappingRegexFormat, "Set the regex expression substitution formatting")
+        .def("GetExistenceCacheTTL", &This::GetExistenceCacheTTL, "Get the time to live (in seconds) of the search path existence cache, 0 means it is disabled")
+        .def("SetExistenceCacheTTL", &This::SetExistenceCacheTTL, "Set the time to live (in seconds) of the search path existence cache, 0 disables it. This clears the cache.")
+        .def("ClearExistenceCache", &This::ClearExistenceCache, "Clear the search path existence cache")
+        .def("GetSearchPathIndexState", &This::GetSearchPathIndexState, "Get the state of indexing search path directory listings")
+        .def("SetSearchPathIndexState", &This::SetSearchPathIndexState, "Set the state of indexing search path directory listings. This clears the index.")
+        .def("ClearSearchPathIndex", &This::ClearSearchPathIndex, "Clear the search path index")
+        .def("GetSearchPathIndexSize", &This::GetSearchPathIndexSize, "Get the number of indexed directories")
+        .def("GetRevision", &This::GetRevision, "Get the revision of the context data, this changes whenever the mapping pairs, regex settings or search paths change")
+        .def("GetResolveMemoCapacity", &This::GetResolveMemoCapacity, "Get the max number of memorized resolve results, 0 means the resolve memo is disabled")
+        .def("SetResolveMemoCapacity", &This::SetResolveMemoCapacity, "Set the max number of memorized resolve results, 0 disables the resolve memo. This clears the memo.")
+        .def("GetResolveMemoSize", &This::GetResolveMemoSize, "Get the number of memorized resolve results")
+        .def("ClearResolveMemo", &This::ClearResolveMemo, "Clear the memorized resolve results")
+        .def("GetMemoryUsage", &This::GetMemoryUsage, "Get an estimate of the memory (in bytes) held by the context data")
     ;
     ArWrapResolverContextForPython<This>();
 }
@@ -1,9 +1,13 @@
+import atexit
 import inspect
 import json
 import logging
 import re
 import os
 import sys
+import threading
+import time
+import types
 from functools import wraps
 
 from pxr import Ar, Sdf
@@ -18,20 +22,183 @@ LOG.setLevel(level=logging.INFO)
 SYSTEM_IS_LINUX = sys.platform.lower() == "linux"
 SYSTEM_IS_WINDOWS = any([w in sys.platform.lower() for w in ["windows", "win32", "win64", "cygwin"]])
 
-def log_function_args(func):
-    """Decorator to print function call details."""
+# Tracing
+TRACING_ENV_VAR = "AR_PYTHON_EXPOSE_TRACING"
+_TRACING_LOCK = threading.Lock()
+_TRACING_STATE = {"enabled": False}
+_TRACED_FUNCTIONS = []
+_TRACING_STATISTICS = {}
+
+
+class TracingStatistic:
+    """The call count and latency histogram of a traced function.
+    The histogram buckets are powers of two in nanoseconds: the
+    bucket with the index i counts calls that took less than 2**i ns.
+    """
+
+    __slots__ = ("callCount", "totalTime", "maxTime", "histogram")
+
+    def __init__(self):
+        self.callCount = 0
+        self.totalTime = 0
+        self.maxTime = 0
+        self.histogram = {}
+
+    def add(self, elapsedTime):
+        bucket = elapsedTime.bit_length()
+        self.callCount += 1
+        self.totalTime += elapsedTime
+        self.maxTime = max(self.maxTime, elapsedTime)
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def percentile(self, fraction):
+        """Returns the upper bound (in ns) of the bucket the given fraction of calls falls into."""
+        threshold = fraction * self.callCount
+        count = 0
+        for bucket in sorted(self.histogram):
+            count += self.histogram[bucket]
+            if count >= threshold:
+                return 2 ** bucket
+        return 0
+
+    def asDict(self):
+        return {
+            "callCount": self.callCount,
+            "totalTime": self.totalTime,
+            "maxTime": self.maxTime,
+            "histogram": {str(2 ** bucket): count for bucket, count in sorted(self.histogram.items())},
+        }
+
+
+def trace_function(func):
+    """Decorator to register a function for tracing.
+    The function is returned as is, so tracing has no overhead while it
+    is disabled. EnableTracing swaps it with a wrapper that records its
+    call count and latency (and logs its arguments on the debug level).
+    """
+    _TRACED_FUNCTIONS.append(func)
+    return func
+
+
+def _TraceWrapper(func):
+    name = func.__qualname__
 
     @wraps(func)
     def wrapper(*args, **kwargs):
-        func_args = inspect.signature(func).bind(*args, **kwargs).arguments
-        func_args_str = ", ".join(map("{0[0]} = {0[1]!r}".format, func_args.items()))
-        # To enable logging on all methods, re-enable this.
-        # LOG.info(f"{func.__module__}.{func.__qualname__} ({func_args_str})")
-        return func(*args, **kwargs)
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("%s.%s (%s)", func.__module__, name, ", ".join(map(repr, args)))
+        startTime = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsedTime = time.perf_counter_ns() - startTime
+            with _TRACING_LOCK:
+                statistic = _TRACING_STATISTICS.get(name)
+                if statistic is None:
+                    statistic = _TRACING_STATISTICS[name] = TracingStatistic()
+                statistic.add(elapsedTime)
 
     return wrapper
 
 
+def _SetTracedFunctions(traced):
+    for func in _TRACED_FUNCTIONS:
+        ownerName, attrName = func.__qualname__.rsplit(".", 1)
+        owner = globals()[ownerName]
+        wrapped = _TraceWrapper(func) if traced else func
+        if isinstance(inspect.getattr_static(owner, attrName), staticmethod):
+            wrapped = staticmethod(wrapped)
+        setattr(owner, attrName, wrapped)
+
+
+def IsTracingEnabled():
+    """Returns true if tracing is enabled."""
+    return _TRACING_STATE["enabled"]
+
+
+def EnableTracing():
+    """Enable tracing of all functions decorated with trace_function."""
+    with _TRACING_LOCK:
+        if not _TRACING_STATE["enabled"]:
+            _SetTracedFunctions(True)
+            _TRACING_STATE["enabled"] = True
+
+
+def DisableTracing():
+    """Disable tracing, the recorded statistics are kept."""
+    with _TRACING_LOCK:
+        if _TRACING_STATE["enabled"]:
+            _SetTracedFunctions(False)
+            _TRACING_STATE["enabled"] = False
+
+
+def ResetTracingStatistics():
+    """Clear the recorded statistics."""
+    with _TRACING_LOCK:
+        _TRACING_STATISTICS.clear()
+
+
+def GetTracingStatistics():
+    """Returns the recorded statistics.
+    Returns:
+        dict: The statistics as dicts, keyed by the qualified function name.
+              The times are in nanoseconds.
+    """
+    with _TRACING_LOCK:
+        return {name: statistic.asDict() for name, statistic in _TRACING_STATISTICS.items()}
+
+
+def DumpTracingStatistics(format="table"):
+    """Dump the recorded statistics.
+    Args:
+        format(str): Either "table" or "json".
+    Returns:
+        str: The formatted statistics.
+    """
+    if format == "json":
+        return json.dumps(GetTracingStatistics(), indent=4)
+    if format != "table":
+        raise ValueError("Unsupported tracing statistics format: {}".format(format))
+    with _TRACING_LOCK:
+        statistics = sorted(_TRACING_STATISTICS.items(), key=lambda item: item[1].totalTime, reverse=True)
+        rows = [("Function", "Calls", "Total (ms)", "Mean (us)", "P50 (us)", "P99 (us)", "Max (us)")]
+        for name, statistic in statistics:
+            rows.append((
+                name,
+                str(statistic.callCount),
+                "{:.3f}".format(statistic.totalTime / 1e6),
+                "{:.1f}".format(statistic.totalTime / statistic.callCount / 1e3),
+                "<{:.1f}".format(statistic.percentile(0.5) / 1e3),
+                "<{:.1f}".format(statistic.percentile(0.99) / 1e3),
+                "{:.1f}".format(statistic.maxTime / 1e3),
+            ))
+    widths = [max(len(row[idx]) for row in rows) for idx in range(len(rows[0]))]
+    return "\n".join(
+        "  ".join(cell.ljust(width) if idx == 0 else cell.rjust(width) for idx, (cell, width) in enumerate(zip(row, widths)))
+        for row in rows
+    )
+
+
+def _EnableTracingFromEnv():
+    """Enable tracing via the AR_PYTHON_EXPOSE_TRACING environment variable.
+    "1"/"true" enables tracing, "table"/"json" additionally logs the statistics on exit.
+    """
+    value = os.environ.get(TRACING_ENV_VAR, "").lower()
+    if value in ("1", "true", "table", "json"):
+        EnableTracing()
+    if value in ("table", "json"):
+        atexit.register(lambda: LOG.info("Tracing statistics:\n%s", DumpTracingStatistics(value)))
+
+
+def native_implementation(func):
+    """Decorator to mark a method as being identical to the resolver's native
+    C++ implementation. The resolver then skips calling into Python for it.
+    Remove it when customizing the method, otherwise your changes are ignored.
+    """
+    func.nativeImplementation = True
+    return func
+
+
 def TfIsRelativePath(path):
     """Check if the path is not an absolute path,
     by checking if it starts with "/" or "\\" depending on the host
@@ -121,10 +288,13 @@ def _GetMappingPairsFromUsdFile(mappingFilePath):
     """
     if not os.path.isfile(mappingFilePath) or not mappingFilePath.endswith((".usd", ".usdc", ".usda")):
         return {}
-    layer = Sdf.Layer.FindOrOpen(mappingFilePath)
+    # We only read the layer metadata into an anonymous layer, so that the layer
+    # doesn't end up in the layer registry and is released once we're done.
+    layer = Sdf.Layer.OpenAsAnonymous(mappingFilePath, metadataOnly=True)
     if not layer:
         return {}
     layerMetaData = layer.customLayerData
+    del layer
     mappingPairs = layerMetaData.get(Tokens.mappingPairs)
     if not mappingPairs:
         return {}
@@ -134,18 +304,154 @@ def _GetMappingPairsFromUsdFile(mappingFilePath):
     return mappingPairs
 
 
+def _GetRegexRequiredLiteral(expression):
+    """Get the longest literal string, that every match of the given
+    regex expression has to contain. Paths that don't contain it can skip
+    the regex evaluation entirely, as the expression can't match them.
+    This is conservative: Whenever the expression contains constructs we don't
+    analyze (alternations, lookarounds, quantified groups), an empty string
+    is returned, which disables the prefilter. The same logic is implemented
+    for the FileResolver in regex_prefilter.h.
+    Args:
+        expression(str): The regex expression
+    Returns:
+        str: The required literal
+    """
+    quantifiers = "*+?{"
+    size = len(expression)
+
+    def isRequiredByQuantifier(index):
+        # A literal followed by a single "+" is required, any other
+        # (or stacked) quantifier may make it optional.
+        return expression[index] == "+" and (index + 1 >= size or expression[index + 1] not in quantifiers)
+
+    longestLiteral = ""
+    currentLiteral = ""
+    i = 0
+    while i < size:
+        c = expression[i]
+        literal = None
+        if c == "|":
+            return ""
+        elif c == "(":
+            if i + 1 < size and expression[i + 1] == "?":
+                return ""
+            i += 1
+            continue
+        elif c == ")":
+            if i + 1 < size and expression[i + 1] in quantifiers:
+                return ""
+            i += 1
+            continue
+        elif c == "[":
+            # Skip the character class. A leading "]" is handled differently
+            # by different regex engines, so we don't analyze it.
+            i += 1
+            if i < size and expression[i] == "^":
+                i += 1
+            if i < size and expression[i] == "]":
+                return ""
+            while i < size and expression[i] != "]":
+                i += 2 if expression[i] == "\\" else 1
+            i += 1
+        elif c == "\\" and i + 1 < size and not expression[i + 1].isalnum():
+            # Escaped meta character, e.g. "\."
+            literal = expression[i + 1]
+            i += 2
+        elif c == "\\":
+            # Character classes (e.g. "\d"), hex/unicode/named escapes and back references
+            i += 1
+            escape = expression[i] if i < size else ""
+            if escape == "x":
+                i += 3
+            elif escape == "u":
+                i += 5
+            elif escape == "U":
+                i += 9
+            elif escape == "N":
+                end = expression.find("}", i)
+                if end == -1:
+                    return ""
+                i = end + 1
+            elif escape.isdigit():
+                while i < size and expression[i].isdigit():
+                    i += 1
+            else:
+                i += 1
+        elif c == "{":
+            # Skip the whole "{m,n}" quantifier body.
+            end = expression.find("}", i)
+            if end == -1:
+                return ""
+            i = end + 1
+        elif c in ".^$}" or c in quantifiers:
+            # Anchors and quantifiers
+            i += 1
+        else:
+            literal = c
+            i += 1
+        if literal is not None:
+            if i < size and expression[i] in quantifiers:
+                if isRequiredByQuantifier(i):
+                    currentLiteral += literal
+            else:
+                currentLiteral += literal
+                continue
+        if len(currentLiteral) > len(longestLiteral):
+            longestLiteral = currentLiteral
+        currentLiteral = ""
+    if len(currentLiteral) > len(longestLiteral):
+        longestLiteral = currentLiteral
+    return longestLiteral
+
+
+class ParsedResolverContext(object):
+    """The parsed, immutable representation of the serialized context data.
+    This is cached on the C++ side per context and passed to the
+    Resolver methods, so that the data doesn't have to be de-serialized
+    on every resolve call.
+    """
+
+    __slots__ = ("mappingPairs", "mappingRegexExpression", "mappingRegexFormat",
+                 "mappingRegexPattern", "mappingRegexRequiredLiteral", "searchPaths")
+
+    def __init__(self, data):
+        """Args:
+            data(dict): The de-serialized context data
+        """
+        self.mappingPairs = types.MappingProxyType(dict(data.get(Tokens.mappingPairs, {})))
+        self.mappingRegexExpression = data.get(Tokens.mappingRegexExpression, "")
+        self.mappingRegexFormat = data.get(Tokens.mappingRegexFormat, "")
+        self.mappingRegexPattern = re.compile(self.mappingRegexExpression) if self.mappingRegexExpression else None
+        self.mappingRegexRequiredLiteral = _GetRegexRequiredLiteral(self.mappingRegexExpression)
+        self.searchPaths = tuple(data.get(Tokens.searchPaths, []))
+
+    def MapPath(self, path):
+        """Map the path via the regex expression and the mapping pairs.
+        Args:
+            path(str): The path
+        Returns:
+            str: The mapped path
+        """
+        if not self.mappingPairs:
+            return path
+        if self.mappingRegexPattern is not None and self.mappingRegexRequiredLiteral in path:
+            path = self.mappingRegexPattern.sub(self.mappingRegexFormat, path)
+        return self.mappingPairs.get(path, path)
+
+
 class Resolver:
     @staticmethod
-    @log_function_args
-    def _CreateIdentifier(assetPath, anchorAssetPath, serializedContext, serializedFallbackContext):
+    @trace_function
+    def _CreateIdentifier(assetPath, anchorAssetPath, context, fallbackContext):
         """Returns an identifier for the asset specified by assetPath.
         If anchorAssetPath is not empty, it is the resolved asset path
         that assetPath should be anchored to if it is a relative path.
         Args:
             assetPath (str): An unresolved asset path.
             anchorAssetPath (Ar.ResolvedPath): An resolved anchor path.
-            serializedContext (str): The serialized context.
-            serializedFallbackContext (str): The serialized fallback context.
+            context (ParsedResolverContext|None): The parsed bound context.
+            fallbackContext (ParsedResolverContext|None): The parsed fallback context.
         Returns:
             str: The identifier.
         """
@@ -156,12 +462,12 @@ class Resolver:
         if not anchorAssetPath:
             return os.path.normpath(assetPath)
         anchoredAssetPath = _AnchorRelativePath(anchorAssetPath.GetPathString(), assetPath)
-        if (_IsSearchPath(assetPath) and not Resolver._Resolve(anchoredAssetPath,serializedContext, serializedFallbackContext)):
+        if (_IsSearchPath(assetPath) and not Resolver._Resolve(anchoredAssetPath, context, fallbackContext)):
             return os.path.normpath(assetPath)
         return os.path.normpath(anchoredAssetPath)
 
     @staticmethod
-    @log_function_args
+    @trace_function
     def _CreateIdentifierForNewAsset(assetPath, anchorAssetPath):
         """Return an identifier for a new asset at the given assetPath.
         This is similar to _CreateIdentifier but is used to create identifiers
@@ -184,12 +490,14 @@ class Resolver:
         return os.path.normpath(assetPath)
 
     @staticmethod
-    @log_function_args
-    def _Resolve(assetPath, serializedContext, serializedFallbackContext):
+    @trace_function
+    def _Resolve(assetPath, context, fallbackContext):
         """Return the resolved path for the given assetPath or an empty
         ArResolvedPath if no asset exists at that path.
         Args:
             assetPath (str): An unresolved asset path.
+            context (ParsedResolverContext|None): The parsed bound context.
+            fallbackContext (ParsedResolverContext|None): The parsed fallback context.
         Returns:
             Ar.ResolvedPath: The resolved path.
         """
@@ -199,23 +507,11 @@ class Resolver:
             return Ar.ResolvedPath(assetPath)
         if _IsRelativePath(assetPath):
             if Resolver._IsContextDependentPath(assetPath):
-                for data in [serializedContext, serializedFallbackContext]:
-                    if not data:
-                        continue
-                    try:
-                        ctx = json.loads(data)
-                    except Exception:
-                        print("Failed to extract context, data is not serialized json data: {data}".format(data=data))
+                for ctx in [context, fallbackContext]:
+                    if ctx is None:
                         continue
-                    mappingPairs = ctx.get(Tokens.mappingPairs, {})
-                    mappedPath = assetPath
-                    if mappingPairs:
-                        if ctx.get(Tokens.mappingRegexExpression, ""):
-                            mappedPath = re.sub(ctx[Tokens.mappingRegexExpression],
-                                                ctx.get(Tokens.mappingRegexFormat, ""),
-                                                mappedPath)
-                    mappedPath = mappingPairs.get(mappedPath, mappedPath)
-                    for searchPath in ctx.get(Tokens.searchPaths, []):
+                    mappedPath = ctx.MapPath(assetPath)
+                    for searchPath in ctx.searchPaths:
                         resolvedPath = _ResolveAnchored(searchPath, mappedPath)
                         if resolvedPath:
                             return resolvedPath
@@ -224,7 +520,7 @@ class Resolver:
         return _ResolveAnchored("", assetPath)
 
     @staticmethod
-    @log_function_args
+    @trace_function
     def _ResolveForNewAsset(assetPath):
         """Return the resolved path for the given assetPath that may be
         used to create a new asset or an empty ArResolvedPath if such a
@@ -240,7 +536,8 @@ class Resolver:
         return Ar.ResolvedPath(assetPath if not assetPath else os.path.abspath(os.path.normpath(assetPath)))
 
     @staticmethod
-    @log_function_args
+    @native_implementation
+    @trace_function
     def _IsContextDependentPath(assetPath):
         """Returns true if assetPath is a context-dependent path, false otherwise.
         Args:
@@ -251,7 +548,8 @@ class Resolver:
         return _IsSearchPath(assetPath)
 
     @staticmethod
-    @log_function_args
+    @native_implementation
+    @trace_function
     def _GetModificationTimestamp(assetPath, resolvedPath):
         """Return an ArTimestamp representing the last time the asset at assetPath was modified.
         Args:
@@ -264,9 +562,21 @@ class Resolver:
             return Ar.Timestamp()
         return Ar.Timestamp(os.path.getmtime(resolvedPath.GetPathString()))
 
+    @staticmethod
+    def _HasNativeImplementation(methodName):
+        """Returns true if the method is marked via the native_implementation decorator,
+        so that the resolver can use its native C++ implementation instead.
+        This only gets called once, when the method is first used.
+        Args:
+            methodName (str): The method name.
+        Returns:
+            bool: The native implementation state.
+        """
+        return getattr(getattr(Resolver, methodName, None), "nativeImplementation", False)
+
 class ResolverContext:
     @staticmethod
-    @log_function_args
+    @trace_function
     def LoadOrRefreshData(mappingFilePath, searchPathsEnv, mappingRegexExpressionEnv, mappingRegexFormatEnv):
         """Load or refresh the mapping pairs from file and the search paths from the
         configured environment variables.
@@ -289,4 +599,26 @@ class ResolverContext:
         # Mapping Pairs
         mappingPairs = _GetMappingPairsFromUsdFile(mappingFilePath)
         ctx[Tokens.mappingPairs] = mappingPairs
-        return json.dumps(ctx)
\ No newline at end of file
+        return json.dumps(ctx)
+
+    @staticmethod
+    @trace_function
+    def ParseData(serializedData):
+        """Parse the serialized context data. This only gets called
+        whenever the context data has changed, the result is then cached
+        on the context and passed to the Resolver methods.
+        Args:
+            serializedData(str): The serialized json context data
+        Returns:
+            ParsedResolverContext|None: The parsed context or None if the data is invalid.
+        """
+        if not serializedData:
+            return None
+        try:
+            return ParsedResolverContext(json.loads(serializedData))
+        except Exception:
+            print("Failed to extract context, data is not serialized json data: {data}".format(data=serializedData))
+            return None
+
+
+_EnableTracingFromEnv()
@@ -6,8 +6,10 @@
 
 #include "pxr/base/arch/systemInfo.h"
 #include "pxr/base/tf/fileUtils.h"
+#include "pxr/base/tf/getenv.h"
 #include "pxr/base/tf/pathUtils.h"
 #include "pxr/base/tf/pyInvoke.h"
+#include "pxr/base/tf/pyLock.h"
 #include "pxr/base/tf/staticTokens.h"
 #include "pxr/usd/ar/defineResolver.h"
 #include "pxr/usd/ar/filesystemAsset.h"
@@ -15,17 +17,43 @@
 #include "pxr/usd/ar/notice.h"
 #include "pxr/usd/ar/timestamp.h"
 
+#include <algorithm>
+#include <chrono>
 #include <fstream>
 #include <iostream>
 #include <map>
+#include <mutex>
+#include <optional>
+#include <utility>
 #include <string>
 #include <regex>
 
 PXR_NAMESPACE_OPEN_SCOPE
 
+static bool
+_IsRelativePath(const std::string& path)
+{
+    return (!path.empty() && TfIsRelativePath(path));
+}
+
+static bool
+_IsFileRelativePath(const std::string& path) {
+    return path.find("./") == 0 || path.find("../") == 0;
+}
+
+static bool
+_IsSearchPath(const std::string& path)
+{
+    return _IsRelativePath(path) && !_IsFileRelativePath(path);
+}
+
 AR_DEFINE_RESOLVER(PythonResolver, ArResolver);
 
-PythonResolver::PythonResolver() = default;
+PythonResolver::PythonResolver() {
+    this->SetSharedContextCapacity(std::max(0, TfGetenvInt(DEFINE_STRING(AR_ENV_SHARED_CONTEXT_CAPACITY), 0)));
+    this->SetSharedContextMemoryLimit(static_cast<size_t>(std::max(0, TfGetenvInt(DEFINE_STRING(AR_ENV_SHARED_CONTEXT_MEMORY_LIMIT), 0))) * 1024 * 1024);
+    this->SetSharedContextRevalidationInterval(TfGetenvDouble(DEFINE_STRING(AR_ENV_SHARED_CONTEXT_REVALIDATION_INTERVAL), 0.0));
+};
 
 PythonResolver::~PythonResolver() = default;
 
@@ -34,20 +62,36 @@ PythonResolver::_CreateIdentifier(
     const std::string& assetPath,
     const ArResolvedPath& anchorAssetPath) const
 {
-    const PythonResolverContext* contexts[2] = {this->_GetCurrentContextPtr(), &_fallbackContext};
-    std::string serializedContext = "";
-    std::string serializedFallbackContext = _fallbackContext.GetData(); 
-    if (contexts[0] != nullptr){serializedContext=this->_GetCurrentContextPtr()->GetData();}
-    TF_DEBUG(PYTHONRESOLVER_RESOLVER).Msg("Resolver::_CreateIdentifier('%s', '%s', '%s', '%s')\n",
-                                          assetPath.c_str(), anchorAssetPath.GetPathString().c_str(),
-                                          serializedContext.c_str(), serializedFallbackContext.c_str());
+    TF_DEBUG(PYTHONRESOLVER_RESOLVER).Msg("Resolver::_CreateIdentifier('%s', '%s')\n",
+                                          assetPath.c_str(), anchorAssetPath.GetPathString().c_str());
+    _statistics.Increment(PythonResolverCounter::CreateIdentifiers);
+    _CachePtr currentCache = this->_GetCurrentCache();
+    // Identifiers depend on the anchor, so we key them by both.
+    std::string cacheKey;
+    if (currentCache) {
+        cacheKey = assetPath + '\0' + anchorAssetPath.GetPathString();
+        std::string identifier;
+        if (currentCache->identifiers.Find(cacheKey, identifier)) {
+            _statistics.Increment(PythonResolverCounter::CreateIdentifierScopedCacheHits);
+            return identifier;
+        }
+    }
+    const std::chrono::steady_clock::time_point gilWaitStartTime = std::chrono::steady_clock::now();
+    TfPyLock pyLock;
+    _statistics.GetLatency(PythonResolverLatency::GilWait).Record(std::chrono::steady_clock::now() - gilWaitStartTime);
+    TfPyObjWrapper parsedContext;
+    TfPyObjWrapper parsedFallbackContext;
+    this->_GetParsedContexts(&parsedContext, &parsedFallbackContext);
     std::string pythonResult;
+    ScopedLatency pythonLatency(_statistics.GetLatency(PythonResolverLatency::PythonCreateIdentifier));
     int state = TfPyInvokeAndExtract(DEFINE_STRING(AR_PYTHONRESOLVER_USD_PYTHON_EXPOSE_MODULE_NAME),
                                      "Resolver._CreateIdentifier",
-                                     &pythonResult, assetPath, anchorAssetPath, serializedContext, serializedFallbackContext);
+                                     &pythonResult, assetPath, anchorAssetPath, parsedContext, parsedFallbackContext);
     if (!state) {
         std::cerr << "Failed to call Resolver._CreateIdentifier in " << DEFINE_STRING(AR_PYTHONRESOLVER_USD_PYTHON_EXPOSE_MODULE_NAME) << ".py. ";
         std::cerr << "Please verify that the python code is valid!" << std::endl;
+    } else if (currentCache) {
+        currentCache->identifiers.Insert(cacheKey, pythonResult);
     }
     return pythonResult;
 }
@@ -61,6 +105,7 @@ PythonResolver::_CreateIdentifierForNewAsset(
         "Resolver::_CreateIdentifierForNewAsset ('%s', '%s')\n",
         assetPath.c_str(), anchorAssetPath.GetPathString().c_str());
     std::string pythonResult;
+    ScopedLatency pythonLatency(_statistics.GetLatency(PythonResolverLatency::PythonCreateIdentifierForNewAsset));
     int state = TfPyInvokeAndExtract(DEFINE_STRING(AR_PYTHONRESOLVER_USD_PYTHON_EXPOSE_MODULE_NAME),
                                      "Resolver._CreateIdentifierForNewAsset",
                                      &pythonResult, assetPath, anchorAssetPath);
@@ -75,19 +120,32 @@ ArResolvedPath
 PythonResolver::_Resolve(
     const std::string& assetPath) const
 {
-    const PythonResolverContext* contexts[2] = {this->_GetCurrentContextPtr(), &_fallbackContext};
-    std::string serializedContext = "";
-    std::string serializedFallbackContext = _fallbackContext.GetData(); 
-    if (contexts[0] != nullptr){serializedContext=this->_GetCurrentContextPtr()->GetData();}
-    TF_DEBUG(PYTHONRESOLVER_RESOLVER).Msg("Resolver::_Resolve('%s', '%s', '%s')\n", assetPath.c_str(),
-                                          serializedContext.c_str(), serializedFallbackContext.c_str());
+    TF_DEBUG(PYTHONRESOLVER_RESOLVER).Msg("Resolver::_Resolve('%s')\n", assetPath.c_str());
+    _statistics.Increment(PythonResolverCounter::Resolves);
+    _CachePtr currentCache = this->_GetCurrentCache();
+    if (currentCache) {
+        std::string resolvedPathStr;
+        if (currentCache->resolvedPaths.Find(assetPath, resolvedPathStr)) {
+            _statistics.Increment(PythonResolverCounter::ResolveScopedCacheHits);
+            return ArResolvedPath(resolvedPathStr);
+        }
+    }
+    const std::chrono::steady_clock::time_point gilWaitStartTime = std::chrono::steady_clock::now();
+    TfPyLock pyLock;
+    _statistics.GetLatency(PythonResolverLatency::GilWait).Record(std::chrono::steady_clock::now() - gilWaitStartTime);
+    TfPyObjWrapper parsedContext;
+    TfPyObjWrapper parsedFallbackContext;
+    this->_GetParsedContexts(&parsedContext, &parsedFallbackContext);
     ArResolvedPath pythonResult;
+    ScopedLatency pythonLatency(_statistics.GetLatency(PythonResolverLatency::PythonResolve));
     int state = TfPyInvokeAndExtract(DEFINE_STRING(AR_PYTHONRESOLVER_USD_PYTHON_EXPOSE_MODULE_NAME),
                                      "Resolver._Resolve",
-                                     &pythonResult, assetPath, serializedContext, serializedFallbackContext);
+                                     &pythonResult, assetPath, parsedContext, parsedFallbackContext);
     if (!state) {
         std::cerr << "Failed to call Resolver._Resolve in " << DEFINE_STRING(AR_PYTHONRESOLVER_USD_PYTHON_EXPOSE_MODULE_NAME) << ".py. ";
         std::cerr << "Please verify that the python code is valid!" << std::endl;
+    } else if (currentCache) {
+        currentCache->resolvedPaths.Insert(assetPath, pythonResult.GetPathString());
     }
     return pythonResult;
 }
@@ -98,6 +156,7 @@ PythonResolver::_ResolveForNewAsset(
 {
     TF_DEBUG(PYTHONRESOLVER_RESOLVER).Msg("Resolver::_ResolveForNewAsset('%s')\n", assetPath.c_str());
     ArResolvedPath pythonResult;
+    ScopedLatency pythonLatency(_statistics.GetLatency(PythonResolverLatency::PythonResolveForNewAsset));
     int state = TfPyInvokeAndExtract(DEFINE_STRING(AR_PYTHONRESOLVER_USD_PYTHON_EXPOSE_MODULE_NAME),
                                      "Resolver._ResolveForNewAsset",
                                      &pythonResult, assetPath);
@@ -130,10 +189,7 @@ PythonResolver::_CreateDefaultContextForAsset(
     if (assetPath.empty()){
         return ArResolverContext(_fallbackContext);
     }
-    ArResolvedPath resolvedPath = this->_Resolve(assetPath);
-    if (!TfPathExists(resolvedPath)){
-        return ArResolverContext(_fallbackContext);
-    }
+    // Reuse the bound context before touching the file system.
     if (this->_GetCurrentContextPtr() != nullptr)
     {
         if (TfDebug::IsEnabled(PYTHONRESOLVER_RESOLVER_CONTEXT))
@@ -149,27 +205,49 @@ PythonResolver::_CreateDefaultContextForAsset(
         }
         return ArResolverContext(*this->_GetCurrentContextPtr());
     }
-    auto map_iter = _sharedContexts.find(resolvedPath);
-    if(map_iter != _sharedContexts.end()){
-        if (map_iter->second.timestamp.GetTime() == this->_GetModificationTimestamp(assetPath, resolvedPath).GetTime())
+    ArResolvedPath resolvedPath = this->_Resolve(assetPath);
+    // Shared contexts that were validated recently are reused without
+    // re-checking the mapping file's existence and timestamp.
+    const std::chrono::steady_clock::time_point now = std::chrono::steady_clock::now();
+    const std::chrono::duration<double> revalidationInterval(_sharedContextRevalidationInterval.load());
+    if (revalidationInterval.count() > 0.0) {
+        std::optional<PythonResolverContextRecord> validRecord;
         {
-            TF_DEBUG(PYTHONRESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Reusing context on different stage\n", assetPath.c_str());
-            return ArResolverContext(map_iter->second.ctx);
-        }else{
-            TF_DEBUG(PYTHONRESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Reusing context on different stage, reloading due to changed timestamp\n", assetPath.c_str());
-            map_iter->second.ctx.LoadOrRefreshData();
-            return ArResolverContext(map_iter->second.ctx);
+            // Other threads may hold the record's lock while calling into Python.
+            TF_PY_ALLOW_THREADS_IN_SCOPE();
+            validRecord = _sharedContexts.FindIf(resolvedPath,
+                [&](const PythonResolverContextRecord& record) { return now - record.validationTime < revalidationInterval; });
+        }
+        if (validRecord) {
+            TF_DEBUG(PYTHONRESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Reusing recently validated context on different stage\n", assetPath.c_str());
+            return ArResolverContext(validRecord->ctx);
         }
     }
-    // Create new context
-    TF_DEBUG(PYTHONRESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Constructing new context\n", assetPath.c_str());
-    std::string resolvedPathStr = resolvedPath.GetPathString();
-    std::string assetDir = TfGetPathName(TfAbsPath(resolvedPathStr));
-    struct PythonResolverContextRecord record
-    {
-        this->_GetModificationTimestamp(assetPath, resolvedPath), PythonResolverContext(resolvedPath)
-    };
-    _sharedContexts.insert(std::pair<std::string, PythonResolverContextRecord>(resolvedPath, record));
+    if (!TfPathExists(resolvedPath)){
+        return ArResolverContext(_fallbackContext);
+    }
+    // The shared contexts are constructed only once per mapping file, concurrent
+    // stage opens of the same mapping file wait for the first one to finish.
+    const ArTimestamp timestamp = this->_GetModificationTimestamp(assetPath, resolvedPath);
+    // Constructing and reloading contexts calls into Python, so we have to release
+    // the GIL while waiting for other threads that construct the same context.
+    TF_PY_ALLOW_THREADS_IN_SCOPE();
+    PythonResolverContextRecord record = _sharedContexts.GetOrCreate(resolvedPath,
+        [&]() {
+            TF_DEBUG(PYTHONRESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Constructing new context\n", assetPath.c_str());
+            return PythonResolverContextRecord{timestamp, PythonResolverContext(resolvedPath), now};
+        },
+        [&](PythonResolverContextRecord& record) {
+            record.validationTime = now;
+            if (record.timestamp.GetTime() == timestamp.GetTime())
+            {
+                TF_DEBUG(PYTHONRESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Reusing context on different stage\n", assetPath.c_str());
+            }else{
+                TF_DEBUG(PYTHONRESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_CreateDefaultContextForAsset('%s') - Reusing context on different stage, reloading due to changed timestamp\n", assetPath.c_str());
+                record.ctx.LoadOrRefreshData();
+                record.timestamp = timestamp;
+            }
+        });
     return ArResolverContext(record.ctx);
 }
 
@@ -178,13 +256,29 @@ PythonResolver::_IsContextDependentPath(
     const std::string& assetPath) const
 {
     TF_DEBUG(PYTHONRESOLVER_RESOLVER_CONTEXT).Msg("Resolver::_IsContextDependentPath()\n");
+    if (this->_HasNativeImplementation(_NativeIsContextDependentPath)) {
+        _statistics.Increment(PythonResolverCounter::NativeHookCalls);
+        return _IsSearchPath(assetPath);
+    }
+    _CachePtr currentCache = this->_GetCurrentCache();
+    if (currentCache) {
+        std::lock_guard<std::mutex> lock(currentCache->contextDependentPathsMutex);
+        auto it = currentCache->contextDependentPaths.find(assetPath);
+        if (it != currentCache->contextDependentPaths.end()) {
+            return it->second;
+        }
+    }
     bool pythonResult;
+    ScopedLatency pythonLatency(_statistics.GetLatency(PythonResolverLatency::PythonIsContextDependentPath));
     int state = TfPyInvokeAndExtract(DEFINE_STRING(AR_PYTHONRESOLVER_USD_PYTHON_EXPOSE_MODULE_NAME),
                                      "Resolver._IsContextDependentPath",
                                      &pythonResult, assetPath);
     if (!state) {
         std::cerr << "Failed to call Resolver._IsContextDependentPath in " << DEFINE_STRING(AR_PYTHONRESOLVER_USD_PYTHON_EXPOSE_MODULE_NAME) << ".py. ";
         std::cerr << "Please verify that the python code is valid!" << std::endl;
+    } else if (currentCache) {
+        std::lock_guard<std::mutex> lock(currentCache->contextDependentPathsMutex);
+        currentCache->contextDependentPaths.emplace(assetPath, pythonResult);
     }
     return pythonResult;
 }
@@ -198,6 +292,11 @@ PythonResolver::_RefreshContext(
     if (!ctx) {
         return;
     }
+    // Refreshed contexts have to be re-resolved, even within a cache scope.
+    if (_CachePtr currentCache = this->_GetCurrentCache()) {
+        currentCache->resolvedPaths.Clear();
+        currentCache->identifiers.Clear();
+    }
     ArNotice::ResolverChanged(*ctx).Send();
 }
 
@@ -209,7 +308,15 @@ PythonResolver::_GetModificationTimestamp(
     TF_DEBUG(PYTHONRESOLVER_RESOLVER).Msg(
         "Resolver::GetModificationTimestamp('%s', '%s')\n",
         assetPath.c_str(), resolvedPath.GetPathString().c_str());
+    if (this->_HasNativeImplementation(_NativeGetModificationTimestamp)) {
+        _statistics.Increment(PythonResolverCounter::NativeHookCalls);
+        if (!TfIsFile(resolvedPath.GetPathString(), true)) {
+            return ArTimestamp();
+        }
+        return ArFilesystemAsset::GetModificationTimestamp(resolvedPath);
+    }
     ArTimestamp pythonResult;
+    ScopedLatency pythonLatency(_statistics.GetLatency(PythonResolverLatency::PythonGetModificationTimestamp));
     int state = TfPyInvokeAndExtract(DEFINE_STRING(AR_PYTHONRESOLVER_USD_PYTHON_EXPOSE_MODULE_NAME),
                                      "Resolver._GetModificationTimestamp",
                                      &pythonResult, assetPath, resolvedPath);
@@ -242,10 +349,71 @@ PythonResolver::_OpenAssetForWrite(
     return ArFilesystemWritableAsset::Create(resolvedPath, writeMode);
 }
 
-const PythonResolverContext* 
+void
+PythonResolver::_BeginCacheScope(
+    VtValue* cacheScopeData)
+{
+    _threadCache.BeginCacheScope(cacheScopeData);
+}
+
+void
+PythonResolver::_EndCacheScope(
+    VtValue* cacheScopeData)
+{
+    _threadCache.EndCacheScope(cacheScopeData);
+}
+
+PythonResolver::_CachePtr
+PythonResolver::_GetCurrentCache() const
+{
+    return _threadCache.GetCurrentCache();
+}
+
+bool
+PythonResolver::_HasNativeImplementation(
+    _NativeImplementation implementation) const
+{
+    int nativeImplementations = _nativeImplementations.load();
+    if (nativeImplementations < 0) {
+        // Concurrent first calls may query the module more than once, which
+        // is harmless, but serializing them could deadlock on the GIL.
+        nativeImplementations = 0;
+        const std::pair<_NativeImplementation, std::string> methods[] = {
+            {_NativeIsContextDependentPath, "_IsContextDependentPath"},
+            {_NativeGetModificationTimestamp, "_GetModificationTimestamp"}};
+        for (const auto& [flag, methodName] : methods) {
+            bool pythonResult = false;
+            int state = TfPyInvokeAndExtract(DEFINE_STRING(AR_PYTHONRESOLVER_USD_PYTHON_EXPOSE_MODULE_NAME),
+                                             "Resolver._HasNativeImplementation",
+                                             &pythonResult, methodName);
+            if (state && pythonResult) {
+                TF_DEBUG(PYTHONRESOLVER_RESOLVER).Msg("Resolver::_HasNativeImplementation('%s') - Using native implementation\n", methodName.c_str());
+                nativeImplementations |= flag;
+            }
+        }
+        _nativeImplementations.store(nativeImplementations);
+    }
+    return (nativeImplementations & implementation) != 0;
+}
+
+const PythonResolverContext*
 PythonResolver::_GetCurrentContextPtr() const
 {
     return _GetCurrentContextObject<PythonResolverContext>();
 }
 
+void
+PythonResolver::_GetParsedContexts(
+    TfPyObjWrapper* parsedContext,
+    TfPyObjWrapper* parsedFallbackContext) const
+{
+    // The parsed context data is cached on the context itself, so
+    // that we don't have to de-serialize it on every call.
+    const PythonResolverContext* ctx = this->_GetCurrentContextPtr();
+    if (ctx != nullptr){
+        *parsedContext = ctx->GetParsedData();
+    }
+    *parsedFallbackContext = _fallbackContext.GetParsedData();
+}
+
 PXR_NAMESPACE_CLOSE_SCOPE
\ No newline at end of file
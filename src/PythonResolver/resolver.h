@@ -4,24 +4,56 @@
 #include "api.h"
 #include "debugCodes.h"
 #include "resolverContext.h"
+#include "resolver_statistics.h"
+#include "shared_context_registry.h"
+#include "concurrent_string_map.h"
 
 #include "pxr/pxr.h"
 #include "pxr/usd/ar/resolver.h"
+#include "pxr/usd/ar/threadLocalScopedCache.h"
 
+#include <atomic>
+#include <chrono>
 #include <memory>
+#include <mutex>
 #include <string>
 #include <map>
+#include <vector>
+#include <unordered_map>
 
 PXR_NAMESPACE_OPEN_SCOPE
 
+enum class PythonResolverCounter
+{
+    Resolves,
+    ResolveScopedCacheHits,
+    CreateIdentifiers,
+    CreateIdentifierScopedCacheHits,
+    NativeHookCalls,
+    Count
+};
+
+enum class PythonResolverLatency
+{
+    PythonCreateIdentifier,
+    PythonCreateIdentifierForNewAsset,
+    PythonResolve,
+    PythonResolveForNewAsset,
+    PythonIsContextDependentPath,
+    PythonGetModificationTimestamp,
+    GilWait,
+    Count
+};
+
+using PythonResolverStatistics = ResolverStatistics<PythonResolverCounter, PythonResolverLatency>;
+
 struct PythonResolverContextRecord
 {
     ArTimestamp timestamp;
     PythonResolverContext ctx;
+    std::chrono::steady_clock::time_point validationTime;
 };
 
-static std::map<std::string, PythonResolverContextRecord> _sharedContexts;
-
 class PythonResolver final : public ArResolver
 {
 public:
@@ -31,6 +63,31 @@ public:
     AR_PYTHONRESOLVER_API
     virtual ~PythonResolver();
 
+    AR_PYTHONRESOLVER_API
+    std::vector<std::string> GetSharedContextMappingFilePaths() const { return _sharedContexts.Keys(); }
+    AR_PYTHONRESOLVER_API
+    size_t GetSharedContextMemoryUsage() const { return _sharedContexts.GetMemoryUsage(); }
+    AR_PYTHONRESOLVER_API
+    size_t GetSharedContextCapacity() const { return _sharedContexts.GetCapacity(); }
+    AR_PYTHONRESOLVER_API
+    void SetSharedContextCapacity(size_t capacity) { _sharedContexts.SetCapacity(capacity); }
+    AR_PYTHONRESOLVER_API
+    size_t GetSharedContextMemoryLimit() const { return _sharedContexts.GetMemoryLimit(); }
+    AR_PYTHONRESOLVER_API
+    void SetSharedContextMemoryLimit(size_t memoryLimit) { _sharedContexts.SetMemoryLimit(memoryLimit); }
+    AR_PYTHONRESOLVER_API
+    double GetSharedContextRevalidationInterval() const { return _sharedContextRevalidationInterval.load(); }
+    AR_PYTHONRESOLVER_API
+    void SetSharedContextRevalidationInterval(double seconds) { _sharedContextRevalidationInterval.store(seconds > 0.0 ? seconds : 0.0); }
+    AR_PYTHONRESOLVER_API
+    bool RemoveSharedContext(const std::string& mappingFilePath) { return _sharedContexts.Erase(mappingFilePath); }
+    AR_PYTHONRESOLVER_API
+    size_t PurgeSharedContexts(bool force) { return _sharedContexts.Purge(force); }
+    AR_PYTHONRESOLVER_API
+    const PythonResolverStatistics& GetStatistics() const { return _statistics; }
+    AR_PYTHONRESOLVER_API
+    void ResetStatistics() { _statistics.Reset(); }
+
 protected:
     AR_PYTHONRESOLVER_API
     std::string _CreateIdentifier(
@@ -78,10 +135,55 @@ protected:
     std::shared_ptr<ArWritableAsset> _OpenAssetForWrite(
         const ArResolvedPath& resolvedPath,
         WriteMode writeMode) const final;
+
+    AR_PYTHONRESOLVER_API
+    void _BeginCacheScope(
+        VtValue* cacheScopeData) final;
+
+    AR_PYTHONRESOLVER_API
+    void _EndCacheScope(
+        VtValue* cacheScopeData) final;
     
 private:
+    // The scoped cache stores the results of the Python calls for the
+    // lifetime of an ArResolverScopedCache, so that e.g. a stage open only
+    // calls into Python once per identifier.
+    struct _Cache
+    {
+        ConcurrentStringMap resolvedPaths;
+        ConcurrentStringMap identifiers;
+        std::mutex contextDependentPathsMutex;
+        std::unordered_map<std::string, bool> contextDependentPaths;
+    };
+    using _PerThreadCache = ArThreadLocalScopedCache<_Cache>;
+    using _CachePtr = _PerThreadCache::CachePtr;
+    _CachePtr _GetCurrentCache() const;
+
+    // Hooks that the Python module marks as identical to our native
+    // implementation, so that we can skip calling into Python for them.
+    enum _NativeImplementation
+    {
+        _NativeIsContextDependentPath = 1 << 0,
+        _NativeGetModificationTimestamp = 1 << 1
+    };
+    bool _HasNativeImplementation(_NativeImplementation implementation) const;
+
     const PythonResolverContext* _GetCurrentContextPtr() const;
+    void _GetParsedContexts(TfPyObjWrapper* parsedContext, TfPyObjWrapper* parsedFallbackContext) const;
     PythonResolverContext _fallbackContext;
+    mutable SharedContextRegistry<PythonResolverContextRecord> _sharedContexts{
+        [](PythonResolverContextRecord const& record) { return record.ctx.GetUseCount() > 1; },
+        [](PythonResolverContextRecord const& record) { return record.ctx.GetMemoryUsage(); }
+    };
+    std::atomic<double> _sharedContextRevalidationInterval{0.0};
+    // A bitmask of _NativeImplementation flags, queried on first use (-1 until then).
+    mutable std::atomic<int> _nativeImplementations{-1};
+    mutable PythonResolverStatistics _statistics{
+        {"resolves", "resolveScopedCacheHits", "createIdentifiers", "createIdentifierScopedCacheHits", "nativeHookCalls"},
+        {"pythonCreateIdentifier", "pythonCreateIdentifierForNewAsset", "pythonResolve", "pythonResolveForNewAsset",
+         "pythonIsContextDependentPath", "pythonGetModificationTimestamp", "gilWait"}
+    };
+    mutable _PerThreadCache _threadCache;
 };
 
 PXR_NAMESPACE_CLOSE_SCOPE
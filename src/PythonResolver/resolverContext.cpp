@@ -7,8 +7,10 @@
 #include "pxr/pxr.h"
 #include "pxr/base/tf/pathUtils.h"
 #include "pxr/base/tf/pyInvoke.h"
+#include "pxr/base/tf/pyLock.h"
 
 #include <iostream>
+#include <mutex>
 
 PXR_NAMESPACE_USING_DIRECTIVE
 
@@ -56,6 +58,14 @@ size_t hash_value(const PythonResolverContext& ctx)
 }
 
 
+size_t PythonResolverContext::GetMemoryUsage() const{
+    // This is an estimate, the memory held by the parsed
+    // Python objects is not accounted for.
+    size_t memoryUsage = sizeof(PythonResolverContextParsedData) + 2 * sizeof(std::string);
+    memoryUsage += _mappingFilePath->capacity() + _data->capacity();
+    return memoryUsage;
+}
+
 void PythonResolverContext::LoadOrRefreshData(){
     TF_DEBUG(PYTHONRESOLVER_RESOLVER_CONTEXT).Msg("ResolverContext::LoadOrRefreshData('%s', '%s', '%s', '%s') - Loading data\n", this->GetMappingFilePath().c_str(), DEFINE_STRING(AR_ENV_SEARCH_PATHS), DEFINE_STRING(AR_ENV_SEARCH_REGEX_EXPRESSION), DEFINE_STRING(AR_ENV_SEARCH_REGEX_FORMAT));
     std::string pythonResult;    
@@ -69,4 +79,35 @@ void PythonResolverContext::LoadOrRefreshData(){
     }
     TF_DEBUG(PYTHONRESOLVER_RESOLVER_CONTEXT).Msg("ResolverContext::LoadOrRefreshData('%s') - Loaded data '%s'\n", this->GetMappingFilePath().c_str(), pythonResult.c_str());
     this->SetData(pythonResult);
-}
\ No newline at end of file
+}
+
+TfPyObjWrapper PythonResolverContext::GetParsedData() const{
+    // We acquire the GIL before our own lock, to keep the same lock order
+    // as threads that call into the resolver from Python.
+    TfPyLock pyLock;
+    const size_t revision = this->GetDataRevision();
+    {
+        const std::lock_guard<std::mutex> lock(_parsedData->mutex);
+        if (_parsedData->data && _parsedData->revision == revision){
+            return *_parsedData->data;
+        }
+    }
+    TF_DEBUG(PYTHONRESOLVER_RESOLVER_CONTEXT).Msg("ResolverContext::GetParsedData('%s') - Parsing data of revision %zu\n", this->GetMappingFilePath().c_str(), revision);
+    TfPyObjWrapper pythonResult;
+    int state = TfPyInvokeAndExtract(DEFINE_STRING(AR_PYTHONRESOLVER_USD_PYTHON_EXPOSE_MODULE_NAME),
+                                     "ResolverContext.ParseData",
+                                     &pythonResult, this->GetData());
+    if (!state) {
+        std::cerr << "Failed to call ResolverContext.ParseData in " << DEFINE_STRING(AR_PYTHONRESOLVER_USD_PYTHON_EXPOSE_MODULE_NAME) << ".py. ";
+        std::cerr << "Please verify that the python code is valid!" << std::endl;
+    }
+    {
+        // Don't overwrite the cache, if the data was changed while parsing.
+        const std::lock_guard<std::mutex> lock(_parsedData->mutex);
+        if (revision == this->GetDataRevision()){
+            _parsedData->revision = revision;
+            _parsedData->data = pythonResult;
+        }
+    }
+    return pythonResult;
+}
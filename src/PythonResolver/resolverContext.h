@@ -5,10 +5,14 @@
 #include "debugCodes.h"
 
 #include "pxr/pxr.h"
+#include "pxr/base/tf/pyObjWrapper.h"
 #include "pxr/usd/ar/defineResolverContext.h"
 #include "pxr/usd/ar/resolverContext.h"
 
+#include <atomic>
 #include <memory>
+#include <mutex>
+#include <optional>
 #include <regex>
 #include <string>
 
@@ -20,8 +24,20 @@ instead of passing thru the pointer. This way we can send
 > ArNotice::ResolverChanged(*ctx).Send();
 notifications to the stages.
 > See for more info: https://groups.google.com/g/usd-interest/c/9JrXGGbzBnQ/m/_f3oaqBdAwAJ
+As de-serializing the data on every resolve call is expensive, we also keep
+the parsed Python object of the data. It is keyed by a data revision counter,
+that gets bumped whenever the data changes, and re-parsed lazily on next access.
 */
 
+struct PythonResolverContextParsedData
+{
+    std::mutex mutex;
+    size_t revision = 0;
+    // This is only populated on first access, as contexts may be constructed
+    // before the Python interpreter is initialized.
+    std::optional<PXR_NS::TfPyObjWrapper> data;
+};
+
 class PythonResolverContext
 {
 public:
@@ -52,11 +68,21 @@ public:
     AR_PYTHONRESOLVER_API
     const std::string GetData() const { return *_data; }
     AR_PYTHONRESOLVER_API
-    void SetData(std::string data) { *_data = data; }
+    void SetData(std::string data) { *_data = data; ++(*_dataRevision); }
+    AR_PYTHONRESOLVER_API
+    size_t GetDataRevision() const { return _dataRevision->load(); }
+    AR_PYTHONRESOLVER_API
+    PXR_NS::TfPyObjWrapper GetParsedData() const;
+    AR_PYTHONRESOLVER_API
+    size_t GetMemoryUsage() const;
+    AR_PYTHONRESOLVER_API
+    long GetUseCount() const { return _data.use_count(); }
 private:
     // Vars
     std::shared_ptr<std::string> _mappingFilePath = std::make_shared<std::string>();
     std::shared_ptr<std::string> _data = std::make_shared<std::string>();
+    std::shared_ptr<std::atomic<size_t>> _dataRevision = std::make_shared<std::atomic<size_t>>(0);
+    std::shared_ptr<PythonResolverContextParsedData> _parsedData = std::make_shared<PythonResolverContextParsedData>();
 };
 
 PXR_NAMESPACE_OPEN_SCOPE
@@ -172,6 +172,24 @@ class TestArResolver(unittest.TestCase):
                 resolved_path = resolver.Resolve(layer_file_path)
                 self.assertEqual(resolved_path.GetPathString(), layer_file_path)
 
+    def test_NativeImplementations(self):
+        with tempfile.TemporaryDirectory() as temp_dir_path:
+            layer_file_path = os.path.join(temp_dir_path, "layer.usd")
+            Sdf.Layer.CreateAnonymous().Export(layer_file_path)
+            resolver = Ar.GetResolver()
+            # The default PythonExpose.py methods are marked as native,
+            # the results have to match their Python implementation.
+            self.assertTrue(resolver.IsContextDependentPath("assets/layer.usd"))
+            self.assertFalse(resolver.IsContextDependentPath("./assets/layer.usd"))
+            self.assertFalse(resolver.IsContextDependentPath("../assets/layer.usd"))
+            self.assertFalse(resolver.IsContextDependentPath(layer_file_path))
+            self.assertFalse(resolver.IsContextDependentPath(""))
+            timestamp = resolver.GetModificationTimestamp(layer_file_path, Ar.ResolvedPath(layer_file_path))
+            self.assertTrue(timestamp.IsValid())
+            self.assertEqual(timestamp.GetTime(), os.path.getmtime(layer_file_path))
+            timestamp = resolver.GetModificationTimestamp(temp_dir_path, Ar.ResolvedPath(temp_dir_path))
+            self.assertFalse(timestamp.IsValid())
+
     def test_ResolveForNewAsset(self):
         resolver = Ar.GetResolver()
 
@@ -215,6 +233,31 @@ class TestArResolver(unittest.TestCase):
                 # Uncached result should now return empty result
                 self.assertEqual("", resolver.Resolve(layer_identifier))
 
+    def test_ResolveWithScopedCacheContextEdits(self):
+        with tempfile.TemporaryDirectory() as temp_dir_path:
+            # Create context
+            ctx = PythonResolver.ResolverContext()
+            ctx_data = json.loads(ctx.GetData())
+            ctx_data[PythonResolver.Tokens.searchPaths] = [temp_dir_path]
+            ctx.SetData(json.dumps(ctx_data))
+            # Create files
+            layer_v001_identifier = "layer_v001.usd"
+            layer_v001_file_path = os.path.join(temp_dir_path, layer_v001_identifier)
+            Sdf.Layer.CreateAnonymous().Export(layer_v001_file_path)
+            layer_v002_identifier = "layer_v002.usd"
+            layer_v002_file_path = os.path.join(temp_dir_path, layer_v002_identifier)
+            Sdf.Layer.CreateAnonymous().Export(layer_v002_file_path)
+            # Get resolver
+            resolver = Ar.GetResolver()
+            with Ar.ResolverContextBinder(ctx):
+                with Ar.ResolverScopedCache():
+                    self.assertEqual(layer_v001_file_path, resolver.Resolve(layer_v001_identifier))
+                    # Within the cache scope, the Python results are re-used
+                    ctx_data[PythonResolver.Tokens.mappingPairs] = {layer_v001_identifier: layer_v002_identifier}
+                    ctx.SetData(json.dumps(ctx_data))
+                    self.assertEqual(layer_v001_file_path, resolver.Resolve(layer_v001_identifier))
+                self.assertEqual(layer_v002_file_path, resolver.Resolve(layer_v001_identifier))
+
     def test_ResolveWithContext(self):
         with tempfile.TemporaryDirectory() as temp_dir_path:
             # Create context
@@ -357,6 +400,42 @@ class TestArResolver(unittest.TestCase):
         ctx_data = json.loads(ctx.GetData())
         self.assertEqual(ctx_data[PythonResolver.Tokens.mappingRegexExpression], "(cube)")
         self.assertEqual(ctx_data[PythonResolver.Tokens.mappingRegexFormat], "Cube")
+        parsed_data = ctx.GetParsedData()
+        self.assertEqual(parsed_data.mappingRegexPattern.pattern, "(cube)")
+        self.assertEqual(parsed_data.mappingRegexRequiredLiteral, "cube")
+        # Every path that the expression matches has to contain the required literal
+        for expression, paths in [("x{10}", ["xxxxxxxxxx"]), ("ab{2,3}c", ["abbc", "abbbc"]), (r"\d{2}_v", ["12_v"]),
+                                  (r"\x41BC", ["ABC"]), (r"\u0041BC", ["ABC"]), (r"(a)b\1", ["aba"])]:
+            ctx_data[PythonResolver.Tokens.mappingRegexExpression] = expression
+            ctx.SetData(json.dumps(ctx_data))
+            parsed_data = ctx.GetParsedData()
+            for path in paths:
+                self.assertRegex(path, expression)
+                self.assertIn(parsed_data.mappingRegexRequiredLiteral, path)
+
+
+    def test_ResolverContextParsedData(self):
+        ctx = PythonResolver.ResolverContext()
+        revision = ctx.GetDataRevision()
+        parsed_data = ctx.GetParsedData()
+        # The parsed data is cached until the data changes
+        self.assertIs(ctx.GetParsedData(), parsed_data)
+        self.assertEqual(tuple(json.loads(ctx.GetData())[PythonResolver.Tokens.searchPaths]),
+                         parsed_data.searchPaths)
+        ctx_data = json.loads(ctx.GetData())
+        ctx_data[PythonResolver.Tokens.mappingPairs] = {"layer_v000.usd": "layer_v002.usd"}
+        ctx.SetData(json.dumps(ctx_data))
+        self.assertEqual(ctx.GetDataRevision(), revision + 1)
+        parsed_data = ctx.GetParsedData()
+        self.assertEqual(dict(parsed_data.mappingPairs), {"layer_v000.usd": "layer_v002.usd"})
+        with self.assertRaises(TypeError):
+            parsed_data.mappingPairs["layer_v000.usd"] = "layer_v001.usd"
+        ctx.LoadOrRefreshData()
+        self.assertEqual(ctx.GetDataRevision(), revision + 2)
+        self.assertIsNot(ctx.GetParsedData(), parsed_data)
+        # Invalid data
+        ctx.SetData("invalid")
+        self.assertIsNone(ctx.GetParsedData())
 
 
 if __name__ == "__main__":
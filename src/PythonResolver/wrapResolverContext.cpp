@@ -45,7 +45,10 @@ wrapResolverContext()
         .def("SetMappingFilePath", &This::SetMappingFilePath)
         .def("GetData", &This::GetData, python::return_value_policy<python::return_by_value>())
         .def("SetData", &This::SetData)
+        .def("GetDataRevision", &This::GetDataRevision)
+        .def("GetParsedData", &This::GetParsedData)
         .def("LoadOrRefreshData", &This::LoadOrRefreshData)
+        .def("GetMemoryUsage", &This::GetMemoryUsage)
     ;
     ArWrapResolverContextForPython<This>();
 }
@@ -0,0 +1,323 @@
+#ifndef CONCURRENT_STRING_MAP_H
+#define CONCURRENT_STRING_MAP_H
+
+#include <array>
+#include <atomic>
+#include <functional>
+#include <map>
+#include <mutex>
+#include <shared_mutex>
+#include <string>
+#include <unordered_map>
+#include <utility>
+#include <vector>
+
+/* Concurrent String Map
+A string to string hash map that is split into a fixed number of shards,
+each guarded by its own reader/writer lock. Lookups only take a shared
+lock on the shard their key hashes to, so concurrent cache hits never
+block each other and writes only contend with accesses to the same shard.
+Each shard also maintains a value to keys index, so that removing pairs
+by value doesn't require a full scan of the map.
+The index is keyed by the hash of the values, so that it doesn't store
+a second copy of each value and only costs a few pointers per pair.
+We intentionally don't depend on TBB here, as not all DCCs expose it
+to the resolver libraries we link against.
+*/
+class ConcurrentStringMap
+{
+public:
+    using Pairs = std::vector<std::pair<std::string, std::string>>;
+    using AssignedPairs = std::unordered_map<std::string, std::string>;
+    static constexpr size_t NumShards = 64;
+
+    ConcurrentStringMap() = default;
+    ConcurrentStringMap(const ConcurrentStringMap&) = delete;
+    ConcurrentStringMap& operator=(const ConcurrentStringMap&) = delete;
+
+    bool Find(const std::string& key, std::string& value) const {
+        const Shard& shard = _GetShard(key);
+        std::shared_lock<std::shared_mutex> lock(shard.mutex);
+        auto it = shard.map.find(key);
+        if (it == shard.map.end()) {
+            return false;
+        }
+        value = it->second;
+        return true;
+    }
+
+    bool Contains(const std::string& key) const {
+        const Shard& shard = _GetShard(key);
+        std::shared_lock<std::shared_mutex> lock(shard.mutex);
+        return shard.map.find(key) != shard.map.end();
+    }
+
+    void Insert(const std::string& key, const std::string& value) {
+        Shard& shard = _GetShard(key);
+        std::unique_lock<std::shared_mutex> lock(shard.mutex);
+        _InsertLocked(shard, key, value);
+    }
+
+    // Inserts all pairs, grouped by shard, so that each shard is only
+    // locked (and its buckets only grown) once per call.
+    void InsertMany(const Pairs& pairs) {
+        std::array<std::vector<const Pairs::value_type*>, NumShards> shardPairs;
+        for (const Pairs::value_type& pair : pairs) {
+            shardPairs[_GetShardIndex(pair.first)].push_back(&pair);
+        }
+        for (size_t i = 0; i < NumShards; ++i) {
+            if (shardPairs[i].empty()) {
+                continue;
+            }
+            Shard& shard = _shards[i];
+            std::unique_lock<std::shared_mutex> lock(shard.mutex);
+            shard.map.reserve(shard.map.size() + shardPairs[i].size());
+            for (const Pairs::value_type* pair : shardPairs[i]) {
+                _InsertLocked(shard, pair->first, pair->second);
+            }
+        }
+    }
+
+    // Updates the map to a new version of a set of pairs (e.g. loaded from a
+    // mapping file, later pairs win on duplicate keys), given the pairs of the
+    // previous call, which are then replaced with the new ones. Only the pairs
+    // that changed between both versions are touched: Changed pairs are updated
+    // and removed pairs are erased, unless they were overridden (e.g. via Insert)
+    // in the meantime. Pairs that were inserted otherwise are kept. Returns the
+    // added, changed and removed keys together with their previous value (which
+    // is empty for added keys).
+    Pairs Assign(const Pairs& pairs, AssignedPairs& assignedPairs) {
+        AssignedPairs newAssignedPairs;
+        newAssignedPairs.reserve(pairs.size());
+        for (const Pairs::value_type& pair : pairs) {
+            newAssignedPairs[pair.first] = pair.second;
+        }
+        std::array<std::vector<const AssignedPairs::value_type*>, NumShards> removedPairs;
+        for (const AssignedPairs::value_type& pair : assignedPairs) {
+            if (newAssignedPairs.find(pair.first) == newAssignedPairs.end()) {
+                removedPairs[_GetShardIndex(pair.first)].push_back(&pair);
+            }
+        }
+        std::array<std::vector<const AssignedPairs::value_type*>, NumShards> updatedPairs;
+        for (const AssignedPairs::value_type& pair : newAssignedPairs) {
+            auto previousPair = assignedPairs.find(pair.first);
+            if (previousPair == assignedPairs.end() || previousPair->second != pair.second) {
+                updatedPairs[_GetShardIndex(pair.first)].push_back(&pair);
+            }
+        }
+        Pairs changedPairs;
+        for (size_t i = 0; i < NumShards; ++i) {
+            if (removedPairs[i].empty() && updatedPairs[i].empty()) {
+                continue;
+            }
+            Shard& shard = _shards[i];
+            std::unique_lock<std::shared_mutex> lock(shard.mutex);
+            for (const AssignedPairs::value_type* pair : removedPairs[i]) {
+                auto it = shard.map.find(pair->first);
+                if (it == shard.map.end() || it->second != pair->second) {
+                    continue;
+                }
+                changedPairs.emplace_back(pair->first, pair->second);
+                _EraseFromIndex(shard, it->second, &it->first);
+                shard.map.erase(it);
+                --_size;
+            }
+            shard.map.reserve(shard.map.size() + updatedPairs[i].size());
+            for (const AssignedPairs::value_type* pair : updatedPairs[i]) {
+                auto it = shard.map.find(pair->first);
+                if (it == shard.map.end()) {
+                    changedPairs.emplace_back(pair->first, std::string());
+                } else if (it->second != pair->second) {
+                    changedPairs.emplace_back(pair->first, it->second);
+                } else {
+                    continue;
+                }
+                _InsertLocked(shard, pair->first, pair->second);
+            }
+        }
+        assignedPairs = std::move(newAssignedPairs);
+        return changedPairs;
+    }
+
+    bool Erase(const std::string& key) {
+        Shard& shard = _GetShard(key);
+        std::unique_lock<std::shared_mutex> lock(shard.mutex);
+        auto it = shard.map.find(key);
+        if (it == shard.map.end()) {
+            return false;
+        }
+        _EraseFromIndex(shard, it->second, &it->first);
+        shard.map.erase(it);
+        --_size;
+        return true;
+    }
+
+    size_t EraseByValue(const std::string& value) {
+        return this->EraseByValues(std::vector<std::string>(1, value));
+    }
+
+    size_t EraseByValues(const std::vector<std::string>& values) {
+        size_t count = 0;
+        for (Shard& shard : _shards) {
+            std::unique_lock<std::shared_mutex> lock(shard.mutex);
+            if (shard.valueToKeys.empty()) {
+                continue;
+            }
+            for (const std::string& value : values) {
+                auto index_find = shard.valueToKeys.find(_GetValueHash(value));
+                if (index_find == shard.valueToKeys.end()) {
+                    continue;
+                }
+                // Values with colliding hashes share an index entry,
+                // so we only erase the keys that have this exact value.
+                std::vector<const std::string*>& keys = index_find->second;
+                for (size_t i = 0; i < keys.size();) {
+                    auto it = shard.map.find(*keys[i]);
+                    if (it->second != value) {
+                        ++i;
+                        continue;
+                    }
+                    keys[i] = keys.back();
+                    keys.pop_back();
+                    shard.map.erase(it);
+                    --_size;
+                    ++count;
+                }
+                if (keys.empty()) {
+                    shard.valueToKeys.erase(index_find);
+                }
+            }
+        }
+        return count;
+    }
+
+    void Clear() {
+        for (Shard& shard : _shards) {
+            std::unique_lock<std::shared_mutex> lock(shard.mutex);
+            _size -= shard.map.size();
+            shard.map.clear();
+            shard.valueToKeys.clear();
+        }
+    }
+
+    // The size is tracked separately, so that it can be queried on the
+    // resolve hot path without locking all shards.
+    size_t Size() const { return _size.load(std::memory_order_relaxed); }
+
+    bool Empty() const { return this->Size() == 0; }
+
+    std::vector<std::string> Keys() const {
+        std::vector<std::string> result;
+        result.reserve(this->Size());
+        for (const Shard& shard : _shards) {
+            std::shared_lock<std::shared_mutex> lock(shard.mutex);
+            for (const auto& pair : shard.map) {
+                result.push_back(pair.first);
+            }
+        }
+        return result;
+    }
+
+    // Returns an estimate of the heap memory (in bytes) held by the map, including
+    // the per node and bucket overhead of the shard maps and value indices.
+    size_t GetMemoryUsage() const {
+        size_t memoryUsage = 0;
+        for (const Shard& shard : _shards) {
+            std::shared_lock<std::shared_mutex> lock(shard.mutex);
+            memoryUsage += shard.map.bucket_count() * sizeof(void*);
+            for (const auto& pair : shard.map) {
+                memoryUsage += sizeof(pair) + sizeof(void*) + sizeof(size_t);
+                memoryUsage += _GetStringHeapUsage(pair.first) + _GetStringHeapUsage(pair.second);
+            }
+            memoryUsage += shard.valueToKeys.bucket_count() * sizeof(void*);
+            for (const auto& index : shard.valueToKeys) {
+                memoryUsage += sizeof(index) + sizeof(void*);
+                memoryUsage += index.second.capacity() * sizeof(const std::string*);
+            }
+        }
+        return memoryUsage;
+    }
+
+    // Returns a sorted copy of all pairs, this is only meant to be used
+    // for inspection (e.g. Python exposure) and not on the resolve hot path.
+    std::map<std::string, std::string> ToMap() const {
+        std::map<std::string, std::string> result;
+        for (const Shard& shard : _shards) {
+            std::shared_lock<std::shared_mutex> lock(shard.mutex);
+            result.insert(shard.map.begin(), shard.map.end());
+        }
+        return result;
+    }
+
+private:
+    struct Shard
+    {
+        mutable std::shared_mutex mutex;
+        std::unordered_map<std::string, std::string> map;
+        // Maps the hash of each value to the keys (owned by the map) that have it.
+        std::unordered_map<size_t, std::vector<const std::string*>> valueToKeys;
+    };
+
+    static size_t _GetValueHash(const std::string& value) {
+        return std::hash<std::string>()(value);
+    }
+
+    void _InsertLocked(Shard& shard, const std::string& key, const std::string& value) {
+        auto it = shard.map.find(key);
+        if (it != shard.map.end()) {
+            if (it->second == value) {
+                return;
+            }
+            _EraseFromIndex(shard, it->second, &it->first);
+            it->second = value;
+        } else {
+            it = shard.map.emplace(key, value).first;
+            ++_size;
+        }
+        shard.valueToKeys[_GetValueHash(value)].push_back(&it->first);
+    }
+
+    static void _EraseFromIndex(Shard& shard, const std::string& value, const std::string* key) {
+        auto index_find = shard.valueToKeys.find(_GetValueHash(value));
+        if (index_find == shard.valueToKeys.end()) {
+            return;
+        }
+        std::vector<const std::string*>& keys = index_find->second;
+        for (size_t i = 0; i < keys.size(); ++i) {
+            if (keys[i] == key) {
+                keys[i] = keys.back();
+                keys.pop_back();
+                break;
+            }
+        }
+        if (keys.empty()) {
+            shard.valueToKeys.erase(index_find);
+        }
+    }
+
+    // Short strings are stored inline (small string optimization), so
+    // they don't hold any heap memory.
+    static size_t _GetStringHeapUsage(const std::string& str) {
+        const char* data = str.data();
+        const char* object = reinterpret_cast<const char*>(&str);
+        if (data >= object && data < object + sizeof(std::string)) {
+            return 0;
+        }
+        return str.capacity() + 1;
+    }
+
+    static size_t _GetShardIndex(const std::string& key) {
+        // Mix in the upper bits, as the lower bits are used by the
+        // shard's own bucket distribution.
+        size_t hash = std::hash<std::string>()(key);
+        return (hash ^ (hash >> 16)) % NumShards;
+    }
+
+    Shard& _GetShard(const std::string& key) { return _shards[_GetShardIndex(key)]; }
+    const Shard& _GetShard(const std::string& key) const { return _shards[_GetShardIndex(key)]; }
+
+    std::array<Shard, NumShards> _shards;
+    std::atomic<size_t> _size{0};
+};
+
+#endif // CONCURRENT_STRING_MAP_H
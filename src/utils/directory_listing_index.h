@@ -0,0 +1,103 @@
+#ifndef DIRECTORY_LISTING_INDEX_H
+#define DIRECTORY_LISTING_INDEX_H
+
+#include <array>
+#include <atomic>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <shared_mutex>
+#include <string>
+#include <unordered_map>
+#include <unordered_set>
+#include <vector>
+
+/* Directory Listing Index
+Indexes the entry names of directories, so that existence checks of files
+can be answered via a hash lookup instead of a file system stat. Directories
+are indexed lazily on first access with a single listing call, missing
+directories are indexed as well (as empty), so repeated probes against them
+don't hit the file system either. The index is never invalidated on its own,
+it has to be cleared explicitly when the file system content changes.
+Lookups are exact, so on case insensitive file systems the identifier has
+to match the case of the file on disk.
+*/
+class DirectoryListingIndex
+{
+public:
+    using Entries = std::unordered_set<std::string>;
+    static constexpr size_t NumShards = 16;
+
+    DirectoryListingIndex() = default;
+    DirectoryListingIndex(const DirectoryListingIndex&) = delete;
+    DirectoryListingIndex& operator=(const DirectoryListingIndex&) = delete;
+
+    bool IsEnabled() const { return _enabled.load(); }
+
+    void SetEnabled(bool state) {
+        _enabled.store(state);
+        this->Clear();
+    }
+
+    // The list function has the signature bool(const std::string& dirPath, Entries& entries)
+    // and returns false if the directory couldn't be listed.
+    template <class ListFn>
+    bool Exists(const std::string& path, const ListFn& list) {
+        const size_t separatorIdx = path.find_last_of("/\\");
+        if (separatorIdx == std::string::npos || separatorIdx + 1 == path.size()) {
+            return false;
+        }
+        const std::string dirPath = separatorIdx == 0 ? path.substr(0, 1) : path.substr(0, separatorIdx);
+        const std::shared_ptr<const Entries> entries = _GetEntries(dirPath, list);
+        return entries->find(path.substr(separatorIdx + 1)) != entries->end();
+    }
+
+    void Clear() {
+        for (Shard& shard : _shards) {
+            std::unique_lock<std::shared_mutex> lock(shard.mutex);
+            shard.directories.clear();
+        }
+    }
+
+    // The number of indexed directories.
+    size_t Size() const {
+        size_t size = 0;
+        for (const Shard& shard : _shards) {
+            std::shared_lock<std::shared_mutex> lock(shard.mutex);
+            size += shard.directories.size();
+        }
+        return size;
+    }
+
+private:
+    struct Shard
+    {
+        mutable std::shared_mutex mutex;
+        std::unordered_map<std::string, std::shared_ptr<const Entries>> directories;
+    };
+
+    template <class ListFn>
+    std::shared_ptr<const Entries> _GetEntries(const std::string& dirPath, const ListFn& list) {
+        Shard& shard = _shards[std::hash<std::string>()(dirPath) % NumShards];
+        {
+            std::shared_lock<std::shared_mutex> lock(shard.mutex);
+            auto it = shard.directories.find(dirPath);
+            if (it != shard.directories.end()) {
+                return it->second;
+            }
+        }
+        // We intentionally list without holding the lock, concurrent
+        // listings of the same directory keep the first inserted result.
+        auto entries = std::make_shared<Entries>();
+        if (!list(dirPath, *entries)) {
+            entries->clear();
+        }
+        std::unique_lock<std::shared_mutex> lock(shard.mutex);
+        return shard.directories.emplace(dirPath, std::move(entries)).first->second;
+    }
+
+    std::array<Shard, NumShards> _shards;
+    std::atomic<bool> _enabled{false};
+};
+
+#endif // DIRECTORY_LISTING_INDEX_H
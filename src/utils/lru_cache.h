@@ -0,0 +1,164 @@
+#ifndef LRU_CACHE_H
+#define LRU_CACHE_H
+
+#include <array>
+#include <atomic>
+#include <functional>
+#include <list>
+#include <mutex>
+#include <string>
+#include <unordered_map>
+#include <utility>
+#include <vector>
+
+/* LRU Cache
+A bounded key to value cache that evicts the least recently used entries.
+To reduce lock contention, the cache is split into shards (each with its
+own lock and recency order), so the eviction order is only exact per shard.
+A capacity of zero disables the cache.
+Each clear bumps the cache's revision. Inserting with the revision that was
+queried before computing the value drops the insert, if the cache was
+cleared in the meantime, so that values computed from outdated state
+can't end up in the cache.
+*/
+template <class Key, class Value, size_t NumShards = 16, class Hash = std::hash<Key>>
+class LRUCache
+{
+public:
+    LRUCache() = default;
+    LRUCache(const LRUCache&) = delete;
+    LRUCache& operator=(const LRUCache&) = delete;
+
+    size_t GetCapacity() const { return _capacity.load(); }
+
+    // Changing the capacity clears the cache.
+    void SetCapacity(size_t capacity) {
+        _capacity.store(capacity);
+        this->Clear();
+    }
+
+    bool IsEnabled() const { return _capacity.load() > 0; }
+
+    size_t GetRevision() const { return _revision.load(); }
+
+    bool Find(const Key& key, Value& value) {
+        Shard& shard = _GetShard(key);
+        std::lock_guard<std::mutex> lock(shard.mutex);
+        auto it = shard.map.find(key);
+        if (it == shard.map.end()) {
+            return false;
+        }
+        shard.order.splice(shard.order.begin(), shard.order, it->second);
+        value = it->second->second;
+        return true;
+    }
+
+    bool Contains(const Key& key) const {
+        const Shard& shard = _GetShard(key);
+        std::lock_guard<std::mutex> lock(shard.mutex);
+        return shard.map.find(key) != shard.map.end();
+    }
+
+    void Insert(const Key& key, const Value& value) {
+        Shard& shard = _GetShard(key);
+        std::lock_guard<std::mutex> lock(shard.mutex);
+        _InsertLocked(shard, key, value);
+    }
+
+    // Returns false if the insert was dropped, as the cache was cleared
+    // since the given revision was queried.
+    bool Insert(const Key& key, const Value& value, size_t revision) {
+        Shard& shard = _GetShard(key);
+        std::lock_guard<std::mutex> lock(shard.mutex);
+        // Clearing locks each shard, so checking the revision while holding
+        // the shard lock can't interleave with the clear of this shard.
+        if (revision != _revision.load()) {
+            return false;
+        }
+        _InsertLocked(shard, key, value);
+        return true;
+    }
+
+    bool Erase(const Key& key) {
+        Shard& shard = _GetShard(key);
+        std::lock_guard<std::mutex> lock(shard.mutex);
+        auto it = shard.map.find(key);
+        if (it == shard.map.end()) {
+            return false;
+        }
+        shard.order.erase(it->second);
+        shard.map.erase(it);
+        return true;
+    }
+
+    void Clear() {
+        ++_revision;
+        for (Shard& shard : _shards) {
+            std::lock_guard<std::mutex> lock(shard.mutex);
+            shard.map.clear();
+            shard.order.clear();
+        }
+    }
+
+    size_t Size() const {
+        size_t size = 0;
+        for (const Shard& shard : _shards) {
+            std::lock_guard<std::mutex> lock(shard.mutex);
+            size += shard.map.size();
+        }
+        return size;
+    }
+
+    // Returns all entries, ordered from most to least recently used per shard.
+    std::vector<std::pair<Key, Value>> Items() const {
+        std::vector<std::pair<Key, Value>> result;
+        for (const Shard& shard : _shards) {
+            std::lock_guard<std::mutex> lock(shard.mutex);
+            result.insert(result.end(), shard.order.begin(), shard.order.end());
+        }
+        return result;
+    }
+
+private:
+    using Order = std::list<std::pair<Key, Value>>;
+
+    struct Shard
+    {
+        mutable std::mutex mutex;
+        Order order;
+        std::unordered_map<Key, typename Order::iterator, Hash> map;
+    };
+
+    void _InsertLocked(Shard& shard, const Key& key, const Value& value) {
+        const size_t capacity = _GetShardCapacity();
+        if (capacity == 0) {
+            return;
+        }
+        auto it = shard.map.find(key);
+        if (it != shard.map.end()) {
+            it->second->second = value;
+            shard.order.splice(shard.order.begin(), shard.order, it->second);
+            return;
+        }
+        shard.order.emplace_front(key, value);
+        shard.map.emplace(key, shard.order.begin());
+        while (shard.map.size() > capacity) {
+            shard.map.erase(shard.order.back().first);
+            shard.order.pop_back();
+        }
+    }
+
+    size_t _GetShardCapacity() const {
+        const size_t capacity = _capacity.load();
+        return (capacity + NumShards - 1) / NumShards;
+    }
+
+    Shard& _GetShard(const Key& key) { return _shards[Hash()(key) % NumShards]; }
+    const Shard& _GetShard(const Key& key) const { return _shards[Hash()(key) % NumShards]; }
+
+    std::array<Shard, NumShards> _shards;
+    std::atomic<size_t> _capacity{0};
+    std::atomic<size_t> _revision{0};
+};
+
+#endif // LRU_CACHE_H
@@ -0,0 +1,118 @@
+#ifndef MAPPING_PAIRS_FILE_H
+#define MAPPING_PAIRS_FILE_H
+
+#include "mapping_pairs_sidecar.h"
+
+#include "pxr/pxr.h"
+#include "pxr/base/arch/fileSystem.h"
+#include "pxr/base/tf/atomicOfstreamWrapper.h"
+#include "pxr/base/tf/debug.h"
+#include "pxr/base/tf/fileUtils.h"
+#include "pxr/base/tf/pathUtils.h"
+#include "pxr/base/tf/token.h"
+#include "pxr/base/vt/types.h"
+#include "pxr/usd/sdf/layer.h"
+
+#include <algorithm>
+#include <cstdint>
+#include <string>
+#include <utility>
+#include <vector>
+
+/* Mapping Pairs File
+Reads the mapping pairs of a mapping file (stored in the custom layer data
+under the given key), shared by the File and Cached Resolver. If useSidecar
+is enabled, the pairs are read from the sidecar file (see mapping_pairs_sidecar.h)
+if it is up to date, otherwise the sidecar is (re-)written after reading the
+layer. The debug code is the resolver's context debug code, that sidecar
+issues are reported to.
+*/
+inline bool getStringEndswithString(const std::string &value, const std::string &compareValue)
+{
+    if (compareValue.size() > value.size())
+    {
+        return false;
+    }
+    if (std::equal(compareValue.rbegin(), compareValue.rend(), value.rbegin()))
+    {
+        return true;
+    }
+    return false;
+}
+
+inline bool getStringEndswithStrings(const std::string &value, const std::vector<std::string> array)
+{
+    for (int i=0; i < array.size(); i++)
+    {
+        if (getStringEndswithString(value, array[i]))
+        {
+            return true;
+        }
+    }
+    return false;
+}
+
+template <class DebugCode>
+inline bool readMappingPairsFromUsdFile(const std::string& filePath, const PXR_NS::TfToken& mappingPairsKey,
+                                        bool useSidecar, DebugCode debugCode,
+                                        std::vector<std::pair<std::string, std::string>>& mappingPairs)
+{
+    PXR_NAMESPACE_USING_DIRECTIVE
+    std::vector<std::string> usdFilePathExts{ ".usd", ".usdc", ".usda" };
+    if (!getStringEndswithStrings(filePath, usdFilePathExts))
+    {
+        return false;
+    }
+    const std::string absFilePath = TfAbsPath(filePath);
+    // The (opt-in) sidecar file can be memory mapped, which is a
+    // lot faster than opening large mapping files as a layer.
+    double modificationTime = 0.0;
+    const int64_t fileSize = ArchGetFileLength(absFilePath.c_str());
+    const bool hasFileStats = useSidecar && fileSize >= 0 && ArchGetModificationTime(absFilePath.c_str(), &modificationTime);
+    const std::string sidecarFilePath = getMappingPairsSidecarPath(absFilePath);
+    if (hasFileStats && TfIsFile(sidecarFilePath)){
+        std::string errMsg;
+        ArchConstFileMapping mapping = ArchMapFileReadOnly(sidecarFilePath, &errMsg);
+        if (mapping && deserializeMappingPairsSidecar(mapping.get(), mapping.get() + ArchGetFileMappingLength(mapping),
+                                                      modificationTime, static_cast<uint64_t>(fileSize), mappingPairs)){
+            return true;
+        }
+        TF_DEBUG(debugCode).Msg("ResolverContext::_GetMappingPairsFromUsdFile('%s') - Ignoring outdated sidecar file\n", absFilePath.c_str());
+    }
+    // We only read the layer metadata into an anonymous layer, so that the layer
+    // doesn't end up in the layer registry (where it would be kept alive and
+    // served stale on reloads) and is released as soon as we're done.
+    SdfLayerRefPtr layer = SdfLayer::OpenAsAnonymous(absFilePath, true);
+    if (!layer){
+        return false;
+    }
+    auto layerMetaData = layer->GetCustomLayerData();
+    auto mappingDataPtr = layerMetaData.GetValueAtPath(mappingPairsKey);
+    if (!mappingDataPtr){
+        return false;
+    }
+    VtStringArray mappingDataArray = mappingDataPtr->Get<VtStringArray>();
+    layer.Reset();
+    if (mappingDataArray.size() % 2 != 0){
+        return false;
+    }
+    mappingPairs.reserve(mappingDataArray.size() / 2);
+    for (size_t i = 0; i < mappingDataArray.size(); i+=2) {
+        mappingPairs.emplace_back(mappingDataArray[i], mappingDataArray[i+1]);
+    }
+    if (hasFileStats){
+        // Concurrent writers are fine, as the file is only replaced on commit.
+        TfAtomicOfstreamWrapper sidecarFile(sidecarFilePath);
+        std::string errMsg;
+        if (sidecarFile.Open(&errMsg)){
+            const std::string sidecarData = serializeMappingPairsSidecar(mappingPairs, modificationTime, static_cast<uint64_t>(fileSize));
+            sidecarFile.GetStream().write(sidecarData.data(), sidecarData.size());
+            sidecarFile.Commit(&errMsg);
+        }else{
+            TF_DEBUG(debugCode).Msg("ResolverContext::_GetMappingPairsFromUsdFile('%s') - Failed to write sidecar file: %s\n", absFilePath.c_str(), errMsg.c_str());
+        }
+    }
+    return true;
+}
+
+#endif // MAPPING_PAIRS_FILE_H
@@ -0,0 +1,107 @@
+#ifndef MAPPING_PAIRS_SIDECAR_H
+#define MAPPING_PAIRS_SIDECAR_H
+
+#include <cstdint>
+#include <cstring>
+#include <string>
+#include <utility>
+#include <vector>
+
+/* Mapping Pairs Sidecar
+A compact binary serialization of the mapping pairs of a mapping file, that
+is written next to it, so that subsequent loads can memory map it instead of
+opening the mapping file as a layer. The header stores the modification time
+and size of the mapping file it was written for, a sidecar that doesn't match
+the current mapping file is ignored (and then rewritten by the loader).
+The layout is: magic, version, mapping file modification time (double),
+mapping file size (uint64), pair count (uint64), followed by the pairs as
+length (uint32) prefixed strings. Numbers are stored in host byte order,
+as the sidecar is only a local cache and can be regenerated at any time.
+*/
+static constexpr char mappingPairsSidecarMagic[8] = {'A', 'R', 'M', 'A', 'P', 'P', 'R', 'S'};
+static constexpr uint32_t mappingPairsSidecarVersion = 1;
+
+inline std::string getMappingPairsSidecarPath(const std::string& mappingFilePath)
+{
+    return mappingFilePath + ".pairs";
+}
+
+inline std::string serializeMappingPairsSidecar(const std::vector<std::pair<std::string, std::string>>& pairs,
+                                                double modificationTime, uint64_t fileSize)
+{
+    const auto append = [](std::string& data, const auto& value) {
+        data.append(reinterpret_cast<const char*>(&value), sizeof(value));
+    };
+    std::string data(mappingPairsSidecarMagic, sizeof(mappingPairsSidecarMagic));
+    append(data, mappingPairsSidecarVersion);
+    append(data, modificationTime);
+    append(data, fileSize);
+    append(data, static_cast<uint64_t>(pairs.size()));
+    for (const auto& pair : pairs) {
+        for (const std::string* str : {&pair.first, &pair.second}) {
+            append(data, static_cast<uint32_t>(str->size()));
+            data.append(*str);
+        }
+    }
+    return data;
+}
+
+// Returns false if the data is not a valid sidecar of a mapping
+// file with the given modification time and size.
+inline bool deserializeMappingPairsSidecar(const char* begin, const char* end,
+                                           double modificationTime, uint64_t fileSize,
+                                           std::vector<std::pair<std::string, std::string>>& pairs)
+{
+    const char* it = begin;
+    const auto read = [&](auto& value) {
+        if (static_cast<size_t>(end - it) < sizeof(value)) {
+            return false;
+        }
+        std::memcpy(&value, it, sizeof(value));
+        it += sizeof(value);
+        return true;
+    };
+    const auto readString = [&](std::string& str) {
+        uint32_t size = 0;
+        if (!read(size) || static_cast<size_t>(end - it) < size) {
+            return false;
+        }
+        str.assign(it, size);
+        it += size;
+        return true;
+    };
+    char magic[sizeof(mappingPairsSidecarMagic)];
+    uint32_t version = 0;
+    double sidecarModificationTime = 0.0;
+    uint64_t sidecarFileSize = 0;
+    uint64_t pairCount = 0;
+    if (!read(magic) || std::memcmp(magic, mappingPairsSidecarMagic, sizeof(magic)) != 0 ||
+        !read(version) || version != mappingPairsSidecarVersion ||
+        !read(sidecarModificationTime) || sidecarModificationTime != modificationTime ||
+        !read(sidecarFileSize) || sidecarFileSize != fileSize ||
+        !read(pairCount)) {
+        return false;
+    }
+    // Each pair takes at least two size fields, so we can validate
+    // the count before reserving memory for it.
+    if (pairCount > static_cast<uint64_t>(end - it) / (2 * sizeof(uint32_t))) {
+        return false;
+    }
+    pairs.clear();
+    pairs.reserve(pairCount);
+    for (uint64_t i = 0; i < pairCount; ++i) {
+        std::pair<std::string, std::string> pair;
+        if (!readString(pair.first) || !readString(pair.second)) {
+            pairs.clear();
+            return false;
+        }
+        pairs.push_back(std::move(pair));
+    }
+    if (it != end) {
+        pairs.clear();
+        return false;
+    }
+    return true;
+}
+
+#endif // MAPPING_PAIRS_SIDECAR_H
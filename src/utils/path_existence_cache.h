@@ -0,0 +1,113 @@
+#ifndef PATH_EXISTENCE_CACHE_H
+#define PATH_EXISTENCE_CACHE_H
+
+#include <array>
+#include <atomic>
+#include <chrono>
+#include <functional>
+#include <mutex>
+#include <shared_mutex>
+#include <string>
+#include <unordered_map>
+
+/* Path Existence Cache
+Caches the result (positive and negative) of file system existence checks,
+so that repeatedly probing the same paths (e.g. the same identifier against
+multiple search paths) doesn't re-stat them. Entries expire after the
+configured time to live, a time to live of zero disables the cache.
+Paths are only checked if their parent directory exists (which is
+cached as well), so that probing many files in missing directories
+only costs a single stat per directory.
+*/
+class PathExistenceCache
+{
+public:
+    using Clock = std::chrono::steady_clock;
+    static constexpr size_t NumShards = 16;
+
+    PathExistenceCache() = default;
+    PathExistenceCache(const PathExistenceCache&) = delete;
+    PathExistenceCache& operator=(const PathExistenceCache&) = delete;
+
+    // The time to live in seconds.
+    double GetTimeToLive() const {
+        return std::chrono::duration<double>(Clock::duration(_timeToLive.load())).count();
+    }
+
+    void SetTimeToLive(double seconds) {
+        const auto timeToLive = std::chrono::duration_cast<Clock::duration>(
+            std::chrono::duration<double>(seconds > 0.0 ? seconds : 0.0));
+        _timeToLive.store(timeToLive.count());
+        this->Clear();
+    }
+
+    bool IsEnabled() const { return _timeToLive.load() > 0; }
+
+    template <class StatFn>
+    bool Exists(const std::string& path, const StatFn& stat) {
+        if (!this->IsEnabled()) {
+            return stat(path);
+        }
+        const size_t separatorIdx = path.find_last_of("/\\");
+        if (separatorIdx != std::string::npos && separatorIdx > 0) {
+            if (!_Exists(path.substr(0, separatorIdx), stat)) {
+                return false;
+            }
+        }
+        return _Exists(path, stat);
+    }
+
+    void Clear() {
+        for (Shard& shard : _shards) {
+            std::unique_lock<std::shared_mutex> lock(shard.mutex);
+            shard.entries.clear();
+        }
+    }
+
+    size_t Size() const {
+        size_t size = 0;
+        for (const Shard& shard : _shards) {
+            std::shared_lock<std::shared_mutex> lock(shard.mutex);
+            size += shard.entries.size();
+        }
+        return size;
+    }
+
+private:
+    struct Entry
+    {
+        bool exists;
+        Clock::time_point expiration;
+    };
+
+    struct Shard
+    {
+        mutable std::shared_mutex mutex;
+        std::unordered_map<std::string, Entry> entries;
+    };
+
+    template <class StatFn>
+    bool _Exists(const std::string& path, const StatFn& stat) {
+        Shard& shard = _shards[std::hash<std::string>()(path) % NumShards];
+        const Clock::time_point now = Clock::now();
+        {
+            std::shared_lock<std::shared_mutex> lock(shard.mutex);
+            auto it = shard.entries.find(path);
+            if (it != shard.entries.end() && it->second.expiration > now) {
+                return it->second.exists;
+            }
+        }
+        // We intentionally stat without holding the lock, concurrent
+        // checks of the same path just both write the same result.
+        const bool exists = stat(path);
+        const Entry entry{exists, now + Clock::duration(_timeToLive.load())};
+        std::unique_lock<std::shared_mutex> lock(shard.mutex);
+        shard.entries[path] = entry;
+        return exists;
+    }
+
+    std::array<Shard, NumShards> _shards;
+    std::atomic<Clock::rep> _timeToLive{0};
+};
+
+#endif // PATH_EXISTENCE_CACHE_H
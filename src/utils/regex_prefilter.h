@@ -0,0 +1,117 @@
+#ifndef REGEX_PREFILTER_H
+#define REGEX_PREFILTER_H
+
+#include <cctype>
+#include <string>
+
+/* Regex Prefilter
+Returns the longest literal string, that every match of the given
+(ECMAScript) regex expression has to contain. Paths that don't contain it
+can skip the (expensive) regex evaluation entirely, as the expression
+can't match them. We are conservative here: Whenever the expression
+contains constructs we don't analyze (alternations, lookarounds,
+quantified groups), an empty string is returned, which disables the
+prefilter. The same logic is implemented for the PythonResolver in
+PythonExpose.py -> _GetRegexRequiredLiteral.
+*/
+inline std::string getRegexRequiredLiteral(const std::string& expression)
+{
+    const auto isQuantifier = [](char c) {
+        return c == '*' || c == '+' || c == '?' || c == '{';
+    };
+    // A literal followed by a single "+" is required, any other
+    // (or stacked) quantifier may make it optional.
+    const auto isRequiredByQuantifier = [&](size_t quantifierIndex) {
+        return expression[quantifierIndex] == '+' &&
+            (quantifierIndex + 1 >= expression.size() || !isQuantifier(expression[quantifierIndex + 1]));
+    };
+    std::string longestLiteral;
+    std::string currentLiteral;
+    const auto endLiteral = [&]() {
+        if (currentLiteral.size() > longestLiteral.size()) {
+            longestLiteral = currentLiteral;
+        }
+        currentLiteral.clear();
+    };
+    size_t i = 0;
+    const size_t size = expression.size();
+    while (i < size) {
+        const char c = expression[i];
+        if (c == '|') {
+            return std::string();
+        } else if (c == '(') {
+            if (i + 1 < size && expression[i + 1] == '?') {
+                return std::string();
+            }
+            ++i;
+            continue;
+        } else if (c == ')') {
+            if (i + 1 < size && isQuantifier(expression[i + 1])) {
+                return std::string();
+            }
+            ++i;
+            continue;
+        } else if (c == '[') {
+            // Skip the character class. A leading ']' is handled differently
+            // by different regex engines, so we don't analyze it.
+            ++i;
+            if (i < size && expression[i] == '^') { ++i; }
+            if (i < size && expression[i] == ']') { return std::string(); }
+            while (i < size && expression[i] != ']') {
+                i += expression[i] == '\\' ? 2 : 1;
+            }
+            ++i;
+            endLiteral();
+            continue;
+        } else if (c == '\\' && i + 1 < size && !std::isalnum(static_cast<unsigned char>(expression[i + 1]))) {
+            // Escaped meta character, e.g. "\."
+            const char literal = expression[i + 1];
+            i += 2;
+            if (i < size && isQuantifier(expression[i])) {
+                if (isRequiredByQuantifier(i)) { currentLiteral += literal; }
+                endLiteral();
+                continue;
+            }
+            currentLiteral += literal;
+            continue;
+        } else if (c == '\\') {
+            // Character classes (e.g. "\d"), hex/unicode/control escapes and back references
+            i += 1;
+            const char escape = i < size ? expression[i] : '\0';
+            if (escape == 'x') { i += 3; }
+            else if (escape == 'u') { i += 5; }
+            else if (escape == 'c') { i += 2; }
+            else if (std::isdigit(static_cast<unsigned char>(escape))) {
+                while (i < size && std::isdigit(static_cast<unsigned char>(expression[i]))) { ++i; }
+            }
+            else { i += 1; }
+            endLiteral();
+            continue;
+        } else if (c == '{') {
+            // Skip the whole "{m,n}" quantifier body.
+            const size_t end = expression.find('}', i);
+            if (end == std::string::npos) {
+                return std::string();
+            }
+            i = end + 1;
+            endLiteral();
+            continue;
+        } else if (c == '.' || c == '^' || c == '$' || isQuantifier(c) || c == '}') {
+            // Anchors and quantifiers
+            ++i;
+            endLiteral();
+            continue;
+        }
+        ++i;
+        if (i < size && isQuantifier(expression[i])) {
+            if (isRequiredByQuantifier(i)) { currentLiteral += c; }
+            endLiteral();
+            continue;
+        }
+        currentLiteral += c;
+    }
+    endLiteral();
+    return longestLiteral;
+}
+
+#endif // REGEX_PREFILTER_H
@@ -0,0 +1,144 @@
+#ifndef RESOLVER_STATISTICS_H
+#define RESOLVER_STATISTICS_H
+
+#include <algorithm>
+#include <array>
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <string>
+#include <utility>
+#include <vector>
+
+/* Resolver Statistics
+Counters and latency histograms that resolvers use to record how their
+lookups are answered and how long the expensive parts (e.g. Python calls
+and lock waits) take. All operations are relaxed atomics, so recording is
+cheap, but a snapshot that is taken while other threads are recording is
+not necessarily consistent across counters.
+The latency histogram buckets are powers of two in nanoseconds: the bucket
+with the index i counts durations of less than 2^i ns (and at least 2^(i-1) ns).
+*/
+class LatencyHistogram
+{
+public:
+    static constexpr size_t NumBuckets = 64;
+
+    LatencyHistogram() = default;
+    LatencyHistogram(const LatencyHistogram&) = delete;
+    LatencyHistogram& operator=(const LatencyHistogram&) = delete;
+
+    void Record(std::chrono::steady_clock::duration duration) {
+        const uint64_t time = static_cast<uint64_t>(
+            std::max<int64_t>(0, std::chrono::duration_cast<std::chrono::nanoseconds>(duration).count()));
+        size_t bucket = 0;
+        while (bucket < NumBuckets - 1 && (time >> bucket) != 0) {
+            ++bucket;
+        }
+        _count.fetch_add(1, std::memory_order_relaxed);
+        _totalTime.fetch_add(time, std::memory_order_relaxed);
+        uint64_t maxTime = _maxTime.load(std::memory_order_relaxed);
+        while (time > maxTime && !_maxTime.compare_exchange_weak(maxTime, time, std::memory_order_relaxed)) {}
+        _buckets[bucket].fetch_add(1, std::memory_order_relaxed);
+    }
+
+    uint64_t GetCount() const { return _count.load(std::memory_order_relaxed); }
+
+    // The total and max time in nanoseconds.
+    uint64_t GetTotalTime() const { return _totalTime.load(std::memory_order_relaxed); }
+    uint64_t GetMaxTime() const { return _maxTime.load(std::memory_order_relaxed); }
+
+    // Returns the non-empty buckets as (upper bound in ns, count) pairs.
+    std::vector<std::pair<uint64_t, uint64_t>> GetBuckets() const {
+        std::vector<std::pair<uint64_t, uint64_t>> buckets;
+        for (size_t bucket = 0; bucket < NumBuckets; ++bucket) {
+            const uint64_t count = _buckets[bucket].load(std::memory_order_relaxed);
+            if (count != 0) {
+                buckets.emplace_back(uint64_t(1) << bucket, count);
+            }
+        }
+        return buckets;
+    }
+
+    void Reset() {
+        _count.store(0, std::memory_order_relaxed);
+        _totalTime.store(0, std::memory_order_relaxed);
+        _maxTime.store(0, std::memory_order_relaxed);
+        for (std::atomic<uint64_t>& bucket : _buckets) {
+            bucket.store(0, std::memory_order_relaxed);
+        }
+    }
+
+private:
+    std::atomic<uint64_t> _count{0};
+    std::atomic<uint64_t> _totalTime{0};
+    std::atomic<uint64_t> _maxTime{0};
+    std::array<std::atomic<uint64_t>, NumBuckets> _buckets{};
+};
+
+// Records the lifetime of the scope in the given histogram.
+class ScopedLatency
+{
+public:
+    explicit ScopedLatency(LatencyHistogram& histogram)
+        : _histogram(histogram), _startTime(std::chrono::steady_clock::now()) {}
+    ~ScopedLatency() { _histogram.Record(std::chrono::steady_clock::now() - _startTime); }
+    ScopedLatency(const ScopedLatency&) = delete;
+    ScopedLatency& operator=(const ScopedLatency&) = delete;
+
+private:
+    LatencyHistogram& _histogram;
+    std::chrono::steady_clock::time_point _startTime;
+};
+
+// The Counter and Latency enums have to end with a Count member, the
+// names are the keys under which the values are exposed (e.g. to Python).
+template <class Counter, class Latency>
+class ResolverStatistics
+{
+public:
+    static constexpr size_t NumCounters = static_cast<size_t>(Counter::Count);
+    static constexpr size_t NumLatencies = static_cast<size_t>(Latency::Count);
+    using CounterNames = std::array<const char*, NumCounters>;
+    using LatencyNames = std::array<const char*, NumLatencies>;
+
+    ResolverStatistics(const CounterNames& counterNames, const LatencyNames& latencyNames)
+        : _counterNames(counterNames), _latencyNames(latencyNames) {}
+    ResolverStatistics(const ResolverStatistics&) = delete;
+    ResolverStatistics& operator=(const ResolverStatistics&) = delete;
+
+    void Increment(Counter counter, uint64_t value = 1) {
+        _counters[static_cast<size_t>(counter)].fetch_add(value, std::memory_order_relaxed);
+    }
+
+    uint64_t GetCounter(Counter counter) const {
+        return _counters[static_cast<size_t>(counter)].load(std::memory_order_relaxed);
+    }
+
+    LatencyHistogram& GetLatency(Latency latency) { return _latencies[static_cast<size_t>(latency)]; }
+    const LatencyHistogram& GetLatency(Latency latency) const { return _latencies[static_cast<size_t>(latency)]; }
+
+    const CounterNames& GetCounterNames() const { return _counterNames; }
+    const LatencyNames& GetLatencyNames() const { return _latencyNames; }
+
+    void Reset(Counter counter) {
+        _counters[static_cast<size_t>(counter)].store(0, std::memory_order_relaxed);
+    }
+
+    void Reset() {
+        for (std::atomic<uint64_t>& counter : _counters) {
+            counter.store(0, std::memory_order_relaxed);
+        }
+        for (LatencyHistogram& latency : _latencies) {
+            latency.Reset();
+        }
+    }
+
+private:
+    CounterNames _counterNames;
+    LatencyNames _latencyNames;
+    std::array<std::atomic<uint64_t>, NumCounters> _counters{};
+    std::array<LatencyHistogram, NumLatencies> _latencies;
+};
+
+#endif // RESOLVER_STATISTICS_H
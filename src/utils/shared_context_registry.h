@@ -0,0 +1,267 @@
+#ifndef SHARED_CONTEXT_REGISTRY_H
+#define SHARED_CONTEXT_REGISTRY_H
+
+#include <algorithm>
+#include <atomic>
+#include <functional>
+#include <list>
+#include <memory>
+#include <mutex>
+#include <optional>
+#include <string>
+#include <unordered_map>
+#include <vector>
+
+/* Shared Context Registry
+A thread safe registry of resolver context records, keyed by the
+resolved mapping file path. Each entry has its own lock, so that the
+(expensive) construction of a record only happens once per key:
+Concurrent callers for the same key wait for the first caller to finish
+constructing it instead of constructing it themselves, while callers for
+other keys are not blocked. If the construction throws, the entry stays
+empty and the next caller retries.
+The registry can be bounded by the number of records and/or their memory
+usage, a bound of zero means unbounded. When exceeded, the least recently
+used records are evicted, unless they are still in use (e.g. referenced by
+a bound ArResolverContext), so that we never end up with two live contexts
+for the same mapping file. Measuring the memory usage of a record walks all
+its pairs, so it is only measured on access while a memory limit is set,
+otherwise it is measured on demand (see GetMemoryUsage). Removed records are destroyed after releasing the
+registry lock, as their destructors may acquire other locks (e.g. the GIL).
+*/
+template <class Record>
+class SharedContextRegistry
+{
+public:
+    using IsInUseFn = std::function<bool(const Record&)>;
+    using MemoryUsageFn = std::function<size_t(const Record&)>;
+
+    SharedContextRegistry(const IsInUseFn& isInUse, const MemoryUsageFn& memoryUsage)
+        : _isInUse(isInUse), _memoryUsage(memoryUsage) {}
+    SharedContextRegistry(const SharedContextRegistry&) = delete;
+    SharedContextRegistry& operator=(const SharedContextRegistry&) = delete;
+
+    size_t GetCapacity() const { return _capacity.load(); }
+
+    void SetCapacity(size_t capacity) {
+        _capacity.store(capacity);
+        this->_Evict(std::string());
+    }
+
+    // The memory limit in bytes.
+    size_t GetMemoryLimit() const { return _memoryLimit.load(); }
+
+    void SetMemoryLimit(size_t memoryLimit) {
+        const size_t previousMemoryLimit = _memoryLimit.exchange(memoryLimit);
+        // Without a limit, the memory usage isn't measured on access.
+        if (previousMemoryLimit == 0 && memoryLimit > 0) {
+            this->_MeasureMemoryUsage();
+        }
+        this->_Evict(std::string());
+    }
+
+    // Returns a copy of the record for the given key. The create function
+    // (Record()) is called if the record doesn't exist yet, otherwise the
+    // update function (void(Record&)) is called with the existing record,
+    // both while holding the entry's lock.
+    template <class CreateFn, class UpdateFn>
+    Record GetOrCreate(const std::string& key, const CreateFn& create, const UpdateFn& update) {
+        std::shared_ptr<Entry> entry;
+        {
+            std::lock_guard<std::mutex> lock(_mutex);
+            auto it = _entries.find(key);
+            if (it == _entries.end()) {
+                _order.push_front(key);
+                it = _entries.emplace(key, std::make_shared<Entry>()).first;
+                it->second->orderIt = _order.begin();
+            } else {
+                _order.splice(_order.begin(), _order, it->second->orderIt);
+            }
+            entry = it->second;
+        }
+        std::optional<Record> record;
+        {
+            std::lock_guard<std::mutex> entryLock(entry->mutex);
+            if (!entry->record) {
+                entry->record.emplace(create());
+            } else {
+                update(*entry->record);
+            }
+            if (_memoryLimit.load() > 0) {
+                entry->memoryUsage.store(_memoryUsage(*entry->record));
+            }
+            record.emplace(*entry->record);
+        }
+        this->_Evict(key);
+        return std::move(*record);
+    }
+
+    // Returns a copy of the record for the given key, if it exists and the
+    // predicate (bool(const Record&)) is true for it, without creating it.
+    template <class PredicateFn>
+    std::optional<Record> FindIf(const std::string& key, const PredicateFn& predicate) {
+        std::shared_ptr<Entry> entry;
+        {
+            std::lock_guard<std::mutex> lock(_mutex);
+            auto it = _entries.find(key);
+            if (it == _entries.end()) {
+                return std::nullopt;
+            }
+            _order.splice(_order.begin(), _order, it->second->orderIt);
+            entry = it->second;
+        }
+        std::lock_guard<std::mutex> entryLock(entry->mutex);
+        if (!entry->record || !predicate(*entry->record)) {
+            return std::nullopt;
+        }
+        return entry->record;
+    }
+
+    bool Contains(const std::string& key) const {
+        std::lock_guard<std::mutex> lock(_mutex);
+        return _entries.find(key) != _entries.end();
+    }
+
+    bool Erase(const std::string& key) {
+        std::shared_ptr<Entry> removedEntry;
+        std::lock_guard<std::mutex> lock(_mutex);
+        auto it = _entries.find(key);
+        if (it == _entries.end()) {
+            return false;
+        }
+        _order.erase(it->second->orderIt);
+        removedEntry = std::move(it->second);
+        _entries.erase(it);
+        return true;
+    }
+
+    // Removes all records that are not in use (or all records, if forced)
+    // and returns the number of removed records.
+    size_t Purge(bool force = false) {
+        std::vector<std::shared_ptr<Entry>> removedEntries;
+        std::lock_guard<std::mutex> lock(_mutex);
+        size_t count = 0;
+        for (auto orderIt = _order.begin(); orderIt != _order.end();) {
+            auto it = _entries.find(*orderIt);
+            if (!force && this->_IsInUseLocked(*it->second)) {
+                ++orderIt;
+                continue;
+            }
+            removedEntries.push_back(std::move(it->second));
+            _entries.erase(it);
+            orderIt = _order.erase(orderIt);
+            ++count;
+        }
+        return count;
+    }
+
+    void Clear() { this->Purge(true); }
+
+    size_t Size() const {
+        std::lock_guard<std::mutex> lock(_mutex);
+        return _entries.size();
+    }
+
+    size_t GetMemoryUsage() const {
+        if (_memoryLimit.load() == 0) {
+            this->_MeasureMemoryUsage();
+        }
+        std::lock_guard<std::mutex> lock(_mutex);
+        return this->_GetMemoryUsageLocked();
+    }
+
+    // Returns the keys ordered from most to least recently used.
+    std::vector<std::string> Keys() const {
+        std::lock_guard<std::mutex> lock(_mutex);
+        return std::vector<std::string>(_order.begin(), _order.end());
+    }
+
+private:
+    struct Entry
+    {
+        std::mutex mutex;
+        std::optional<Record> record;
+        std::atomic<size_t> memoryUsage{0};
+        std::list<std::string>::iterator orderIt;
+    };
+
+    // Entries that are currently locked are being constructed or
+    // updated, so we treat them as in use. We only try to lock the
+    // entry here, as the entry lock is never acquired while holding
+    // the registry lock elsewhere.
+    bool _IsInUseLocked(Entry& entry) const {
+        std::unique_lock<std::mutex> entryLock(entry.mutex, std::try_to_lock);
+        if (!entryLock.owns_lock()) {
+            return true;
+        }
+        return entry.record && _isInUse(*entry.record);
+    }
+
+    // Measures the memory usage of all records, without holding the
+    // registry lock while waiting for the entry locks.
+    void _MeasureMemoryUsage() const {
+        std::vector<std::shared_ptr<Entry>> entries;
+        {
+            std::lock_guard<std::mutex> lock(_mutex);
+            entries.reserve(_entries.size());
+            for (const auto& pair : _entries) {
+                entries.push_back(pair.second);
+            }
+        }
+        for (const std::shared_ptr<Entry>& entry : entries) {
+            std::lock_guard<std::mutex> entryLock(entry->mutex);
+            if (entry->record) {
+                entry->memoryUsage.store(_memoryUsage(*entry->record));
+            }
+        }
+    }
+
+    size_t _GetMemoryUsageLocked() const {
+        size_t memoryUsage = 0;
+        for (const auto& pair : _entries) {
+            memoryUsage += pair.second->memoryUsage.load();
+        }
+        return memoryUsage;
+    }
+
+    void _Evict(const std::string& accessedKey) {
+        const size_t capacity = _capacity.load();
+        const size_t memoryLimit = _memoryLimit.load();
+        if (capacity == 0 && memoryLimit == 0) {
+            return;
+        }
+        // Declared before the lock, so that the records are destroyed after unlocking.
+        std::vector<std::shared_ptr<Entry>> removedEntries;
+        std::lock_guard<std::mutex> lock(_mutex);
+        size_t memoryUsage = memoryLimit > 0 ? this->_GetMemoryUsageLocked() : 0;
+        const auto isExceeded = [&]() {
+            return (capacity > 0 && _entries.size() > capacity) ||
+                (memoryLimit > 0 && memoryUsage > memoryLimit);
+        };
+        auto orderIt = _order.end();
+        while (isExceeded() && orderIt != _order.begin()) {
+            --orderIt;
+            if (*orderIt == accessedKey) {
+                continue;
+            }
+            auto it = _entries.find(*orderIt);
+            if (this->_IsInUseLocked(*it->second)) {
+                continue;
+            }
+            memoryUsage -= std::min(memoryUsage, it->second->memoryUsage.load());
+            removedEntries.push_back(std::move(it->second));
+            _entries.erase(it);
+            orderIt = _order.erase(orderIt);
+        }
+    }
+
+    IsInUseFn _isInUse;
+    MemoryUsageFn _memoryUsage;
+    std::atomic<size_t> _capacity{0};
+    std::atomic<size_t> _memoryLimit{0};
+    mutable std::mutex _mutex;
+    std::list<std::string> _order;
+    std::unordered_map<std::string, std::shared_ptr<Entry>> _entries;
+};
+
+#endif // SHARED_CONTEXT_REGISTRY_H
@@ -0,0 +1,120 @@
+#ifndef WRAP_CONCURRENT_STRING_MAP_H
+#define WRAP_CONCURRENT_STRING_MAP_H
+
+#include "concurrent_string_map.h"
+
+#include "pxr/pxr.h"
+#include "pxr/base/tf/pyUtils.h"
+
+#include "boost_include_wrapper.h"
+#include BOOST_INCLUDE(python.hpp)
+
+#include <memory>
+#include <string>
+#include <utility>
+
+/* Concurrent String Map View
+A read-only Python mapping over a ConcurrentStringMap. Lookups run directly
+against the C++ storage instead of first copying all pairs into a dict.
+The view shares ownership of the map, so it stays valid (and live) for as long
+as Python holds on to it. The Tag template parameter makes the type unique per
+resolver, so that multiple resolver Python modules can be imported into the
+same interpreter without conflicting boost python registrations.
+*/
+template <class Tag>
+class ConcurrentStringMapView
+{
+public:
+    using This = ConcurrentStringMapView<Tag>;
+
+    explicit ConcurrentStringMapView(std::shared_ptr<const ConcurrentStringMap> map)
+        : _map(std::move(map)) {}
+
+    static void Wrap(const char* name)
+    {
+        namespace python = AR_BOOST_NAMESPACE::python;
+        python::class_<This>(name, python::no_init)
+            .def("__getitem__", &This::_GetItem)
+            .def("__contains__", &This::_Contains)
+            .def("__len__", &This::_Len)
+            .def("__iter__", &This::_Iter)
+            .def("__repr__", &This::_Repr)
+            .def("get", &This::_Get, (python::arg("key"), python::arg("default")=python::object()))
+            .def("keys", &This::_Keys)
+            .def("values", &This::_Values)
+            .def("items", &This::_Items)
+        ;
+    }
+
+private:
+    std::string _GetItem(const std::string& key) const {
+        std::string value;
+        if (!_map->Find(key, value)) {
+            PXR_NS::TfPyThrowKeyError(key);
+        }
+        return value;
+    }
+
+    bool _Contains(const AR_BOOST_NAMESPACE::python::object& key) const {
+        AR_BOOST_NAMESPACE::python::extract<std::string> keyStr(key);
+        return keyStr.check() && _map->Contains(keyStr());
+    }
+
+    size_t _Len() const { return _map->Size(); }
+
+    AR_BOOST_NAMESPACE::python::object _Iter() const {
+        // Iterating a concurrently modified map isn't safe, so we only
+        // snapshot the keys (not the values) and iterate over those.
+        return AR_BOOST_NAMESPACE::python::object(_Keys()).attr("__iter__")();
+    }
+
+    std::string _Repr() const {
+        const std::string dictRepr = AR_BOOST_NAMESPACE::python::extract<std::string>(_Dict().attr("__repr__")());
+        return TF_PY_REPR_PREFIX + "PairsView(" + dictRepr + ")";
+    }
+
+    AR_BOOST_NAMESPACE::python::object _Get(const std::string& key,
+                                            const AR_BOOST_NAMESPACE::python::object& defaultValue) const {
+        std::string value;
+        if (!_map->Find(key, value)) {
+            return defaultValue;
+        }
+        return AR_BOOST_NAMESPACE::python::object(value);
+    }
+
+    AR_BOOST_NAMESPACE::python::list _Keys() const {
+        AR_BOOST_NAMESPACE::python::list result;
+        for (const std::string& key : _map->Keys()) {
+            result.append(key);
+        }
+        return result;
+    }
+
+    AR_BOOST_NAMESPACE::python::list _Values() const {
+        AR_BOOST_NAMESPACE::python::list result;
+        for (const auto& pair : _map->ToMap()) {
+            result.append(pair.second);
+        }
+        return result;
+    }
+
+    AR_BOOST_NAMESPACE::python::list _Items() const {
+        AR_BOOST_NAMESPACE::python::list result;
+        for (const auto& pair : _map->ToMap()) {
+            result.append(AR_BOOST_NAMESPACE::python::make_tuple(pair.first, pair.second));
+        }
+        return result;
+    }
+
+    AR_BOOST_NAMESPACE::python::dict _Dict() const {
+        AR_BOOST_NAMESPACE::python::dict result;
+        for (const auto& pair : _map->ToMap()) {
+            result[pair.first] = pair.second;
+        }
+        return result;
+    }
+
+    std::shared_ptr<const ConcurrentStringMap> _map;
+};
+
+#endif // WRAP_CONCURRENT_STRING_MAP_H
@@ -0,0 +1,44 @@
+#ifndef WRAP_RESOLVER_STATISTICS_H
+#define WRAP_RESOLVER_STATISTICS_H
+
+#include "resolver_statistics.h"
+
+#include "boost_include_wrapper.h"
+#include BOOST_INCLUDE(python.hpp)
+
+#include <cstddef>
+
+/* Resolver Statistics To Dict
+Converts resolver statistics to a Python dict of the form
+{"counters": {name: value}, "latencies": {name: {"count": int, "totalTime": int,
+"maxTime": int, "histogram": {upperBound: count}}}}, with all times in nanoseconds.
+*/
+template <class Counter, class Latency>
+AR_BOOST_NAMESPACE::python::dict resolverStatisticsToDict(const ResolverStatistics<Counter, Latency>& statistics)
+{
+    namespace python = AR_BOOST_NAMESPACE::python;
+    python::dict counters;
+    for (size_t idx = 0; idx < statistics.GetCounterNames().size(); ++idx) {
+        counters[statistics.GetCounterNames()[idx]] = statistics.GetCounter(static_cast<Counter>(idx));
+    }
+    python::dict latencies;
+    for (size_t idx = 0; idx < statistics.GetLatencyNames().size(); ++idx) {
+        const LatencyHistogram& latency = statistics.GetLatency(static_cast<Latency>(idx));
+        python::dict histogram;
+        for (const auto& bucket : latency.GetBuckets()) {
+            histogram[bucket.first] = bucket.second;
+        }
+        python::dict latencyDict;
+        latencyDict["count"] = latency.GetCount();
+        latencyDict["totalTime"] = latency.GetTotalTime();
+        latencyDict["maxTime"] = latency.GetMaxTime();
+        latencyDict["histogram"] = histogram;
+        latencies[statistics.GetLatencyNames()[idx]] = latencyDict;
+    }
+    python::dict result;
+    result["counters"] = counters;
+    result["latencies"] = latencies;
+    return result;
+}
+
+#endif // WRAP_RESOLVER_STATISTICS_H
@@ -0,0 +1,350 @@
+"""Benchmark the File, Cached and Python Resolver side by side.
+
+A synthetic workspace (see workspace.py) is generated once and then every
+resolver is benchmarked in its own process (with the environment of its
+dist/<resolverName> build), so that the resolvers don't share any caches and
+the peak memory usage is measured per resolver. Per resolver we measure:
+- The context creation time, which is dominated by loading the mapping
+  pairs (see --mappingPairCount).
+- The stage open time of the workspace's shot, the first (cold) open and
+  the median of the following (warm) opens.
+- The resolve throughput, without and with an active scoped cache.
+- The Python call count, as recorded by the resolver statistics.
+- The peak resident set size of the process.
+
+The results are written as json, so that runs of different builds can be compared:
+    python benchmark_resolvers.py --output before.json
+    python benchmark_resolvers.py --output after.json --compare before.json
+
+The interpreter has to be able to import the pxr modules, use --python to run
+the resolvers with a different interpreter (e.g. hython) than the driver.
+By default the workspace is generated on a tmpfs (if available), use --root
+to point it at e.g. a network share or a latency simulating mount instead.
+"""
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import workspace
+
+REPO_ROOT_DIR_PATH = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+RESOLVER_NAMES = ("fileResolver", "cachedResolver", "pythonResolver")
+RESOLVER_CXX_CLASS_NAMES = {
+    "fileResolver": "FileResolver",
+    "cachedResolver": "CachedResolver",
+    "pythonResolver": "PythonResolver",
+}
+RESOLVER_PYTHON_EXPOSE_DIR_PATHS = {
+    "cachedResolver": os.path.join(os.path.dirname(os.path.abspath(__file__)), "cachedResolver"),
+}
+# The metrics that get compared between runs and whether higher values are better.
+COMPARED_METRICS = (
+    ("contextCreateSeconds", False),
+    ("stageOpenColdSeconds", False),
+    ("stageOpenWarmSeconds", False),
+    ("resolvesPerSecond", True),
+    ("scopedCacheResolvesPerSecond", True),
+    ("pythonCallCount", False),
+    ("peakRssBytes", False),
+)
+
+
+def _get_peak_rss_bytes():
+    """Returns the peak resident set size of the current process in bytes or None if unsupported."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def _get_statistics(resolver):
+    """Returns the resolver statistics or None, if the build doesn't record them yet."""
+    if not hasattr(resolver, "GetStatistics"):
+        return None
+    return resolver.GetStatistics()
+
+
+def _get_python_call_count(resolver_statistics):
+    """Returns the number of Python calls recorded in the resolver statistics or None if unavailable."""
+    if resolver_statistics is None:
+        return None
+    return sum(latency["count"] for name, latency in resolver_statistics["latencies"].items() if name.startswith("python"))
+
+
+def import_resolver(resolver_name):
+    """Make the given resolver the preferred resolver.
+    Args:
+        resolver_name (str): The resolver name, e.g. "fileResolver".
+    Returns:
+        tuple[module, Ar.Resolver]: The resolver's Python module and the resolver.
+    """
+    from pxr import Ar
+
+    # Only the module of the benchmarked resolver is on the PYTHONPATH.
+    resolver_module = importlib.import_module("usdAssetResolver.{}".format(RESOLVER_CXX_CLASS_NAMES[resolver_name]))
+    Ar.SetPreferredResolver(RESOLVER_CXX_CLASS_NAMES[resolver_name])
+    return resolver_module, Ar.GetUnderlyingResolver()
+
+
+def create_context(resolver_name, resolver_module, manifest):
+    """Create a new resolver context for the workspace.
+    Args:
+        resolver_name (str): The resolver name, e.g. "fileResolver".
+        resolver_module (module): The resolver's Python module.
+        manifest (dict): The workspace manifest.
+    Returns:
+        ResolverContext: The resolver context.
+    """
+    if resolver_name == "fileResolver":
+        return resolver_module.ResolverContext(manifest["mappingFilePath"], manifest["searchPaths"])
+    if resolver_name == "cachedResolver":
+        return resolver_module.ResolverContext(manifest["absoluteMappingFilePath"])
+    return resolver_module.ResolverContext(manifest["mappingFilePath"])
+
+
+def run_worker(resolver_name, manifest, repeat_count, resolve_count):
+    """Benchmark a single resolver in the current process.
+    Args:
+        resolver_name (str): The resolver name, e.g. "fileResolver".
+        manifest (dict): The workspace manifest.
+        repeat_count (int): The number of stage opens.
+        resolve_count (int): The number of resolves per throughput measurement.
+    Returns:
+        dict: The benchmark result.
+    """
+    from pxr import Ar, Usd
+
+    resolver_module, resolver = import_resolver(resolver_name)
+    start_time = time.perf_counter()
+    ctx = create_context(resolver_name, resolver_module, manifest)
+    context_create_duration = time.perf_counter() - start_time
+    # Builds that predate the resolver statistics don't expose them.
+    if hasattr(resolver, "ResetStatistics"):
+        resolver.ResetStatistics()
+
+    # Stage open
+    stage_open_durations = []
+    layer_count = 0
+    cold_statistics = None
+    is_cold_open = True
+    for _ in range(repeat_count):
+        start_time = time.perf_counter()
+        stage = Usd.Stage.Open(manifest["shotFilePath"], ctx, Usd.Stage.LoadAll)
+        stage_open_durations.append(time.perf_counter() - start_time)
+        layer_count = len(stage.GetUsedLayers())
+        if is_cold_open:
+            cold_statistics = _get_statistics(resolver)
+            is_cold_open = False
+        del stage
+
+    # Resolve throughput
+    identifiers = manifest["identifiers"]
+    lookup_identifiers = [identifiers[idx % len(identifiers)] for idx in range(resolve_count)]
+    with Ar.ResolverContextBinder(ctx):
+        start_time = time.perf_counter()
+        for identifier in lookup_identifiers:
+            resolver.Resolve(identifier)
+        resolve_duration = time.perf_counter() - start_time
+        with Ar.ResolverScopedCache():
+            start_time = time.perf_counter()
+            for identifier in lookup_identifiers:
+                resolver.Resolve(identifier)
+            scoped_cache_resolve_duration = time.perf_counter() - start_time
+        unresolved_identifiers = [identifier for identifier in identifiers if not resolver.Resolve(identifier)]
+
+    total_statistics = _get_statistics(resolver)
+    return {
+        "contextCreateSeconds": context_create_duration,
+        "stageOpenSeconds": stage_open_durations,
+        "stageOpenColdSeconds": stage_open_durations[0],
+        "stageOpenWarmSeconds": statistics.median(stage_open_durations[1:]) if repeat_count > 1 else None,
+        "layerCount": layer_count,
+        "resolvesPerSecond": resolve_count / resolve_duration,
+        "scopedCacheResolvesPerSecond": resolve_count / scoped_cache_resolve_duration,
+        "unresolvedIdentifierCount": len(unresolved_identifiers),
+        "pythonCallCount": _get_python_call_count(total_statistics),
+        "stageOpenColdPythonCallCount": _get_python_call_count(cold_statistics),
+        "peakRssBytes": _get_peak_rss_bytes(),
+        "statistics": total_statistics,
+    }
+
+
+def get_resolver_env(resolver_name, dist_dir_path, manifest):
+    """Returns the process environment that loads the given resolver build.
+    This matches what setup.sh configures for a single resolver.
+    """
+    env = dict(os.environ)
+    resolver_dist_dir_path = os.path.join(dist_dir_path, resolver_name)
+    library_env_var = "PATH" if sys.platform == "win32" else "DYLD_LIBRARY_PATH" if sys.platform == "darwin" else "LD_LIBRARY_PATH"
+    env_paths = {
+        "PYTHONPATH": [os.path.join(resolver_dist_dir_path, "lib", "python")],
+        "PXR_PLUGINPATH_NAME": [os.path.join(resolver_dist_dir_path, "resources")],
+        library_env_var: [os.path.join(resolver_dist_dir_path, "lib")],
+    }
+    if resolver_name in RESOLVER_PYTHON_EXPOSE_DIR_PATHS:
+        env_paths["PYTHONPATH"].insert(0, RESOLVER_PYTHON_EXPOSE_DIR_PATHS[resolver_name])
+    for env_var, paths in env_paths.items():
+        env[env_var] = os.pathsep.join(paths + ([env[env_var]] if env.get(env_var) else []))
+    env["AR_SEARCH_PATHS"] = os.pathsep.join(manifest["searchPaths"])
+    for env_var in ("AR_SEARCH_REGEX_EXPRESSION", "AR_SEARCH_REGEX_FORMAT", "AR_PYTHON_EXPOSE_TRACING", "TF_DEBUG"):
+        env.pop(env_var, None)
+    return env
+
+
+def run_resolver(resolver_name, python_executable, dist_dir_path, manifest, repeat_count, resolve_count):
+    """Benchmark a resolver in a separate process.
+    Returns:
+        dict: The benchmark result or a dict with an "error" key if the benchmark failed.
+    """
+    if not os.path.isdir(os.path.join(dist_dir_path, resolver_name)):
+        return {"error": "No build found in {}".format(os.path.join(dist_dir_path, resolver_name))}
+    with tempfile.TemporaryDirectory() as temp_dir_path:
+        result_file_path = os.path.join(temp_dir_path, "result.json")
+        command = [python_executable, os.path.abspath(__file__), "--worker", resolver_name,
+                   "--root", manifest["rootDirPath"], "--repeat", str(repeat_count),
+                   "--resolveCount", str(resolve_count), "--workerOutput", result_file_path]
+        process = subprocess.run(command, env=get_resolver_env(resolver_name, dist_dir_path, manifest),
+                                 stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+        if process.returncode != 0 or not os.path.isfile(result_file_path):
+            return {"error": process.stdout.strip() or "Exit code {}".format(process.returncode)}
+        with open(result_file_path, "r") as result_file:
+            return json.load(result_file)
+
+
+def get_git_revision():
+    """Returns the git revision of the repository or None if unavailable."""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT_DIR_PATH,
+                                       stderr=subprocess.DEVNULL, universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_results(results):
+    """Format the key metrics of the results as a table.
+    Args:
+        results (dict): The benchmark results.
+    Returns:
+        str: The table.
+    """
+    rows = [("Resolver", "Context (s)", "Open cold (s)", "Open warm (s)", "Layers", "Resolves/s",
+             "Scoped resolves/s", "Python calls", "Peak RSS (MB)")]
+    errors = []
+    for resolver_name, result in results["resolvers"].items():
+        if "error" in result:
+            errors.append("{} failed: {}".format(resolver_name, result["error"]))
+            continue
+        rows.append((
+            resolver_name,
+            "{:.3f}".format(result["contextCreateSeconds"]),
+            "{:.3f}".format(result["stageOpenColdSeconds"]),
+            "{:.3f}".format(result["stageOpenWarmSeconds"]) if result["stageOpenWarmSeconds"] is not None else "-",
+            str(result["layerCount"]),
+            "{:.0f}".format(result["resolvesPerSecond"]),
+            "{:.0f}".format(result["scopedCacheResolvesPerSecond"]),
+            str(result["pythonCallCount"]) if result["pythonCallCount"] is not None else "-",
+            "{:.1f}".format(result["peakRssBytes"] / 1024 ** 2) if result["peakRssBytes"] is not None else "-",
+        ))
+    widths = [max(len(row[idx]) for row in rows) for idx in range(len(rows[0]))]
+    lines = ["  ".join(cell.ljust(width) if idx == 0 else cell.rjust(width) for idx, (cell, width) in enumerate(zip(row, widths)))
+             for row in rows]
+    return "\n".join(lines + errors)
+
+
+def format_comparison(results, baseline_results):
+    """Format the relative change of the compared metrics to a baseline run.
+    Args:
+        results (dict): The benchmark results.
+        baseline_results (dict): The benchmark results to compare against.
+    Returns:
+        str: The comparison, one line per resolver and metric.
+    """
+    lines = []
+    for resolver_name, result in results["resolvers"].items():
+        baseline_result = baseline_results["resolvers"].get(resolver_name, {})
+        if "error" in result or not baseline_result or "error" in baseline_result:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            value, baseline_value = result.get(metric), baseline_result.get(metric)
+            if not value or not baseline_value:
+                continue
+            change = value / baseline_value - 1.0
+            improved = change > 0 if higher_is_better else change < 0
+            lines.append("{:<16} {:<30} {:>14.4g} -> {:<14.4g} {:+7.1%} {}".format(
+                resolver_name, metric, baseline_value, value, change, "better" if improved else "worse" if change else ""))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the resolvers side by side on a synthetic workspace")
+    parser.add_argument("--resolvers", nargs="+", choices=RESOLVER_NAMES, default=list(RESOLVER_NAMES))
+    parser.add_argument("--distDir", default=os.path.join(REPO_ROOT_DIR_PATH, "dist"),
+                        help="The directory that contains the <resolverName> builds")
+    parser.add_argument("--python", default=sys.executable, help="The Python interpreter to run the resolvers with")
+    parser.add_argument("--root", default=workspace.get_default_root_dir_path(), help="The workspace root directory")
+    parser.add_argument("--reuseWorkspace", action="store_true", help="Re-use an existing workspace at the root")
+    parser.add_argument("--keepWorkspace", action="store_true", help="Don't remove the workspace afterwards")
+    parser.add_argument("--repeat", type=int, default=5, help="The number of stage opens per resolver")
+    parser.add_argument("--resolveCount", type=int, default=100000, help="The number of resolves per throughput measurement")
+    parser.add_argument("--output", help="The json file to write the results to")
+    parser.add_argument("--compare", help="A json file of a previous run to compare the results against")
+    parser.add_argument("--worker", choices=RESOLVER_NAMES, help=argparse.SUPPRESS)
+    parser.add_argument("--workerOutput", help=argparse.SUPPRESS)
+    workspace.add_workspace_arguments(parser)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(args.worker, workspace.load_manifest(args.root), args.repeat, args.resolveCount)
+        with open(args.workerOutput, "w") as result_file:
+            json.dump(result, result_file)
+        return
+
+    if args.reuseWorkspace and os.path.isfile(os.path.join(args.root, workspace.MANIFEST_FILE_NAME)):
+        manifest = workspace.load_manifest(args.root)
+    else:
+        manifest = workspace.create_workspace(args.root, args.assetCount, args.versionCount, args.referencesPerLayer,
+                                              args.mappingPairCount, args.searchPathCount,
+                                              args.relativeReferencesPerLayer)
+    try:
+        results = {
+            "metadata": {
+                "date": datetime.datetime.now().isoformat(),
+                "gitRevision": get_git_revision(),
+                "platform": platform.platform(),
+                "python": args.python,
+                "repeat": args.repeat,
+                "resolveCount": args.resolveCount,
+            },
+            "workspace": {key: value for key, value in manifest.items() if key != "identifiers"},
+            "resolvers": {},
+        }
+        for resolver_name in args.resolvers:
+            results["resolvers"][resolver_name] = run_resolver(resolver_name, args.python, args.distDir, manifest,
+                                                               args.repeat, args.resolveCount)
+    finally:
+        if not args.keepWorkspace and not args.reuseWorkspace:
+            shutil.rmtree(manifest["rootDirPath"], ignore_errors=True)
+
+    print(format_results(results))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=4)
+    if args.compare:
+        with open(args.compare, "r") as baseline_file:
+            print(format_comparison(results, json.load(baseline_file)))
+
+
+if __name__ == "__main__":
+    main()
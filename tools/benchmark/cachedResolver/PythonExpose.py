@@ -0,0 +1,62 @@
+"""The CachedResolver hooks used by the resolver benchmarks.
+
+The shipped PythonExpose.py only contains unit test logic, so the benchmark
+puts this module in front of it on the PYTHONPATH. Identifiers without a
+mapping pair are looked up in the search paths (like the File Resolver does),
+so that all resolvers resolve the benchmark workspace to the same layers.
+"""
+import os
+
+from pxr import Sdf
+
+
+SEARCH_PATHS_ENV_VAR = "AR_SEARCH_PATHS"
+SEARCH_PATHS = [path for path in os.environ.get(SEARCH_PATHS_ENV_VAR, "").split(os.path.pathsep) if path]
+
+
+class Resolver:
+    @staticmethod
+    def CreateRelativePathIdentifier(resolver, anchoredAssetPath, assetPath, anchorAssetPath):
+        """Returns the anchored asset path, so that relative identifiers
+        are not passed through to ResolverContext.ResolveAndCache.
+        """
+        resolver.AddCachedRelativePathIdentifierPair(anchoredAssetPath, anchoredAssetPath)
+        return anchoredAssetPath
+
+
+class ResolverContext:
+    @staticmethod
+    def Initialize(context):
+        """Initialize the context, the benchmark doesn't pre-populate any caching pairs."""
+        return
+
+    @staticmethod
+    def ResolveAndCache(context, assetPath):
+        """Resolve the asset path via the search paths and cache the result.
+        Args:
+            context (CachedResolverContext): The active context.
+            assetPath (str): An unresolved asset path.
+        Returns:
+            str: The resolved path string.
+        """
+        resolved_asset_path = ""
+        if Sdf.Layer.IsAnonymousLayerIdentifier(assetPath):
+            resolved_asset_path = assetPath
+        else:
+            for search_path in SEARCH_PATHS:
+                file_path = os.path.join(search_path, assetPath)
+                if os.path.isfile(file_path):
+                    resolved_asset_path = file_path
+                    break
+        context.AddCachingPair(assetPath, resolved_asset_path)
+        return resolved_asset_path
+
+    @staticmethod
+    def ResolveAndCacheBatch(context, assetPaths):
+        """Resolve and cache all the given asset paths.
+        Args:
+            context (CachedResolverContext): The active context.
+            assetPaths (list[str]): The unresolved asset paths.
+        """
+        for assetPath in assetPaths:
+            ResolverContext.ResolveAndCache(context, assetPath)
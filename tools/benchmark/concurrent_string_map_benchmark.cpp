@@ -0,0 +1,126 @@
+/* Concurrent String Map Benchmark
+Microbenchmark of the ConcurrentStringMap (that stores the mapping and
+caching pairs of the resolvers), sweeping the pair count. Per pair count
+we measure the load time, the lookup throughput (single and multi
+threaded), the memory usage as estimated by GetMemoryUsage and the
+resident set size growth of the process.
+As the map is header only, the benchmark doesn't need USD to build:
+    g++ -O2 -std=c++17 -pthread -I../../src/utils concurrent_string_map_benchmark.cpp -o concurrent_string_map_benchmark
+    ./concurrent_string_map_benchmark --pairCounts 1000 100000 1000000 --targets unique
+With "--targets unique" every pair has its own target (like pinned asset
+versions), with "--targets shared" the targets repeat every 16 pairs.
+*/
+#include "concurrent_string_map.h"
+
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <fstream>
+#include <random>
+#include <string>
+#include <thread>
+#include <vector>
+
+// Returns the resident set size of the process in bytes (Linux only, zero elsewhere).
+static size_t _GetRssBytes()
+{
+    std::ifstream statm("/proc/self/statm");
+    size_t pageCount = 0;
+    size_t residentPageCount = 0;
+    if (!(statm >> pageCount >> residentPageCount)) {
+        return 0;
+    }
+    return residentPageCount * 4096;
+}
+
+static ConcurrentStringMap::Pairs _CreatePairs(size_t pairCount, bool uniqueTargets)
+{
+    ConcurrentStringMap::Pairs pairs;
+    pairs.reserve(pairCount);
+    for (size_t idx = 0; idx < pairCount; ++idx) {
+        const size_t targetIdx = uniqueTargets ? idx : idx / 16;
+        pairs.emplace_back("assets/asset_" + std::to_string(idx) + "/asset_" + std::to_string(idx) + ".usd",
+                           "/mnt/projects/show/assets/asset_" + std::to_string(targetIdx) +
+                           "/publish/asset_" + std::to_string(targetIdx) + "_v003.usd");
+    }
+    return pairs;
+}
+
+static double _MeasureLookupsPerSecond(const ConcurrentStringMap& map, const std::vector<std::string>& keys,
+                                       size_t lookupCount, size_t threadCount)
+{
+    const auto start = std::chrono::steady_clock::now();
+    std::vector<std::thread> threads;
+    for (size_t threadIdx = 0; threadIdx < threadCount; ++threadIdx) {
+        threads.emplace_back([&, threadIdx]() {
+            std::mt19937_64 random(threadIdx);
+            std::string value;
+            size_t hitCount = 0;
+            for (size_t idx = 0; idx < lookupCount; ++idx) {
+                hitCount += map.Find(keys[random() % keys.size()], value);
+            }
+            if (hitCount != lookupCount) {
+                std::fprintf(stderr, "Unexpected lookup misses\n");
+                std::exit(1);
+            }
+        });
+    }
+    for (std::thread& thread : threads) {
+        thread.join();
+    }
+    const std::chrono::duration<double> duration = std::chrono::steady_clock::now() - start;
+    return lookupCount * threadCount / duration.count();
+}
+
+int main(int argc, char* argv[])
+{
+    std::vector<size_t> pairCounts;
+    size_t lookupCount = 1000000;
+    size_t threadCount = std::thread::hardware_concurrency();
+    bool uniqueTargets = true;
+    for (int idx = 1; idx < argc; ++idx) {
+        if (std::strcmp(argv[idx], "--pairCounts") == 0) {
+            while (idx + 1 < argc && argv[idx + 1][0] != '-') {
+                pairCounts.push_back(std::strtoull(argv[++idx], nullptr, 10));
+            }
+        } else if (std::strcmp(argv[idx], "--lookupCount") == 0 && idx + 1 < argc) {
+            lookupCount = std::strtoull(argv[++idx], nullptr, 10);
+        } else if (std::strcmp(argv[idx], "--threads") == 0 && idx + 1 < argc) {
+            threadCount = std::strtoull(argv[++idx], nullptr, 10);
+        } else if (std::strcmp(argv[idx], "--targets") == 0 && idx + 1 < argc) {
+            uniqueTargets = std::strcmp(argv[++idx], "shared") != 0;
+        } else {
+            std::fprintf(stderr, "Usage: %s [--pairCounts N...] [--lookupCount N] [--threads N] [--targets unique|shared]\n", argv[0]);
+            return 1;
+        }
+    }
+    if (pairCounts.empty()) {
+        pairCounts = {1000, 100000, 1000000};
+    }
+    threadCount = threadCount > 0 ? threadCount : 1;
+
+    std::printf("%12s %10s %16s %16s %14s %14s\n", "pairs", "load (s)", "lookups/s", "lookups/s (mt)", "usage (MB)", "rss (MB)");
+    for (const size_t pairCount : pairCounts) {
+        ConcurrentStringMap::Pairs pairs = _CreatePairs(pairCount, uniqueTargets);
+        std::vector<std::string> keys;
+        keys.reserve(pairs.size());
+        for (const auto& pair : pairs) {
+            keys.push_back(pair.first);
+        }
+        // The pairs are kept alive until after the load, so that freeing
+        // them doesn't offset the resident set size growth.
+        const size_t rssBefore = _GetRssBytes();
+        ConcurrentStringMap map;
+        const auto start = std::chrono::steady_clock::now();
+        map.InsertMany(pairs);
+        const std::chrono::duration<double> loadDuration = std::chrono::steady_clock::now() - start;
+        const size_t rssAfter = _GetRssBytes();
+        const double lookupsPerSecond = _MeasureLookupsPerSecond(map, keys, lookupCount, 1);
+        const double threadedLookupsPerSecond = _MeasureLookupsPerSecond(map, keys, lookupCount, threadCount);
+        std::printf("%12zu %10.3f %16.0f %16.0f %14.1f %14.1f\n", pairCount, loadDuration.count(),
+                    lookupsPerSecond, threadedLookupsPerSecond, map.GetMemoryUsage() / 1024.0 / 1024.0,
+                    (rssAfter > rssBefore ? rssAfter - rssBefore : 0) / 1024.0 / 1024.0);
+    }
+    return 0;
+}
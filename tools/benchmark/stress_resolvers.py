@@ -0,0 +1,355 @@
+"""Stress the resolvers with concurrent stage opens and resolves.
+
+Every resolver is run in its own process (see benchmark_resolvers.py) once
+per thread count, the thread counts double from 1 up to --maxThreads. In each
+run, the given number of Python threads concurrently open the workspace's shot
+and resolve the workspace's identifiers, USD's own worker threads are limited
+to the same count via PXR_WORK_THREAD_LIMIT. The contexts can be:
+- shared: All threads use the same context.
+- unique: Every stage open uses a new context (of the same mapping file).
+- registry: Every stage open requests the context via
+            Resolver.CreateDefaultContextForAsset, which returns the
+            globally shared context of the mapping file.
+
+The results are compared to a single threaded reference run, any of these
+count as a failure (and make the process exit with a non-zero exit code):
+- Stages that don't use the same layers as the reference stage.
+- Resolves that don't return the same resolved path as the reference resolve.
+- Cached Resolver caching pairs and relative path identifier pairs that are
+  missing (lost) or differ (inconsistent) from the reference run.
+- More than one shared context per mapping file.
+
+    python stress_resolvers.py --maxThreads 16 --contextModes shared registry --output stress.json
+
+Note that the Python threads only open stages concurrently, if the USD build
+releases the GIL during Usd.Stage.Open, the composition itself always runs on
+the USD worker threads.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import benchmark_resolvers
+import workspace
+
+CONTEXT_MODES = ("shared", "unique", "registry")
+# The number of reported mismatches per check, the count is always reported.
+MAX_REPORTED_MISMATCHES = 10
+
+
+def _get_stage_layer_paths(stage):
+    """Returns the sorted real paths of all non-anonymous layers the stage uses."""
+    return sorted(layer.realPath for layer in stage.GetUsedLayers() if not layer.anonymous)
+
+
+def _compare_pairs(expected_pairs, pairs):
+    """Compare cache pairs to the expected pairs.
+    Args:
+        expected_pairs (dict): The expected pairs.
+        pairs (dict): The actual pairs.
+    Returns:
+        tuple[list[str], list[str]]: The lost and the inconsistent keys.
+    """
+    lost_keys = [key for key in expected_pairs if key not in pairs]
+    inconsistent_keys = [key for key, value in pairs.items() if key in expected_pairs and expected_pairs[key] != value]
+    return lost_keys, inconsistent_keys
+
+
+class _Failures(object):
+    """Thread safe collection of failure counts and samples."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+        self.samples = {}
+
+    def add(self, check, sample):
+        with self._lock:
+            self.counts[check] = self.counts.get(check, 0) + 1
+            samples = self.samples.setdefault(check, [])
+            if len(samples) < MAX_REPORTED_MISMATCHES:
+                samples.append(sample)
+
+    def extend(self, check, samples):
+        for sample in samples:
+            self.add(check, sample)
+
+
+def run_worker(resolver_name, manifest, context_mode, thread_count, opens_per_thread, resolves_per_thread):
+    """Stress a single resolver in the current process.
+    Args:
+        resolver_name (str): The resolver name, e.g. "fileResolver".
+        manifest (dict): The workspace manifest.
+        context_mode (str): One of CONTEXT_MODES.
+        thread_count (int): The number of threads.
+        opens_per_thread (int): The number of stage opens per thread.
+        resolves_per_thread (int): The number of resolves per thread.
+    Returns:
+        dict: The stress result.
+    """
+    from pxr import Ar, Usd
+
+    resolver_module, resolver = benchmark_resolvers.import_resolver(resolver_name)
+    is_cached_resolver = resolver_name == "cachedResolver"
+    if is_cached_resolver and manifest["relativeReferencesPerLayer"]:
+        resolver.SetExposeRelativePathIdentifierState(True)
+    mapping_file_path = manifest["absoluteMappingFilePath" if is_cached_resolver else "mappingFilePath"]
+
+    def create_context():
+        if context_mode == "registry":
+            # All requests return the same shared context, wrapped in an Ar.ResolverContext.
+            return resolver.CreateDefaultContextForAsset(mapping_file_path).Get()[0]
+        return benchmark_resolvers.create_context(resolver_name, resolver_module, manifest)
+
+    # Reference
+    reference_ctx = create_context()
+    stage = Usd.Stage.Open(manifest["shotFilePath"], reference_ctx, Usd.Stage.LoadAll)
+    reference_layer_paths = _get_stage_layer_paths(stage)
+    del stage
+    identifiers = manifest["identifiers"]
+    if is_cached_resolver:
+        reference_stage_caching_pairs = dict(reference_ctx.GetCachingPairs())
+        reference_relative_path_identifier_pairs = dict(resolver.GetCachedRelativePathIdentifierPairs())
+        resolver.ClearCachedRelativePathIdentifierPairs()
+    with Ar.ResolverContextBinder(reference_ctx):
+        reference_resolved_paths = {identifier: resolver.Resolve(identifier).GetPathString() for identifier in identifiers}
+    if is_cached_resolver:
+        reference_caching_pairs = dict(reference_ctx.GetCachingPairs())
+        # In the registry mode, the reference context is the shared context.
+        reference_ctx.ClearCachingPairs()
+    # Builds that predate the resolver statistics don't expose them.
+    if hasattr(resolver, "ResetStatistics"):
+        resolver.ResetStatistics()
+
+    # Stress
+    # The contexts by key, with whether they were used to open stages and
+    # the identifiers that were resolved with them.
+    context_usages = {}
+    context_usages_lock = threading.Lock()
+    shared_ctx = create_context() if context_mode == "shared" else None
+
+    def get_context(used_for_stage, resolved_identifiers=()):
+        ctx = shared_ctx if context_mode == "shared" else create_context()
+        ctx_key = id(ctx) if context_mode == "unique" else context_mode
+        with context_usages_lock:
+            usage = context_usages.setdefault(ctx_key, [ctx, False, set()])
+            usage[1] |= used_for_stage
+            usage[2].update(resolved_identifiers)
+        return ctx
+
+    failures = _Failures()
+    barrier = threading.Barrier(thread_count + 1)
+
+    def stress(thread_idx):
+        try:
+            barrier.wait()
+            for _ in range(opens_per_thread):
+                stage = Usd.Stage.Open(manifest["shotFilePath"], get_context(True), Usd.Stage.LoadAll)
+                layer_paths = _get_stage_layer_paths(stage)
+                if layer_paths != reference_layer_paths:
+                    failures.add("stageLayerMismatches", {
+                        "missingLayers": sorted(set(reference_layer_paths) - set(layer_paths))[:MAX_REPORTED_MISMATCHES],
+                        "unexpectedLayers": sorted(set(layer_paths) - set(reference_layer_paths))[:MAX_REPORTED_MISMATCHES],
+                    })
+                del stage
+            resolve_identifiers = [identifiers[(thread_idx + resolve_idx * thread_count) % len(identifiers)]
+                                   for resolve_idx in range(resolves_per_thread)]
+            with Ar.ResolverContextBinder(get_context(False, resolve_identifiers)):
+                for identifier in resolve_identifiers:
+                    resolved_path = resolver.Resolve(identifier).GetPathString()
+                    if resolved_path != reference_resolved_paths[identifier]:
+                        failures.add("resolveMismatches", {"identifier": identifier, "resolvedPath": resolved_path,
+                                                           "expectedResolvedPath": reference_resolved_paths[identifier]})
+        except Exception as exc:
+            failures.add("exceptions", "{}: {}".format(type(exc).__name__, exc))
+
+    threads = [threading.Thread(target=stress, args=(thread_idx,)) for thread_idx in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - start_time
+
+    # Cache consistency
+    if is_cached_resolver:
+        for ctx, used_for_stage, resolved_identifiers in context_usages.values():
+            expected_keys = set(reference_stage_caching_pairs) if used_for_stage else set()
+            expected_keys.update(identifier for identifier in resolved_identifiers if identifier in reference_caching_pairs)
+            expected_pairs = {key: reference_caching_pairs[key] for key in expected_keys}
+            caching_pairs = dict(ctx.GetCachingPairs())
+            lost_keys, inconsistent_keys = _compare_pairs(expected_pairs, caching_pairs)
+            inconsistent_keys += [key for key, value in caching_pairs.items()
+                                  if key not in expected_pairs and key in reference_caching_pairs
+                                  and reference_caching_pairs[key] != value]
+            failures.extend("lostCachingPairs", lost_keys)
+            failures.extend("inconsistentCachingPairs", inconsistent_keys)
+        lost_keys, inconsistent_keys = _compare_pairs(reference_relative_path_identifier_pairs,
+                                                      dict(resolver.GetCachedRelativePathIdentifierPairs()))
+        failures.extend("lostRelativePathIdentifierPairs", lost_keys)
+        failures.extend("inconsistentRelativePathIdentifierPairs", inconsistent_keys)
+    if context_mode == "registry":
+        shared_context_count = len(resolver.GetSharedContextMappingFilePaths())
+        if shared_context_count != 1:
+            failures.add("sharedContextCountMismatches", shared_context_count)
+
+    open_count = thread_count * opens_per_thread
+    resolve_count = thread_count * resolves_per_thread
+    return {
+        "threadCount": thread_count,
+        "seconds": duration,
+        "stageOpenCount": open_count,
+        "resolveCount": resolve_count,
+        "operationsPerSecond": (open_count + resolve_count) / duration,
+        "failureCount": sum(failures.counts.values()),
+        "failures": failures.counts,
+        "failureSamples": failures.samples,
+        "statistics": resolver.GetStatistics() if hasattr(resolver, "GetStatistics") else None,
+    }
+
+
+def run_resolver(resolver_name, python_executable, dist_dir_path, manifest, context_mode, thread_count,
+                 opens_per_thread, resolves_per_thread):
+    """Stress a resolver in a separate process.
+    Returns:
+        dict: The stress result or a dict with an "error" key if the run failed.
+    """
+    env = benchmark_resolvers.get_resolver_env(resolver_name, dist_dir_path, manifest)
+    env["PXR_WORK_THREAD_LIMIT"] = str(thread_count)
+    with tempfile.TemporaryDirectory() as temp_dir_path:
+        result_file_path = os.path.join(temp_dir_path, "result.json")
+        command = [python_executable, os.path.abspath(__file__), "--worker", resolver_name,
+                   "--root", manifest["rootDirPath"], "--contextModes", context_mode,
+                   "--maxThreads", str(thread_count), "--opensPerThread", str(opens_per_thread),
+                   "--resolvesPerThread", str(resolves_per_thread), "--workerOutput", result_file_path]
+        process = subprocess.run(command, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                 universal_newlines=True)
+        if process.returncode != 0 or not os.path.isfile(result_file_path):
+            return {"error": process.stdout.strip() or "Exit code {}".format(process.returncode)}
+        with open(result_file_path, "r") as result_file:
+            return json.load(result_file)
+
+
+def get_thread_counts(max_thread_count):
+    """Returns the powers of two up to (and including) the max thread count."""
+    thread_counts = []
+    thread_count = 1
+    while thread_count < max_thread_count:
+        thread_counts.append(thread_count)
+        thread_count *= 2
+    thread_counts.append(max_thread_count)
+    return thread_counts
+
+
+def format_results(results):
+    """Format the throughput scaling and failures of the results as a table.
+    Args:
+        results (dict): The stress results.
+    Returns:
+        str: The table.
+    """
+    rows = [("Resolver", "Contexts", "Threads", "Ops/s", "Speedup", "Failures")]
+    errors = []
+    for resolver_name, mode_results in results["resolvers"].items():
+        for context_mode, thread_results in mode_results.items():
+            single_thread_result = thread_results[0] if thread_results and "error" not in thread_results[0] else None
+            for result in thread_results:
+                if "error" in result:
+                    errors.append("{} ({}) failed: {}".format(resolver_name, context_mode, result["error"]))
+                    continue
+                speedup = result["operationsPerSecond"] / single_thread_result["operationsPerSecond"] if single_thread_result else None
+                rows.append((
+                    resolver_name,
+                    context_mode,
+                    str(result["threadCount"]),
+                    "{:.0f}".format(result["operationsPerSecond"]),
+                    "{:.2f}x".format(speedup) if speedup is not None else "-",
+                    ", ".join("{}={}".format(check, count) for check, count in sorted(result["failures"].items())) or "0",
+                ))
+    widths = [max(len(row[idx]) for row in rows) for idx in range(len(rows[0]))]
+    lines = ["  ".join(cell.ljust(width) if idx in (0, 1, 5) else cell.rjust(width) for idx, (cell, width) in enumerate(zip(row, widths)))
+             for row in rows]
+    return "\n".join(lines + errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress the resolvers with concurrent stage opens and resolves")
+    parser.add_argument("--resolvers", nargs="+", choices=benchmark_resolvers.RESOLVER_NAMES,
+                        default=list(benchmark_resolvers.RESOLVER_NAMES))
+    parser.add_argument("--contextModes", nargs="+", choices=CONTEXT_MODES, default=list(CONTEXT_MODES))
+    parser.add_argument("--maxThreads", type=int, default=os.cpu_count() or 1, help="The max number of threads")
+    parser.add_argument("--opensPerThread", type=int, default=4, help="The number of stage opens per thread")
+    parser.add_argument("--resolvesPerThread", type=int, default=10000, help="The number of resolves per thread")
+    parser.add_argument("--distDir", default=os.path.join(benchmark_resolvers.REPO_ROOT_DIR_PATH, "dist"),
+                        help="The directory that contains the <resolverName> builds")
+    parser.add_argument("--python", default=sys.executable, help="The Python interpreter to run the resolvers with")
+    parser.add_argument("--root", default=workspace.get_default_root_dir_path(), help="The workspace root directory")
+    parser.add_argument("--keepWorkspace", action="store_true", help="Don't remove the workspace afterwards")
+    parser.add_argument("--output", help="The json file to write the results to")
+    parser.add_argument("--worker", choices=benchmark_resolvers.RESOLVER_NAMES, help=argparse.SUPPRESS)
+    parser.add_argument("--workerOutput", help=argparse.SUPPRESS)
+    workspace.add_workspace_arguments(parser)
+    # Only map half of the assets, so that the Cached Resolver has to query (and cache) the rest.
+    parser.set_defaults(assetCount=200, mappingPairCount=100, relativeReferencesPerLayer=1)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(args.worker, workspace.load_manifest(args.root), args.contextModes[0],
+                            args.maxThreads, args.opensPerThread, args.resolvesPerThread)
+        with open(args.workerOutput, "w") as result_file:
+            json.dump(result, result_file)
+        return 0
+
+    manifest = workspace.create_workspace(args.root, args.assetCount, args.versionCount, args.referencesPerLayer,
+                                          args.mappingPairCount, args.searchPathCount, args.relativeReferencesPerLayer)
+    try:
+        results = {
+            "metadata": {
+                "date": datetime.datetime.now().isoformat(),
+                "gitRevision": benchmark_resolvers.get_git_revision(),
+                "platform": platform.platform(),
+                "python": args.python,
+                "opensPerThread": args.opensPerThread,
+                "resolvesPerThread": args.resolvesPerThread,
+            },
+            "workspace": {key: value for key, value in manifest.items() if key != "identifiers"},
+            "resolvers": {},
+        }
+        for resolver_name in args.resolvers:
+            mode_results = results["resolvers"][resolver_name] = {}
+            resolver_dist_dir_path = os.path.join(args.distDir, resolver_name)
+            if not os.path.isdir(resolver_dist_dir_path):
+                mode_results["-"] = [{"error": "No build found in {}".format(resolver_dist_dir_path)}]
+                continue
+            for context_mode in args.contextModes:
+                mode_results[context_mode] = [
+                    run_resolver(resolver_name, args.python, args.distDir, manifest, context_mode, thread_count,
+                                 args.opensPerThread, args.resolvesPerThread)
+                    for thread_count in get_thread_counts(args.maxThreads)
+                ]
+    finally:
+        if not args.keepWorkspace:
+            shutil.rmtree(manifest["rootDirPath"], ignore_errors=True)
+
+    print(format_results(results))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=4)
+    failed = any("error" in result or result["failureCount"]
+                 for mode_results in results["resolvers"].values()
+                 for thread_results in mode_results.values()
+                 for result in thread_results)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""Synthetic workspace generator for the resolver benchmarks.
+
+The workspace mimics a typical production layout: A shot layer references
+a tree of assets, each asset layer references further assets via search path
+identifiers ("assets/asset_<idx>/asset_<idx>.usd"). Every asset exists as an
+unversioned layer and as versioned layers, the mapping pairs pin (a subset of)
+the assets to their latest version. The assets are distributed round robin
+across the search paths, so resolving them has to probe multiple search paths.
+Optionally each asset also references element layers via file relative
+identifiers ("./elements/element_<idx>.usd").
+
+The layers are written as plain usda text, so the workspace can be generated
+without having USD available (e.g. on a tmpfs or a network share).
+    python workspace.py /dev/shm/resolverBenchmark --assetCount 10000
+"""
+import argparse
+import json
+import os
+import shutil
+
+MANIFEST_FILE_NAME = "workspace.json"
+MAPPING_PAIRS_KEY = "mappingPairs"
+
+
+def get_default_root_dir_path():
+    """Returns the default workspace root, preferring a tmpfs over the disk.
+    Returns:
+        str: The workspace root directory path.
+    """
+    import tempfile
+
+    tmpfs_dir_path = "/dev/shm"
+    parent_dir_path = tmpfs_dir_path if os.path.isdir(tmpfs_dir_path) else tempfile.gettempdir()
+    return os.path.join(parent_dir_path, "usdAssetResolverBenchmark")
+
+
+def get_asset_identifier(asset_idx):
+    """Returns the (unversioned) search path identifier of an asset."""
+    return "assets/asset_{idx}/asset_{idx}.usd".format(idx=asset_idx)
+
+
+def get_asset_version_identifier(asset_idx, version):
+    """Returns the search path identifier of an asset version."""
+    return "assets/asset_{idx}/asset_{idx}_v{version:03d}.usd".format(idx=asset_idx, version=version)
+
+
+def get_asset_children(node_idx, asset_count, references_per_layer):
+    """Returns the asset indices referenced by a node of the reference tree.
+    The node 0 is the shot, the node n is the asset n - 1.
+    """
+    first_node_idx = node_idx * references_per_layer + 1
+    last_node_idx = min(first_node_idx + references_per_layer, asset_count + 1)
+    return [child_node_idx - 1 for child_node_idx in range(first_node_idx, last_node_idx)]
+
+
+def get_element_identifier(element_idx):
+    """Returns the file relative identifier of an asset element."""
+    return "./elements/element_{idx}.usd".format(idx=element_idx)
+
+
+def _write_layer(file_path, prim_name, referenced_identifiers, attributes=None):
+    """Write a usda layer with a default prim that references the given identifiers.
+    Args:
+        file_path (str): The layer file path.
+        prim_name (str): The default prim name.
+        referenced_identifiers (list[tuple[str, str]]): The (prim name, identifier) pairs to reference.
+        attributes (dict|None): The string attributes to author on the default prim.
+    """
+    lines = ["#usda 1.0", "(", '    defaultPrim = "{}"'.format(prim_name), ")", ""]
+    lines.append('def Xform "{}"'.format(prim_name))
+    lines.append("{")
+    for attr_name, attr_value in (attributes or {}).items():
+        lines.append('    string {} = "{}"'.format(attr_name, attr_value))
+    for child_prim_name, identifier in referenced_identifiers:
+        lines.append('    def "{}" ('.format(child_prim_name))
+        lines.append("        prepend references = @{}@".format(identifier))
+        lines.append("    )")
+        lines.append("    {")
+        lines.append("    }")
+    lines.append("}")
+    lines.append("")
+    with open(file_path, "w") as layer_file:
+        layer_file.write("\n".join(lines))
+
+
+def _write_mapping_file(file_path, mapping_pairs):
+    """Write a usda layer that stores the mapping pairs in its custom layer data.
+    Args:
+        file_path (str): The mapping file path.
+        mapping_pairs (list[tuple[str, str]]): The (source, target) mapping pairs.
+    """
+    values = ", ".join('"{}", "{}"'.format(source, target.replace("\\", "/")) for source, target in mapping_pairs)
+    with open(file_path, "w") as mapping_file:
+        mapping_file.write("#usda 1.0\n(\n    customLayerData = {\n")
+        mapping_file.write("        string[] {} = [{}]\n".format(MAPPING_PAIRS_KEY, values))
+        mapping_file.write("    }\n)\n")
+
+
+def create_workspace(root_dir_path, asset_count, version_count, references_per_layer,
+                     mapping_pair_count, search_path_count, relative_references_per_layer=0):
+    """Create a synthetic workspace, an existing workspace at the root is replaced.
+    Args:
+        root_dir_path (str): The workspace root directory path.
+        asset_count (int): The number of assets.
+        version_count (int): The number of versions per asset.
+        references_per_layer (int): The number of references per layer.
+        mapping_pair_count (int): The number of mapping pairs, pairs beyond
+                                  the asset count map non-existing assets.
+        search_path_count (int): The number of search paths.
+        relative_references_per_layer (int): The number of file relative element
+                                             references per asset layer.
+    Returns:
+        dict: The workspace manifest, it is also written to the workspace root.
+    """
+    if asset_count < 1 or version_count < 1 or references_per_layer < 1 or search_path_count < 1:
+        raise ValueError("The asset, version, references per layer and search path counts have to be at least 1.")
+    root_dir_path = os.path.abspath(root_dir_path)
+    if os.path.isfile(os.path.join(root_dir_path, MANIFEST_FILE_NAME)):
+        shutil.rmtree(root_dir_path)
+    elif os.path.isdir(root_dir_path) and os.listdir(root_dir_path):
+        raise ValueError("The workspace root '{}' is not empty and not a benchmark workspace.".format(root_dir_path))
+    search_paths = [os.path.join(root_dir_path, "searchPaths", "searchPath_{}".format(idx)) for idx in range(search_path_count)]
+    for search_path in search_paths:
+        os.makedirs(search_path)
+
+    # Assets
+    for asset_idx in range(asset_count):
+        search_path = search_paths[asset_idx % search_path_count]
+        asset_dir_path = os.path.join(search_path, os.path.dirname(get_asset_identifier(asset_idx)))
+        os.makedirs(os.path.join(asset_dir_path, "elements"))
+        children = get_asset_children(asset_idx + 1, asset_count, references_per_layer)
+        referenced_identifiers = [("asset_{}".format(child_idx), get_asset_identifier(child_idx)) for child_idx in children]
+        for element_idx in range(relative_references_per_layer):
+            element_identifier = get_element_identifier(element_idx)
+            _write_layer(os.path.join(asset_dir_path, element_identifier), "element_{}".format(element_idx), [])
+            referenced_identifiers.append(("element_{}".format(element_idx), element_identifier))
+        identifiers = [(get_asset_identifier(asset_idx), "latest")]
+        identifiers += [(get_asset_version_identifier(asset_idx, version), "v{:03d}".format(version))
+                        for version in range(1, version_count + 1)]
+        for identifier, version_name in identifiers:
+            _write_layer(os.path.join(search_path, identifier), "asset_{}".format(asset_idx),
+                         referenced_identifiers, {"version": version_name})
+
+    # Shot
+    shot_dir_path = os.path.join(root_dir_path, "shots", "shot")
+    os.makedirs(shot_dir_path)
+    shot_file_path = os.path.join(shot_dir_path, "shot.usd")
+    children = get_asset_children(0, asset_count, references_per_layer)
+    _write_layer(shot_file_path, "shot", [("asset_{}".format(child_idx), get_asset_identifier(child_idx)) for child_idx in children])
+
+    # Mapping pairs
+    # The File and Python Resolver look up the mapping pair targets in the
+    # search paths, the Cached Resolver expects absolute targets.
+    mapping_pairs = []
+    absolute_mapping_pairs = []
+    for pair_idx in range(mapping_pair_count):
+        if pair_idx < asset_count:
+            source = get_asset_identifier(pair_idx)
+            target = get_asset_version_identifier(pair_idx, version_count)
+            absolute_target = os.path.join(search_paths[pair_idx % search_path_count], target)
+        else:
+            source = "assets/unused_{idx}/unused_{idx}.usd".format(idx=pair_idx)
+            target = "assets/unused_{idx}/unused_{idx}_v001.usd".format(idx=pair_idx)
+            absolute_target = os.path.join(search_paths[0], target)
+        mapping_pairs.append((source, target))
+        absolute_mapping_pairs.append((source, absolute_target))
+    mapping_file_path = os.path.join(shot_dir_path, "shot_mapping.usd")
+    absolute_mapping_file_path = os.path.join(shot_dir_path, "shot_mapping_absolute.usd")
+    _write_mapping_file(mapping_file_path, mapping_pairs)
+    _write_mapping_file(absolute_mapping_file_path, absolute_mapping_pairs)
+
+    manifest = {
+        "rootDirPath": root_dir_path,
+        "assetCount": asset_count,
+        "versionCount": version_count,
+        "referencesPerLayer": references_per_layer,
+        "mappingPairCount": mapping_pair_count,
+        "searchPathCount": search_path_count,
+        "relativeReferencesPerLayer": relative_references_per_layer,
+        "searchPaths": search_paths,
+        "shotFilePath": shot_file_path,
+        "mappingFilePath": mapping_file_path,
+        "absoluteMappingFilePath": absolute_mapping_file_path,
+        "layerCount": asset_count * (version_count + 1 + relative_references_per_layer) + 1,
+        "identifiers": [get_asset_identifier(asset_idx) for asset_idx in range(asset_count)]
+                       + [get_asset_version_identifier(asset_idx, version_count) for asset_idx in range(asset_count)],
+    }
+    with open(os.path.join(root_dir_path, MANIFEST_FILE_NAME), "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=4)
+    return manifest
+
+
+def load_manifest(root_dir_path):
+    """Load the manifest of a workspace.
+    Args:
+        root_dir_path (str): The workspace root directory path.
+    Returns:
+        dict: The workspace manifest.
+    """
+    with open(os.path.join(root_dir_path, MANIFEST_FILE_NAME), "r") as manifest_file:
+        return json.load(manifest_file)
+
+
+def add_workspace_arguments(parser):
+    """Add the workspace generation arguments to the given argument parser."""
+    parser.add_argument("--assetCount", type=int, default=1000, help="The number of assets")
+    parser.add_argument("--versionCount", type=int, default=3, help="The number of versions per asset")
+    parser.add_argument("--referencesPerLayer", type=int, default=4, help="The number of references per layer")
+    parser.add_argument("--mappingPairCount", type=int, default=1000,
+                        help="The number of mapping pairs, pairs beyond the asset count map non-existing assets")
+    parser.add_argument("--searchPathCount", type=int, default=3, help="The number of search paths")
+    parser.add_argument("--relativeReferencesPerLayer", type=int, default=0,
+                        help="The number of file relative element references per asset layer")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic resolver benchmark workspace")
+    parser.add_argument("root", nargs="?", default=get_default_root_dir_path(), help="The workspace root directory")
+    add_workspace_arguments(parser)
+    args = parser.parse_args()
+    manifest = create_workspace(args.root, args.assetCount, args.versionCount, args.referencesPerLayer,
+                                args.mappingPairCount, args.searchPathCount, args.relativeReferencesPerLayer)
+    print("Created workspace with {} layers in {}".format(manifest["layerCount"], manifest["rootDirPath"]))
+
+
+if __name__ == "__main__":
+    main()